@@ -5,13 +5,22 @@ Gmail, WhatsApp, and Files in the organized folder structure.
 """
 
 import os
+import sys
 from pathlib import Path
 import shutil
 from datetime import datetime
 
+sys.path.append(str(Path(__file__).resolve().parent.parent / "System"))
+from vault_snapshot import VaultSnapshot
+from state_index import WorkflowIndex
+
+VAULT_ROOT = Path("F:/AI_Employee_Vault/AI_Employee_Vault")
+STATE_INDEX = WorkflowIndex(VAULT_ROOT)  # one connection for the process, opened on first move
+
 def show_pending_items():
     """Show all pending items across all categories"""
-    vault_root = Path("F:/AI_Employee_Vault/AI_Employee_Vault")
+    vault_root = VAULT_ROOT
+    snapshot = VaultSnapshot(vault_root, folders=('Pending_Approval', 'Needs_Action')).scan()
     
     # Categories
     categories = {
@@ -24,8 +33,8 @@ def show_pending_items():
     total_pending = 0
     
     for category, folder in categories.items():
-        if folder.exists():
-            files = list(folder.glob('*'))
+        if snapshot.exists(folder):
+            files = snapshot.entries(folder)
             print(f"\n{category} ({len(files)} items):")
             for file in files:
                 print(f"  - {file.name}")
@@ -44,8 +53,8 @@ def show_pending_items():
     total_needs_action = 0
     
     for category, folder in needs_action_categories.items():
-        if folder.exists():
-            files = list(folder.glob('*'))
+        if snapshot.exists(folder):
+            files = snapshot.entries(folder)
             print(f"\n{category} ({len(files)} items):")
             for file in files:
                 print(f"  - {file.name}")
@@ -55,7 +64,7 @@ def show_pending_items():
 
 def approve_item(category, filename):
     """Move an item from Pending_Approval to Approved folder"""
-    vault_root = Path("F:/AI_Employee_Vault/AI_Employee_Vault")
+    vault_root = VAULT_ROOT
     
     pending_folder = vault_root / 'Pending_Approval' / category
     approved_folder = vault_root / 'Approved' / category
@@ -69,13 +78,13 @@ def approve_item(category, filename):
     
     # Move to approved folder
     approved_folder.mkdir(exist_ok=True)
-    shutil.move(str(pending_file), str(approved_file))
+    STATE_INDEX.move(pending_file, approved_file, mover=shutil.move)
     print(f"Approved: {filename} -> Approved/{category}/")
     return True
 
 def reject_item(category, filename):
     """Move an item from Pending_Approval to Rejected folder"""
-    vault_root = Path("F:/AI_Employee_Vault/AI_Employee_Vault")
+    vault_root = VAULT_ROOT
     
     pending_folder = vault_root / 'Pending_Approval' / category
     rejected_folder = vault_root / 'Rejected'
@@ -89,13 +98,13 @@ def reject_item(category, filename):
     
     # Move to rejected folder
     rejected_folder.mkdir(exist_ok=True)
-    shutil.move(str(pending_file), str(rejected_file))
+    STATE_INDEX.move(pending_file, rejected_file, mover=shutil.move)
     print(f"Rejected: {filename} -> Rejected/")
     return True
 
 def move_to_pending(category, filename):
     """Move an item from Needs_Action to Pending_Approval folder"""
-    vault_root = Path("F:/AI_Employee_Vault/AI_Employee_Vault")
+    vault_root = VAULT_ROOT
     
     needs_action_folder = vault_root / 'Needs_Action' / category
     pending_folder = vault_root / 'Pending_Approval' / category
@@ -109,7 +118,7 @@ def move_to_pending(category, filename):
     
     # Move to pending folder
     pending_folder.mkdir(exist_ok=True)
-    shutil.move(str(needs_action_file), str(pending_file))
+    STATE_INDEX.move(needs_action_file, pending_file, mover=shutil.move)
     print(f"Moved to pending: {filename} -> Pending_Approval/{category}/")
     return True
 
@@ -6,6 +6,7 @@ Monitors the Pending_Approval folder and executes actions when files are moved t
 """
 
 import os
+import sys
 import time
 import logging
 import json
@@ -14,6 +15,10 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import yaml
 
+sys.path.append(str(Path(__file__).resolve().parent.parent / "System"))
+from frontmatter import read_frontmatter
+from state_index import WorkflowIndex
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -26,6 +31,7 @@ class ApprovalSystem:
         self.rejected_path = self.vault_path / "Rejected"
         self.done_path = self.vault_path / "Done"
         self.needs_action_path = self.vault_path / "Needs_Action"
+        self.index = WorkflowIndex(self.vault_path)
         
         # Create necessary directories if they don't exist
         self.pending_approval_path.mkdir(parents=True, exist_ok=True)
@@ -56,15 +62,8 @@ class ApprovalSystem:
     def execute_approved_action(self, request_path: Path):
         """Execute the action specified in an approved request"""
         try:
-            content = request_path.read_text(encoding='utf-8')
-            
-            # Parse YAML frontmatter if it exists
-            action_data = {}
-            if content.startswith("---"):
-                parts = content.split("---", 2)
-                if len(parts) >= 3:
-                    frontmatter = parts[1]
-                    action_data = yaml.safe_load(frontmatter)
+            # Parse YAML frontmatter if it exists (header only, cached)
+            action_data = read_frontmatter(request_path, parser="yaml")
             
             action_type = action_data.get('action', 'unknown')
             logger.info(f"Executing approved {action_type} action from: {request_path.name}")
@@ -81,7 +80,7 @@ class ApprovalSystem:
             
             # Move the request to Done after execution
             done_destination = self.done_path / request_path.name
-            request_path.rename(done_destination)
+            self.index.move(request_path, done_destination)
             logger.info(f"Moved executed request to Done: {request_path.name}")
             
         except Exception as e:
@@ -90,22 +89,15 @@ class ApprovalSystem:
     def handle_rejected_action(self, request_path: Path):
         """Handle a rejected action request"""
         try:
-            content = request_path.read_text(encoding='utf-8')
-            
-            # Parse YAML frontmatter if it exists
-            action_data = {}
-            if content.startswith("---"):
-                parts = content.split("---", 2)
-                if len(parts) >= 3:
-                    frontmatter = parts[1]
-                    action_data = yaml.safe_load(frontmatter)
+            # Parse YAML frontmatter if it exists (header only, cached)
+            action_data = read_frontmatter(request_path, parser="yaml")
             
             reason = action_data.get('reason', 'unknown')
             logger.info(f"Handling rejected request: {reason} from {request_path.name}")
             
             # Move the request to Done after handling rejection
             done_destination = self.done_path / request_path.name
-            request_path.rename(done_destination)
+            self.index.move(request_path, done_destination)
             logger.info(f"Moved rejected request to Done: {request_path.name}")
             
         except Exception as e:
@@ -9,7 +9,14 @@ import json
 from datetime import datetime, timedelta
 from pathlib import Path
 import re
-from collections import defaultdict
+import sys
+from collections import Counter
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "System"))
+from log_query import LogQuery
+from vault_snapshot import VaultSnapshot
+from daily_rollup import DailyRollup, SUBSCRIPTION_PATTERNS, ENABLED as ROLLUP_ENABLED
+from audit_stream import ActionCounts, SubscriptionCharges, default_aggregators, feed, run_audit
 
 class AuditGenerator:
     def __init__(self, vault_path):
@@ -22,50 +29,22 @@ class AuditGenerator:
         # Create necessary directories
         self.briefings_path.mkdir(exist_ok=True)
         
-        # Subscription patterns for identifying recurring expenses
-        self.subscription_patterns = {
-            'netflix.com': 'Netflix',
-            'spotify.com': 'Spotify',
-            'adobe.com': 'Adobe Creative Cloud',
-            'notion.so': 'Notion',
-            'slack.com': 'Slack',
-            'microsoft.com': 'Microsoft 365',
-            'google.com': 'Google Workspace',
-            'amazon.com': 'Amazon Prime',
-            'apple.com': 'Apple Services',
-            'dropbox.com': 'Dropbox',
-            'zoom.us': 'Zoom',
-            'salesforce.com': 'Salesforce',
-            'hubspot.com': 'HubSpot',
-        }
+        # Subscription patterns for identifying recurring expenses (also matched at log time by the rollup)
+        self.subscription_patterns = dict(SUBSCRIPTION_PATTERNS)
 
     def analyze_logs(self, days=7):
         """Analyze log files for the specified number of days"""
-        logs = []
         start_date = datetime.now() - timedelta(days=days)
         
-        # Look for log files in the Logs directory
-        for log_file in self.logs_path.glob(f"log_*.json"):
-            try:
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if content:
-                        file_logs = json.loads(content)
-                        logs.extend(file_logs)
-            except (json.JSONDecodeError, FileNotFoundError):
-                continue
-        
-        # Filter logs from the specified period
-        filtered_logs = []
-        for log in logs:
-            try:
-                timestamp = datetime.fromisoformat(log.get('timestamp', '').replace('Z', '+00:00'))
-                if timestamp >= start_date:
-                    filtered_logs.append(log)
-            except ValueError:
-                continue
-                
-        return filtered_logs
+        # Only daily log files dated inside the period are opened
+        return list(LogQuery(self.logs_path).search(start_date))
+
+    def audit_logs(self, days=7, aggregators=None):
+        """Run the log analyses for the period in one streaming pass ({aggregator name: result})"""
+        start_date = datetime.now() - timedelta(days=days)
+        if aggregators is None:
+            aggregators = default_aggregators(self.subscription_patterns)
+        return run_audit(self.logs_path, aggregators, start=start_date)
 
     def analyze_done_folder(self, days=7):
         """Analyze files in the Done folder for the specified number of days"""
@@ -92,27 +71,25 @@ class AuditGenerator:
         """Analyze current items in Needs_Action folder"""
         needs_action_items = {}
         
-        # Check all Needs_Action subfolders
-        for folder in self.needs_action_path.iterdir():
-            if folder.is_dir():
-                files = list(folder.glob("*"))
-                needs_action_items[folder.name] = {
-                    'count': len(files),
-                    'files': [f.name for f in files[:10]]  # Limit to first 10 files
-                }
+        # Check all Needs_Action subfolders (single scandir pass)
+        snapshot = VaultSnapshot(self.vault_path, folders=("Needs_Action",)).scan()
+        for name in snapshot.subfolders(self.needs_action_path):
+            entries = snapshot.entries(self.needs_action_path / name)
+            needs_action_items[name] = {
+                'count': len(entries),
+                'files': [e.name for e in entries[:10]]  # Limit to first 10 files
+            }
         
         return needs_action_items
 
     def identify_bottlenecks(self, logs):
         """Identify potential bottlenecks based on logs"""
+        return self.bottlenecks_from_counts(feed(logs, [ActionCounts()])['actions'])
+
+    def bottlenecks_from_counts(self, action_counts):
+        """Identify potential bottlenecks from per-action-type counts"""
         bottlenecks = []
         
-        # Group logs by action type
-        action_counts = defaultdict(int)
-        for log in logs:
-            action_type = log.get('action_type', 'unknown')
-            action_counts[action_type] += 1
-        
         # Identify actions that occurred more than average (potential bottlenecks)
         avg_count = sum(action_counts.values()) / len(action_counts) if action_counts else 0
         
@@ -128,45 +105,37 @@ class AuditGenerator:
 
     def identify_subscription_costs(self, logs):
         """Identify potential subscription costs from logs"""
-        subscriptions = []
-        
-        for log in logs:
-            details = log.get('details', {})
-            description = details.get('description', '').lower()
-            
-            for pattern, name in self.subscription_patterns.items():
-                if pattern in description:
-                    subscriptions.append({
-                        'name': name,
-                        'amount': details.get('amount', 'N/A'),
-                        'date': log.get('timestamp', 'N/A'),
-                        'description': description
-                    })
-        
-        return subscriptions
+        return feed(logs, [SubscriptionCharges(self.subscription_patterns, limit=None)])['subscriptions']
 
     def generate_ceo_briefing(self, period_days=7):
         """Generate a CEO briefing for the specified period"""
         start_date = datetime.now() - timedelta(days=period_days)
         end_date = datetime.now()
         
-        # Gather data
-        logs = self.analyze_logs(period_days)
-        done_files = self.analyze_done_folder(period_days)
+        # Gather data: counts come from the daily rollup (one row per day, metric and key),
+        # or from one streaming pass over the period's logs when the rollup is disabled
         needs_action = self.analyze_needs_action()
-        bottlenecks = self.identify_bottlenecks(logs)
-        subscriptions = self.identify_subscription_costs(logs)
+        if ROLLUP_ENABLED:
+            rollup = DailyRollup(self.logs_path)
+            first_day, last_day = start_date.date() + timedelta(days=1), end_date.date()
+            rollup.ensure_days(self.vault_path, first_day, last_day)
+            totals = rollup.totals(first_day, last_day)
+            rollup.close()
+            action_counts, revenue_count, done_counts = totals['action'], totals['revenue'][''], totals['done']
+            subscriptions = []
+            for key, count in totals['subscription'].items():
+                name, amount, timestamp, description = json.loads(key)
+                subscriptions.extend([{'name': name, 'amount': amount, 'date': timestamp, 'description': description}] * count)
+            subscriptions.sort(key=lambda sub: str(sub['date']))
+        else:
+            audit = self.audit_logs(period_days)
+            action_counts, revenue_count, subscriptions = audit['actions'], audit['revenue'], audit['subscriptions']
+            done_counts = Counter(f['folder'] for f in self.analyze_done_folder(period_days))
+        bottlenecks = self.bottlenecks_from_counts(action_counts)
         
         # Calculate metrics
-        total_logs = len(logs)
-        completed_tasks = len(done_files)
-        
-        # Identify revenue-related activities (based on keywords in logs)
-        revenue_keywords = ['payment', 'invoice', 'sale', 'revenue', 'income', 'billing']
-        revenue_logs = []
-        for log in logs:
-            if any(keyword in json.dumps(log).lower() for keyword in revenue_keywords):
-                revenue_logs.append(log)
+        total_logs = sum(action_counts.values())
+        completed_tasks = sum(done_counts.values())
         
         # Generate the briefing
         briefing_content = f"""# Monday Morning CEO Briefing
@@ -180,16 +149,16 @@ Weekly audit covering {period_days} days from {start_date.strftime('%B %d')} to
 System processed {total_logs} actions and completed {completed_tasks} tasks.
 
 ## Revenue
-- **Revenue Activities**: {len(revenue_logs)} identified
+- **Revenue Activities**: {revenue_count} identified
 - **Potential Revenue**: Data available in logs (requires manual review for exact amounts)
-- **Trend**: {(len(revenue_logs)/period_days)*7:0.1f} activities per week
+- **Trend**: {(revenue_count/period_days)*7:0.1f} activities per week
 
 ## Completed Tasks
 - **Total Completed**: {completed_tasks}
 - **Breakdown by type**:
-  - Email: {[f for f in done_files if 'EMAIL_' in f['filename']]}
-  - WhatsApp: {[f for f in done_files if 'WHATSAPP_' in f['filename']]}
-  - Files: {[f for f in done_files if 'FILE_' in f['filename']]}
+  - Email: {done_counts['Email']}
+  - WhatsApp: {done_counts['WhatsApp']}
+  - Files: {done_counts['Files']}
 
 ## Current Status
 ### Pending Actions
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Audit Stream - single-pass, bounded-memory audit over the daily logs
+
+AuditGenerator used to load every log file into one list, drop the entries
+outside the period afterwards, and then walk the list again for each
+analysis (bottlenecks, subscription costs, revenue). run_audit does it in
+one pass instead:
+
+  - the date range picks the day files first (LogQuery / iter_log_files), so
+    days outside the period are never opened, and only the first and last
+    day parse timestamps
+  - each entry is read once and handed to every aggregator; the entry's JSON
+    text, which the keyword scans need, is built at most once
+  - aggregators keep bounded state (counters, a capped list of charges), so
+    memory does not grow with the length of the period
+
+An aggregator is an Aggregator subclass with a name, add(entry, text) and result().
+The daily rollup (System/daily_rollup.py) covers the weekly briefing; this
+is the path for ad-hoc periods and for running without the rollup:
+
+    python Auditing/audit_stream.py <vault_path> --days 90
+    python Auditing/audit_stream.py --benchmark --days 365 [--memory]   # generated year of logs
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from abc import ABC, abstractmethod
+from pathlib import Path
+from collections import Counter, deque
+from datetime import datetime, timedelta
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "System"))
+from log_store import iter_logs
+from log_query import LogQuery
+from daily_rollup import REVENUE_KEYWORDS, SUBSCRIPTION_PATTERNS, action_key
+
+# --- Configuration ---
+MAX_SUBSCRIPTIONS = int(os.environ.get("AUDIT_MAX_SUBSCRIPTIONS", "100"))  # most recent charges kept
+
+
+class Aggregator(ABC):
+    """One analysis fed by run_audit. Keep state bounded: it sees every entry of the period."""
+    name = "aggregator"
+    uses_text = False  # True if add() needs the entry's lowercased JSON text
+
+    @abstractmethod
+    def add(self, entry: dict, text: str = None):
+        """Takes one entry of the period."""
+
+    @abstractmethod
+    def result(self):
+        """The analysis of every entry added so far."""
+
+
+class EntryCount(Aggregator):
+    name = "entries"
+
+    def __init__(self):
+        self.count = 0
+
+    def add(self, entry, text=None):
+        self.count += 1
+
+    def result(self):
+        return self.count
+
+
+class ActionCounts(Aggregator):
+    """Entries per action (daily_rollup.action_key), the input of AuditGenerator.bottlenecks_from_counts."""
+    name = "actions"
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def add(self, entry, text=None):
+        self.counts[action_key(entry)] += 1
+
+    def result(self):
+        return self.counts
+
+
+class RevenueCount(Aggregator):
+    """Entries mentioning a revenue keyword anywhere in their JSON."""
+    name = "revenue"
+    uses_text = True
+
+    def __init__(self, keywords=REVENUE_KEYWORDS):
+        self.keywords = tuple(keywords)
+        self.count = 0
+
+    def add(self, entry, text=None):
+        if any(keyword in text for keyword in self.keywords):
+            self.count += 1
+
+    def result(self):
+        return self.count
+
+
+class SubscriptionCharges(Aggregator):
+    """Entries whose details.description names a known subscription service.
+
+    Keeps the most recent `limit` charges (None = all) and counts every one.
+    """
+    name = "subscriptions"
+
+    def __init__(self, patterns=None, limit=MAX_SUBSCRIPTIONS):
+        self.patterns = dict(patterns or SUBSCRIPTION_PATTERNS)
+        self.charges = deque(maxlen=limit)
+        self.found = 0
+
+    def add(self, entry, text=None):
+        details = entry.get('details')
+        if not isinstance(details, dict):
+            return
+        description = str(details.get('description', '')).lower()
+        for pattern, name in self.patterns.items():
+            if pattern in description:
+                self.found += 1
+                self.charges.append({
+                    'name': name,
+                    'amount': details.get('amount', 'N/A'),
+                    'date': entry.get('timestamp', 'N/A'),
+                    'description': description
+                })
+
+    def result(self):
+        return list(self.charges)
+
+
+def default_aggregators(subscription_patterns=None) -> list:
+    return [EntryCount(), ActionCounts(), RevenueCount(), SubscriptionCharges(subscription_patterns)]
+
+
+def feed(entries, aggregators: list) -> dict:
+    """Hands each entry to every aggregator once; returns {name: result}."""
+    needs_text = any(aggregator.uses_text for aggregator in aggregators)
+    for entry in entries:
+        text = json.dumps(entry, default=str).lower() if needs_text else None
+        for aggregator in aggregators:
+            aggregator.add(entry, text)
+    return {aggregator.name: aggregator.result() for aggregator in aggregators}
+
+
+def run_audit(logs_folder: Path, aggregators: list = None, start: datetime = None,
+              end: datetime = None, prefix: str = "log") -> dict:
+    """Streams the entries logged in [start, end] through the aggregators in one pass."""
+    aggregators = aggregators if aggregators is not None else default_aggregators()
+    return feed(LogQuery(logs_folder, prefix).search(start, end), aggregators)
+
+
+# --- Benchmark ---
+
+def _generate_year(logs_folder: Path, days: int, per_day: int, seed: int = 7):
+    """Writes `days` daily JSONL logs ending today, per_day entries each."""
+    rng = random.Random(seed)
+    actions = ['email_received', 'email_sent', 'file_moved', 'plan_created', 'approval_requested',
+               'whatsapp_message', 'odoo_sync', 'linkedin_post', 'payment_received']
+    services = list(SUBSCRIPTION_PATTERNS) + ['example.org', 'local bakery', 'office supplies']
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    for d in range(days):
+        day = today - timedelta(days=days - 1 - d)
+        with open(logs_folder / f"log_{day.strftime('%Y-%m-%d')}.jsonl", "w", encoding="utf-8") as f:
+            for i in range(per_day):
+                timestamp = day + timedelta(seconds=i * 86400 // per_day)
+                details = {"n": i, "description": f"Charge from {rng.choice(services)}",
+                           "amount": round(rng.uniform(1, 200), 2)} if rng.random() < 0.05 else {"n": i}
+                f.write(json.dumps({"timestamp": timestamp.isoformat(), "action_type": rng.choice(actions),
+                                    "actor": f"agent{rng.randrange(4)}", "level": "info",
+                                    "details": details}) + "\n")
+
+
+def _legacy_audit(logs_folder: Path, start: datetime, patterns: dict) -> dict:
+    """The previous approach: load everything, filter afterwards, one walk per analysis."""
+    logs = []
+    for log in iter_logs(logs_folder):
+        try:
+            if datetime.fromisoformat(log.get('timestamp', '')) >= start:
+                logs.append(log)
+        except ValueError:
+            continue
+    actions = Counter(log.get('action_type', 'unknown') for log in logs)
+    subscriptions = []
+    for log in logs:
+        details = log.get('details', {})
+        description = details.get('description', '').lower()
+        for pattern, name in patterns.items():
+            if pattern in description:
+                subscriptions.append({'name': name, 'amount': details.get('amount', 'N/A'),
+                                      'date': log.get('timestamp', 'N/A'), 'description': description})
+    revenue = [log for log in logs if any(k in json.dumps(log, default=str).lower() for k in REVENUE_KEYWORDS)]
+    return {"entries": len(logs), "actions": actions, "revenue": len(revenue), "subscriptions": subscriptions}
+
+
+def benchmark(days: int = 365, per_day: int = 1000, period_days: int = 7, memory: bool = False):
+    with tempfile.TemporaryDirectory() as tmp:
+        logs_folder = Path(tmp)
+        _generate_year(logs_folder, days, per_day)
+        size = sum(f.stat().st_size for f in logs_folder.iterdir())
+        print(f"[BENCH] {days} days x {per_day} entries ({size / 1e6:.1f} MB)")
+
+        for window in sorted({period_days, days}):
+            start = datetime.now() - timedelta(days=window)
+            runs = (('load all + walks', lambda: _legacy_audit(logs_folder, start, SUBSCRIPTION_PATTERNS)),
+                    ('single pass', lambda: run_audit(logs_folder, [
+                        EntryCount(), ActionCounts(), RevenueCount(), SubscriptionCharges(limit=None)], start)))
+            results = {}
+            for label, fn in runs:
+                began = time.perf_counter()
+                results[label] = fn()
+                elapsed = time.perf_counter() - began
+                line = f"[BENCH] {window:4d}-day period  {label:16s} {elapsed:7.2f}s"
+                if memory:
+                    # Separate traced run: tracemalloc slows Python down several times
+                    tracemalloc.start()
+                    fn()
+                    line += f"  peak {tracemalloc.get_traced_memory()[1] / 1e6:8.1f} MB"
+                    tracemalloc.stop()
+                print(f"{line}  {results[label]['entries']:,} entries")
+            assert results['load all + walks'] == results['single pass'], "single pass disagrees with the legacy audit"
+        print("[BENCH] results identical")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Single-pass streaming audit of the daily logs")
+    parser.add_argument("vault_path", type=Path, nargs="?")
+    parser.add_argument("--days", type=int, default=7, help="audit period (benchmark: days of logs generated)")
+    parser.add_argument("--benchmark", action="store_true", help="benchmark on generated logs")
+    parser.add_argument("--per-day", type=int, default=1000, help="benchmark entries per day")
+    parser.add_argument("--memory", action="store_true", help="benchmark: also measure peak memory (slow)")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark(args.days, args.per_day, memory=args.memory)
+        return
+    if args.vault_path is None:
+        parser.error("vault_path is required unless --benchmark is given")
+
+    results = run_audit(args.vault_path / "Logs", start=datetime.now() - timedelta(days=args.days))
+    print(f"[AUDIT] {results['entries']} entries in the last {args.days} day(s), "
+          f"{results['revenue']} revenue-related")
+    for action, count in results['actions'].most_common(10):
+        print(f"[AUDIT]   {action:24s} {count:8d}")
+    for charge in results['subscriptions']:
+        print(f"[AUDIT] subscription {charge['name']}: ${charge['amount']} on {str(charge['date'])[:10]}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
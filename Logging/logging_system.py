@@ -4,7 +4,6 @@ Comprehensive Logging System for AI Employee
 Provides detailed action logging, audit trails, and compliance logging
 """
 
-import json
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -13,9 +12,22 @@ from typing import Dict, Any, Optional
 from enum import Enum
 import threading
 import atexit
-from collections import deque
+import queue
+import time
+from collections import deque, defaultdict
 import gzip
 import shutil
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "System"))
+from log_store import append_entries, daily_log_path, iter_entries, iter_log_sources
+from log_query import LogQuery
+
+# Queued by close() to wake the flusher thread
+_STOP_FLUSHER = object()
+# flush_logs() queues a threading.Event: the flusher writes what it has collected
+# right away and sets the event once everything queued before it is on disk
+FLUSH_TIMEOUT = 10.0  # seconds flush_logs() waits for the flusher
 
 class LogLevel(Enum):
     DEBUG = "debug"
@@ -42,8 +54,16 @@ class AuditEventType(Enum):
 class AILogger:
     """
     Comprehensive logging system for AI Employee
+
+    With write_behind=True, entries are queued in memory and a background
+    thread appends them in batches of batch_size entries or every
+    flush_interval_ms milliseconds, whichever comes first. The queue holds at
+    most max_queue_size entries; when it is full, callers block until the
+    flusher catches up. Queued entries are flushed on close() and at exit.
     """
-    def __init__(self, vault_path: str, max_log_size_mb: int = 100, backup_count: int = 5):
+    def __init__(self, vault_path: str, max_log_size_mb: int = 100, backup_count: int = 5,
+                 write_behind: bool = False, batch_size: int = 100,
+                 flush_interval_ms: int = 500, max_queue_size: int = 10000):
         self.vault_path = Path(vault_path)
         self.logs_path = self.vault_path / "Logs"
         self.logs_path.mkdir(exist_ok=True)
@@ -59,11 +79,26 @@ class AILogger:
         # In-memory log buffer for performance
         self.log_buffer = deque(maxlen=1000)
         
+        # Write-behind queue and flusher thread
+        self.write_behind = write_behind
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.write_queue = queue.Queue(maxsize=max_queue_size)
+        self.io_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._flush_thread = None
+        
         # Set up logging
         self.setup_logging()
         
+        if self.write_behind:
+            self._flush_thread = threading.Thread(
+                target=self._flush_worker, name="AILoggerFlusher", daemon=True
+            )
+            self._flush_thread.start()
+        
         # Register cleanup function
-        atexit.register(self.flush_logs)
+        atexit.register(self.close)
     
     def setup_logging(self):
         """
@@ -73,8 +108,7 @@ class AILogger:
         self.logs_path.mkdir(exist_ok=True)
         
         # Get today's log file
-        today = datetime.now().strftime('%Y-%m-%d')
-        log_file = self.logs_path / f"log_{today}.json"
+        log_file = self.get_current_log_file()
         
         # Set up file handler
         self.file_handler = logging.FileHandler(log_file, encoding='utf-8')
@@ -93,8 +127,7 @@ class AILogger:
         """
         Get the current log file path
         """
-        today = datetime.now().strftime('%Y-%m-%d')
-        return self.logs_path / f"log_{today}.json"
+        return daily_log_path(self.logs_path)
     
     def rotate_log_if_needed(self):
         """
@@ -103,8 +136,15 @@ class AILogger:
         current_log = self.get_current_log_file()
         
         if current_log.exists() and current_log.stat().st_size > self.max_log_size_bytes:
-            # Compress the old log file
-            compressed_log = current_log.with_suffix('.json.gz')
+            # Compress the old log file into a time-stamped segment, so a second
+            # rotation on the same day does not overwrite the first
+            stem, suffix = current_log.name.split('.', 1)
+            segment = datetime.now().strftime('%H%M%S')
+            compressed_log = current_log.with_name(f"{stem}.{segment}.{suffix}.gz")
+            n = 1
+            while compressed_log.exists():
+                compressed_log = current_log.with_name(f"{stem}.{segment}-{n}.{suffix}.gz")
+                n += 1
             with open(current_log, 'rb') as f_in:
                 with gzip.open(compressed_log, 'wb') as f_out:
                     shutil.copyfileobj(f_in, f_out)
@@ -146,12 +186,9 @@ class AILogger:
             
             # Add to in-memory buffer
             self.log_buffer.append(log_entry)
-            
-            # Write to file
-            self._write_log_entry(log_entry)
-            
-            # Rotate log if needed
-            self.rotate_log_if_needed()
+        
+        # Write to file (or queue for the flusher thread)
+        self._dispatch(log_entry)
     
     def log_audit_event(self, 
                        event_type: AuditEventType, 
@@ -175,36 +212,84 @@ class AILogger:
             
             # Add to in-memory buffer
             self.log_buffer.append(log_entry)
-            
-            # Write to file
-            self._write_log_entry(log_entry)
+        
+        # Write to file (or queue for the flusher thread)
+        self._dispatch(log_entry)
+    
+    def _dispatch(self, log_entry: Dict[str, Any]):
+        """
+        Write a log entry now, or queue it in write-behind mode
+        """
+        if self.write_behind and not self._stop_event.is_set():
+            # Blocks when the queue is full (backpressure on the caller)
+            self.write_queue.put(log_entry)
+        else:
+            self._write_batch([log_entry])
+    
+    def _write_log_entry(self, log_entry: Dict[str, Any]):
+        """
+        Append a log entry to the current JSONL log file
+        """
+        self._write_batch([log_entry])
+    
+    def _write_batch(self, entries: list):
+        """
+        Append a batch of entries, one write per daily log file
+        """
+        by_day = defaultdict(list)
+        for entry in entries:
+            by_day[entry.get('timestamp', '')[:10]].append(entry)
+        
+        with self.io_lock:
+            for day, day_entries in by_day.items():
+                try:
+                    log_file = daily_log_path(self.logs_path, day=datetime.strptime(day, '%Y-%m-%d'))
+                except ValueError:
+                    log_file = self.get_current_log_file()
+                append_entries(log_file, day_entries)
             
             # Rotate log if needed
             self.rotate_log_if_needed()
     
-    def _write_log_entry(self, log_entry: Dict[str, Any]):
+    def _flush_worker(self):
         """
-        Write a log entry to the current log file
+        Background thread: drain the queue in batches
         """
-        current_log = self.get_current_log_file()
-        
-        # Read existing content
-        existing_content = []
-        if current_log.exists():
-            try:
-                with open(current_log, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if content:
-                        existing_content = json.loads(content)
-            except (json.JSONDecodeError, FileNotFoundError):
-                existing_content = []
-        
-        # Append new entry
-        existing_content.append(log_entry)
-        
-        # Write back to file
-        with open(current_log, 'w', encoding='utf-8') as f:
-            json.dump(existing_content, f, indent=2)
+        stopping = False
+        while not stopping:
+            batch = []
+            flushed = None
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self.write_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is _STOP_FLUSHER:
+                    self.write_queue.task_done()
+                    stopping = True
+                    break
+                if isinstance(entry, threading.Event):
+                    self.write_queue.task_done()
+                    flushed = entry
+                    break
+                batch.append(entry)
+            if batch:
+                self._flush_batch(batch)
+            if flushed is not None:
+                flushed.set()
+    
+    def _flush_batch(self, batch: list):
+        try:
+            self._write_batch(batch)
+        except Exception as e:
+            print(f"Warning: failed to flush {len(batch)} log entries: {e}")
+        finally:
+            for _ in batch:
+                self.write_queue.task_done()
     
     def log_security_event(self, 
                           event_type: str, 
@@ -237,45 +322,76 @@ class AILogger:
                    start_date: Optional[datetime] = None, 
                    end_date: Optional[datetime] = None,
                    level: Optional[LogLevel] = None,
-                   action_type: Optional[str] = None) -> list:
+                   action_type: Optional[str] = None,
+                   actor: Optional[str] = None) -> list:
         """
         Search logs based on criteria
+
+        Only the daily files between start_date and end_date are read (all days
+        if neither is given); level, action_type and actor use the per-day indexes.
         """
-        results = []
-        
-        # Get today's log file
-        current_log = self.get_current_log_file()
+        self.flush_logs()
+        query = LogQuery(self.logs_path)
+        return list(query.search(start_date, end_date,
+                                 level=level.value if level else None,
+                                 action_type=action_type, actor=actor))
+    
+    def flush_logs(self, timeout: float = FLUSH_TIMEOUT) -> bool:
+        """
+        Flush any queued logs to disk and wait until they are written
+
+        Entries logged after this call are not waited for. Returns False if the
+        flusher did not get through the earlier entries within timeout seconds.
+        """
+        if not self.write_behind:
+            return True
         
-        # Read log file
-        if current_log.exists():
+        flusher = self._flush_thread
+        if flusher is not None and flusher.is_alive():
+            # Only the flusher writes queued entries, so they reach the file in queue order
+            flushed = threading.Event()
             try:
-                with open(current_log, 'r', encoding='utf-8') as f:
-                    logs = json.load(f)
-                
-                for log in logs:
-                    # Apply filters
-                    if start_date and datetime.fromisoformat(log['timestamp']) < start_date:
-                        continue
-                    if end_date and datetime.fromisoformat(log['timestamp']) > end_date:
-                        continue
-                    if level and log['level'] != level.value:
-                        continue
-                    if action_type and log.get('action_type') != action_type:
-                        continue
-                    
-                    results.append(log)
-            except (json.JSONDecodeError, FileNotFoundError):
-                pass
+                self.write_queue.put(flushed, timeout=timeout)
+            except queue.Full:
+                return False
+            return flushed.wait(timeout)
         
-        return results
+        # The flusher has stopped (close()): drain what is left from this thread
+        batch = []
+        waiting = []
+        while True:
+            try:
+                entry = self.write_queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP_FLUSHER:
+                self.write_queue.task_done()
+                continue
+            if isinstance(entry, threading.Event):
+                self.write_queue.task_done()
+                waiting.append(entry)
+                continue
+            batch.append(entry)
+            if len(batch) >= self.batch_size:
+                self._flush_batch(batch)
+                batch = []
+        if batch:
+            self._flush_batch(batch)
+        for flushed in waiting:
+            flushed.set()
+        return True
     
-    def flush_logs(self):
+    def close(self):
         """
-        Flush any remaining logs to disk
+        Stop the flusher thread and write everything still queued
         """
-        # In this implementation, logs are written immediately
-        # But we could add any cleanup here if needed
-        pass
+        if self._flush_thread is not None:
+            self._stop_event.set()
+            self.write_queue.put(_STOP_FLUSHER)
+            self._flush_thread.join()
+            self._flush_thread = None
+        self.flush_logs()
+        self._stop_event.set()
     
     def get_log_statistics(self) -> Dict[str, Any]:
         """
@@ -315,15 +431,11 @@ class LogAggregator:
         """
         Aggregate logs for a specific date
         """
-        log_file = self.logs_path / f"log_{date}.json"
-        if not log_file.exists():
-            return []
-        
-        try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return []
+        day = datetime.strptime(date, '%Y-%m-%d')
+        logs = []
+        for log_file, skip in iter_log_sources(self.logs_path, start=day, end=day):
+            logs.extend(iter_entries(log_file, skip))
+        return logs
     
     def generate_compliance_report(self, start_date: str, end_date: str) -> Dict[str, Any]:
         """
@@ -340,39 +452,24 @@ class LogAggregator:
             'events': []
         }
         
-        # Parse dates
+        # Parse dates; a date-only end covers that whole day
         start_dt = datetime.fromisoformat(start_date)
         end_dt = datetime.fromisoformat(end_date)
+        if len(end_date) == 10:
+            end_dt = end_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
         
-        # Get all log files in the date range
-        for log_file in self.logs_path.glob("log_*.json"):
-            # Extract date from filename
-            date_str = log_file.stem.replace('log_', '')
-            try:
-                log_date = datetime.strptime(date_str, '%Y-%m-%d')
-                if start_dt <= log_date <= end_dt:
-                    # Read and process this log file
-                    try:
-                        with open(log_file, 'r', encoding='utf-8') as f:
-                            logs = json.load(f)
-                        
-                        for log in logs:
-                            timestamp = datetime.fromisoformat(log['timestamp'])
-                            if start_dt <= timestamp <= end_dt:
-                                report['events'].append(log)
-                                
-                                # Update summary
-                                report['summary']['total_events'] += 1
-                                if log['level'] == LogLevel.AUDIT.value:
-                                    report['summary']['audit_events'] += 1
-                                elif log['level'] == LogLevel.ERROR.value:
-                                    report['summary']['errors'] += 1
-                                elif log.get('event_type') == AuditEventType.SECURITY_EVENT.value:
-                                    report['summary']['security_events'] += 1
-                    except (json.JSONDecodeError, FileNotFoundError):
-                        continue
-            except ValueError:
-                continue  # Skip files that don't match the expected format
+        # Stream the log files in the date range (new JSONL and legacy JSON arrays)
+        for log in LogQuery(self.logs_path).search(start_dt, end_dt):
+            report['events'].append(log)
+            
+            # Update summary
+            report['summary']['total_events'] += 1
+            if log.get('level') == LogLevel.AUDIT.value:
+                report['summary']['audit_events'] += 1
+            elif log.get('level') == LogLevel.ERROR.value:
+                report['summary']['errors'] += 1
+            elif log.get('event_type') == AuditEventType.SECURITY_EVENT.value:
+                report['summary']['security_events'] += 1
         
         return report
 
@@ -14,6 +14,7 @@ module.exports = {
       env: {
         VAULT_PATH: VAULT_PATH,
         ORCHESTRATOR_MODE: 'cloud',
+        ORCHESTRATOR_TRIGGER: 'events',
         CLOUD_POLL_INTERVAL: '30',
         PYTHONPATH: './System:./'
       }
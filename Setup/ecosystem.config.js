@@ -62,16 +62,19 @@ module.exports = {
       name: 'orchestrator',
       script: './System/orchestrator.py',
       interpreter: 'python',
-      args: '',
+      args: '--daemon',
       cwd: './',
       autorestart: true,
       watch: false,
       max_memory_restart: '1G',
+      kill_timeout: 10000,
       env: {
         NODE_ENV: 'production',
         PYTHONPATH: './System:./',
         VAULT_PATH: VAULT_PATH,
         ORCHESTRATOR_MODE: 'local',
+        ORCHESTRATOR_TRIGGER: 'events',
+        ORCHESTRATOR_CONCURRENCY: '4',
         PYTHONIOENCODING: 'utf-8',
         PYTHONUNBUFFERED: '1'
       }
@@ -140,6 +143,22 @@ module.exports = {
         ODOO_MCP_PORT: '3006'
       }
     },
+    {
+      name: 'log-archiver',
+      script: './System/log_archive.py',
+      interpreter: 'python',
+      cwd: './',
+      cron_restart: '30 0 * * *',
+      autorestart: false,
+      watch: false,
+      env: {
+        NODE_ENV: 'production',
+        PYTHONPATH: './System:./',
+        VAULT_PATH: VAULT_PATH,
+        PYTHONIOENCODING: 'utf-8',
+        PYTHONUNBUFFERED: '1'
+      }
+    },
     {
       name: 'ceo-briefing',
       script: './System/ceo_briefing.py',
@@ -12,6 +12,9 @@ import requests
 from pathlib import Path
 from datetime import datetime
 
+sys.path.append(str(Path(__file__).resolve().parent.parent / "System"))
+from daily_rollup import record_events
+
 # ── Config ────────────────────────────────────────────────────────────────────
 VAULT_PATH = Path(os.environ.get("VAULT_PATH", "F:/AI_Employee_Vault/AI_Employee_Vault - Copy"))
 ENV_FILE   = VAULT_PATH / ".env"
@@ -280,6 +283,7 @@ posted_at: {datetime.now().isoformat()}
 
 {post_text}
 """, encoding="utf-8")
+        record_events(VAULT_PATH / "Logs", [("social", "linkedin")])
     else:
         print(f"LinkedIn post failed: {result.get('error')}")
         log_action("linkedin_post_failed", result)
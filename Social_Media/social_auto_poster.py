@@ -8,17 +8,22 @@ Runs via PM2 cron: 10am Mon-Fri
 """
 
 import os
-import json
 import hmac
 import hashlib
 import base64
 import uuid
 import time
 import requests
+import sys
 import urllib.parse
 from pathlib import Path
 from datetime import datetime
 
+sys.path.append(str(Path(__file__).resolve().parent.parent / "System"))
+from log_store import append_entry, daily_log_path
+from odoo_outbox import OdooOutbox
+from daily_rollup import record_events
+
 # ── Config ────────────────────────────────────────────────────────────────────
 VAULT_PATH = Path(os.environ.get("VAULT_PATH", "F:/AI_Employee_Vault/AI_Employee_Vault - Copy"))
 ENV_FILE   = VAULT_PATH / ".env"
@@ -27,6 +32,8 @@ LOGS_DIR   = VAULT_PATH / "Logs"
 PENDING    = VAULT_PATH / "Pending_Approval"
 GOALS_FILE = VAULT_PATH / "Business_Goals.md"
 ODOO_MCP   = "http://localhost:3006/log-activity"
+# Shared with the orchestrator: events this run can't deliver are sent by its outbox sender
+ODOO_OUTBOX = OdooOutbox(LOGS_DIR / "odoo_outbox.db", url=ODOO_MCP)
 
 
 # ── Load .env ─────────────────────────────────────────────────────────────────
@@ -213,6 +220,7 @@ posted_at: {datetime.now().isoformat()}
 
 {post_text}
 """, encoding="utf-8")
+        record_events(LOGS_DIR, [("social", platform.lower())])
         print(f"{platform}: Posted! ID={result.get('post_id')}")
     else:
         # Save failed post to Pending_Approval/<platform>/ for manual review
@@ -236,33 +244,25 @@ Move to /Approved to retry manually.
 """, encoding="utf-8")
         print(f"{platform}: Failed ({result.get('error')}) -> Draft saved to Pending_Approval")
 
-    # JSON log
-    log_file = LOGS_DIR / f"log_{datetime.now().strftime('%Y-%m-%d')}.json"
-    logs = []
-    if log_file.exists():
-        try:
-            logs = json.loads(log_file.read_text(encoding="utf-8"))
-        except Exception:
-            pass
-    logs.append({
+    # JSONL log
+    append_entry(daily_log_path(LOGS_DIR), {
         "timestamp": datetime.now().isoformat(),
         "action_type": f"social_post_{platform}",
         "result": result,
         "platform": platform
     })
-    log_file.write_text(json.dumps(logs, indent=2, ensure_ascii=False), encoding="utf-8")
 
-    # Odoo activity log
-    try:
-        requests.post(ODOO_MCP, json={
-            "source": platform,
-            "subject": f"Social Post — {platform.title()}",
-            "category": "Social Media",
-            "action": "Posted" if result.get("success") else "Failed",
-            "details": f"Post ID: {result.get('post_id', 'N/A')}"
-        }, timeout=3)
-    except Exception:
-        pass
+    # Odoo activity log; the id is tied to the post (or the draft), so a re-run does not log it twice
+    action = "Posted" if result.get("success") else "Failed"
+    item = result.get("post_id") if result.get("success") else None
+    item = item or f"{platform.upper()}_POST_{timestamp}"
+    ODOO_OUTBOX.enqueue({
+        "source": platform,
+        "subject": f"Social Post — {platform.title()}",
+        "category": "Social Media",
+        "action": action,
+        "details": f"Post ID: {result.get('post_id', 'N/A')}"
+    }, event_id=f"{platform}:{action}:{item}")
 
 
 # ── Weekly Summary ─────────────────────────────────────────────────────────────
@@ -325,6 +325,11 @@ def main():
 
     print(f"Summary saved: {summary_file.name}")
 
+    # One batched delivery for this run's Odoo events; anything left is retried by the orchestrator
+    if not ODOO_OUTBOX.flush(timeout=10):
+        print(f"Odoo unreachable: {ODOO_OUTBOX.pending_count()} activity events queued for retry")
+    ODOO_OUTBOX.close(timeout=0)
+
 
 if __name__ == "__main__":
     main()
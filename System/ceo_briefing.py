@@ -2,16 +2,18 @@
 """
 CEO Weekly Briefing Generator — Gold Tier
 Runs every Sunday 11pm via PM2 cron.
-Reads: Done/, Logs/, Plans/, Business_Goals.md, Odoo MCP
+Reads: daily rollup (Logs/.daily_rollup.db), Business_Goals.md, Odoo MCP
 Writes: Briefings/YYYY-MM-DD_Monday_Briefing.md
 Updates: Dashboard.md
 """
 
 import os
-import json
 import requests
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+
+from daily_rollup import DailyRollup
+from dashboard_model import DashboardModel
 
 # ── Config ────────────────────────────────────────────────────────────────────
 VAULT_PATH   = Path(os.environ.get("VAULT_PATH", "F:/AI_Employee_Vault/AI_Employee_Vault - Copy"))
@@ -36,61 +38,27 @@ def load_env():
 
 
 # ── Count weekly activity ─────────────────────────────────────────────────────
-def count_weekly_activity() -> dict:
-    today = datetime.now()
-    week_start = today - timedelta(days=7)
-
-    emails_done    = 0
-    whatsapp_done  = 0
-    files_done     = 0
-    plans_created  = 0
-    social_posts   = 0
-
-    # Count Done folder items from this week
-    for folder, prefix, counter in [
-        (DONE / "Email",    "EMAIL_",    "emails"),
-        (DONE / "WhatsApp", "WHATSAPP_", "whatsapp"),
-        (DONE / "Files",    "FILE_",     "files"),
-    ]:
-        if folder.exists():
-            for f in folder.glob("*.md"):
-                if f.stat().st_mtime > week_start.timestamp():
-                    if counter == "emails":    emails_done += 1
-                    elif counter == "whatsapp": whatsapp_done += 1
-                    elif counter == "files":    files_done += 1
-
-    # Count Plans
-    if PLANS.exists():
-        for f in PLANS.glob("PLAN_*.md"):
-            if f.stat().st_mtime > week_start.timestamp():
-                plans_created += 1
-
-    # Count social posts from Done folder root
-    if DONE.exists():
-        for f in DONE.glob("LINKEDIN_POSTED_*.md"):
-            if f.stat().st_mtime > week_start.timestamp():
-                social_posts += 1
-
-    # Count from logs
-    actions_logged = 0
-    if LOGS.exists():
-        for log_file in LOGS.glob("log_*.json"):
-            try:
-                log_date_str = log_file.stem.replace("log_", "")
-                log_date = datetime.strptime(log_date_str, "%Y-%m-%d")
-                if log_date >= week_start:
-                    entries = json.loads(log_file.read_text(encoding="utf-8"))
-                    actions_logged += len(entries)
-            except Exception:
-                pass
+def count_weekly_activity(days: int = 7) -> dict:
+    """Reads the last `days` days (today included) from the daily rollup instead of rescanning the vault."""
+    today = date.today()
+    week_start = today - timedelta(days=days - 1)
+
+    rollup = DailyRollup(LOGS)
+    rollup.ensure_days(VAULT_PATH, week_start, today)  # one-off backfill of days from before the rollup
+    totals = rollup.totals(week_start, today)
+    rollup.close()
+
+    emails_done   = totals["done"]["Email"]
+    whatsapp_done = totals["done"]["WhatsApp"]
+    files_done    = totals["done"]["Files"]
 
     return {
         "emails_done": emails_done,
         "whatsapp_done": whatsapp_done,
         "files_done": files_done,
-        "plans_created": plans_created,
-        "social_posts": social_posts,
-        "actions_logged": actions_logged,
+        "plans_created": sum(totals["plan"].values()),
+        "social_posts": sum(totals["social"].values()),
+        "actions_logged": sum(totals["action"].values()),
         "total_tasks": emails_done + whatsapp_done + files_done,
     }
 
@@ -260,19 +228,10 @@ Processed **{activity["total_tasks"]} tasks** total — {activity["emails_done"]
 def update_dashboard(briefing_file: Path):
     if not DASHBOARD.exists():
         return
-    content = DASHBOARD.read_text(encoding="utf-8")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-    entry = f"- {timestamp}: CEO Briefing generated → {briefing_file.name}\n"
-
-    if "## Recent Activity" in content:
-        content = content.replace(
-            "## Recent Activity\n",
-            f"## Recent Activity\n{entry}"
-        )
-    else:
-        content += f"\n## Recent Activity\n{entry}"
-
-    DASHBOARD.write_text(content, encoding="utf-8")
+    model = DashboardModel(DASHBOARD).load()
+    model.add_activity(f"{timestamp}: CEO Briefing generated → {briefing_file.name}")
+    model.render()
     print("Dashboard updated with briefing link.")
 
 
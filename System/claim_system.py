@@ -4,79 +4,213 @@ Claim System for AI Employee Coordination
 Implements the claim-by-move rule to prevent double-work between multiple AI agents.
 When an agent finds a task in /Needs_Action/, it attempts to move it to /In_Progress/<agent_name>/
 If successful, the agent owns the task; if not, another agent has already claimed it.
+
+The claim itself is an exclusive create of a marker in /In_Progress/.claims/
+(O_CREAT | O_EXCL is atomic, so exactly one agent wins), followed by an
+os.rename of the task into the agent's folder. The marker directory doubles
+as the claim index: a scan lists Needs_Action and .claims once each instead
+of probing every agent folder for every task.
+
+Claims are leases. The marker's mtime is the heartbeat: renew_leases()
+touches the markers of the tasks an agent holds, usually from
+start_heartbeat()'s background thread. A marker not touched for
+lease_seconds belongs to a dead agent. expire_leases(), which runs as part
+of scan_unclaimed_tasks at most every lease_seconds / 2, returns the task
+to Needs_Action so another agent can pick it up.
 """
 
 import os
+import errno
 import shutil
 import time
 import logging
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List
 
+from work_queue import PriorityWorkQueue
+from state_index import WorkflowIndex
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+CLAIMS_DIR = ".claims"
+LEASE_SECONDS = float(os.environ.get("CLAIM_LEASE_SECONDS", "300"))
+
+
+def atomic_move(source: Path, destination: Path):
+    """os.replace when source and destination share a filesystem, shutil.move otherwise."""
+    try:
+        os.replace(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(str(source), str(destination))
+
+
 class ClaimSystem:
-    def __init__(self, vault_path: str, agent_name: str):
+    def __init__(self, vault_path: str, agent_name: str, lease_seconds: float = LEASE_SECONDS):
         self.vault_path = Path(vault_path)
         self.agent_name = agent_name
         self.needs_action_path = self.vault_path / "Needs_Action"
         self.in_progress_path = self.vault_path / "In_Progress" / agent_name
+        self.claims_path = self.vault_path / "In_Progress" / CLAIMS_DIR
+        self.lease_seconds = lease_seconds
+        self._last_janitor_run = 0.0
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_thread = None
+        self.queue = PriorityWorkQueue()  # unclaimed tasks, most urgent first
+        self.index = WorkflowIndex(self.vault_path)
         self.done_path = self.vault_path / "Done"
         self.pending_approval_path = self.vault_path / "Pending_Approval"
         
         # Create necessary directories if they don't exist
         self.in_progress_path.mkdir(parents=True, exist_ok=True)
-        
+        self.claims_path.mkdir(parents=True, exist_ok=True)
+
+    def claimed_names(self) -> set:
+        """Names of all tasks currently claimed by any agent (one directory listing)"""
+        try:
+            return {entry.name for entry in os.scandir(self.claims_path) if not entry.name.startswith(".")}
+        except FileNotFoundError:
+            return set()
+
     def scan_unclaimed_tasks(self) -> List[Path]:
-        """Scan /Needs_Action/ folder for unclaimed tasks"""
-        unclaimed_tasks = []
-        
-        for file_path in self.needs_action_path.glob("*.md"):
-            # Check if the task is already claimed by looking at other agent folders
-            is_claimed = False
-            
-            # Look for this specific file in other agent's in-progress folders
-            in_progress_base = self.vault_path / "In_Progress"
-            if in_progress_base.exists():
-                for agent_folder in in_progress_base.iterdir():
-                    if agent_folder.is_dir() and agent_folder.name != self.agent_name:
-                        agent_task_path = agent_folder / file_path.name
-                        if agent_task_path.exists():
-                            is_claimed = True
-                            break
-            
-            if not is_claimed:
-                unclaimed_tasks.append(file_path)
-                
-        return unclaimed_tasks
-    
+        """Scan /Needs_Action/ folder for unclaimed tasks, most urgent (by priority and age) first"""
+        if time.time() - self._last_janitor_run >= self.lease_seconds / 2:
+            self.expire_leases()
+        claimed = self.claimed_names()
+        try:
+            with os.scandir(self.needs_action_path) as entries:
+                self.queue.sync((e, None) for e in entries
+                                if e.name.endswith(".md") and e.name not in claimed and e.is_file())
+        except FileNotFoundError:
+            self.queue.sync([])
+        return self.queue.ordered()
+
     def claim_task(self, task_path: Path) -> bool:
         """
         Attempt to claim a task by moving it from Needs_Action to In_Progress/<agent_name>/
         Returns True if successful, False if another agent claimed it first
         """
+        marker = self.claims_path / task_path.name
         destination = self.in_progress_path / task_path.name
-        
+
         try:
-            # Atomic move operation
-            shutil.move(str(task_path), str(destination))
-            logger.info(f"Successfully claimed task: {task_path.name}")
-            
-            # Update the task file with claim information
-            self._update_task_claim_info(destination)
-            
-            return True
-        except FileNotFoundError:
-            # Another agent claimed the task before us
+            # Exclusive create: exactly one agent gets the marker
+            fd = os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
             logger.info(f"Failed to claim task (already claimed): {task_path.name}")
             return False
         except Exception as e:
             logger.error(f"Error claiming task {task_path.name}: {str(e)}")
             return False
-    
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.agent_name)
+
+        try:
+            self.index.move(task_path, destination, mover=atomic_move)
+        except FileNotFoundError:
+            # Processed and moved on (e.g. by the orchestrator) before we got to it
+            self._remove_marker(task_path.name)
+            logger.info(f"Failed to claim task (no longer in Needs_Action): {task_path.name}")
+            return False
+        except Exception as e:
+            self._remove_marker(task_path.name)
+            logger.error(f"Error claiming task {task_path.name}: {str(e)}")
+            return False
+
+        logger.info(f"Successfully claimed task: {task_path.name}")
+        # Update the task file with claim information
+        self._update_task_claim_info(destination)
+        return True
+
+    def _remove_marker(self, name: str):
+        try:
+            (self.claims_path / name).unlink()
+        except FileNotFoundError:
+            pass
+
+    # --- Leases ---
+
+    def renew_leases(self) -> int:
+        """Heartbeat: touches the marker of every task in our In_Progress folder"""
+        renewed = 0
+        for task in self.in_progress_path.glob("*.md"):
+            try:
+                os.utime(self.claims_path / task.name)
+                renewed += 1
+            except FileNotFoundError:
+                logger.warning(f"Lease lost for task {task.name}; it may have been handed to another agent")
+        return renewed
+
+    def start_heartbeat(self, interval: float = None):
+        """Renews our leases from a daemon thread every lease_seconds / 3 until stop_heartbeat()"""
+        interval = interval or self.lease_seconds / 3
+        self._heartbeat_stop.clear()
+
+        def beat():
+            while not self._heartbeat_stop.wait(interval):
+                try:
+                    self.renew_leases()
+                except Exception as e:
+                    logger.error(f"Heartbeat failed: {str(e)}")
+
+        self._heartbeat_thread = threading.Thread(target=beat, name=f"claim-heartbeat-{self.agent_name}", daemon=True)
+        self._heartbeat_thread.start()
+
+    def stop_heartbeat(self):
+        self._heartbeat_stop.set()
+        if self._heartbeat_thread:
+            self._heartbeat_thread.join(timeout=5)
+            self._heartbeat_thread = None
+
+    def expire_leases(self, now: float = None) -> List[str]:
+        """Janitor: returns tasks whose lease ran out to Needs_Action. Safe to run from every agent."""
+        now = now or time.time()
+        self._last_janitor_run = now
+        expired = []
+        try:
+            entries = list(os.scandir(self.claims_path))
+        except FileNotFoundError:
+            return expired
+
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            try:
+                if now - entry.stat().st_mtime < self.lease_seconds:
+                    continue
+                owner = Path(entry.path).read_text(encoding="utf-8").strip()
+                # Take the marker first; the rename succeeds for exactly one janitor
+                taken = self.claims_path / f".{entry.name}.expired.{os.getpid()}.{threading.get_ident()}"
+                os.rename(entry.path, taken)
+                if now - taken.stat().st_mtime < self.lease_seconds:
+                    # Renewed between our stat and the rename: give the lease back
+                    os.link(taken, entry.path)
+                    taken.unlink()
+                    continue
+            except FileNotFoundError:
+                continue  # released, or taken by another janitor
+            except FileExistsError:
+                taken.unlink(missing_ok=True)  # claimed again meanwhile: drop our marker
+                continue
+
+            task = self.vault_path / "In_Progress" / owner / entry.name
+            try:
+                self.index.move(task, self.needs_action_path / entry.name, mover=atomic_move)
+                expired.append(entry.name)
+                logger.warning(f"Lease expired for task {entry.name} (owner: {owner}); returned to Needs_Action")
+            except FileNotFoundError:
+                pass  # the claim never completed or the owner finished just now
+            except Exception as e:
+                logger.error(f"Error returning expired task {entry.name}: {str(e)}")
+            finally:
+                taken.unlink(missing_ok=True)
+        return expired
+
     def _update_task_claim_info(self, task_path: Path):
         """Update the task file with claim information"""
         try:
@@ -132,7 +266,9 @@ claimed_at: {datetime.now().isoformat()}
                 destination = self.vault_path / destination_folder / task_path.name
                 destination.parent.mkdir(parents=True, exist_ok=True)
             
-            shutil.move(str(task_path), str(destination))
+            self.index.move(task_path, destination, mover=atomic_move)
+            # Only drop the claim once the task has left our folder
+            self._remove_marker(task_path.name)
             logger.info(f"Released task: {task_path.name} to {destination_folder}")
         except Exception as e:
             logger.error(f"Error releasing task {task_path.name}: {str(e)}")
@@ -6,19 +6,26 @@ All actions create drafts and approval requests for the Local machine to review.
 """
 
 import os
-import re
 import json
 import time
 import shutil
 from pathlib import Path
 from datetime import datetime
 
+from log_store import append_entry, daily_log_path
+from frontmatter import read_frontmatter
+from work_queue import PriorityWorkQueue
+
 from dotenv import load_dotenv
 load_dotenv()
 
 # --- Configuration ---
 VAULT_ROOT = Path(os.environ.get("VAULT_PATH", "/home/ubuntu/ai-employee-vault"))
 POLL_INTERVAL = int(os.environ.get("CLOUD_POLL_INTERVAL", "30"))  # seconds
+# "poll" re-scans every POLL_INTERVAL; "events" wakes on new files in Needs_Action/Email
+TRIGGER_MODE = os.environ.get("ORCHESTRATOR_TRIGGER", "poll")
+RECONCILE_INTERVAL = int(os.environ.get("CLOUD_RECONCILE_INTERVAL", "300"))  # seconds, events mode
+BATCH_SIZE = int(os.environ.get("CLOUD_BATCH_SIZE", "50"))  # emails drafted per cycle, most urgent first
 
 # Folders
 NEEDS_ACTION_FOLDER = VAULT_ROOT / "Needs_Action"
@@ -42,38 +49,19 @@ for folder in [
 
 
 def read_metadata(filepath: Path) -> dict:
-    """Reads YAML-like metadata from a markdown file's frontmatter."""
-    content = filepath.read_text(encoding='utf-8')
-    match = re.search(r'^---\n(.*?)\n^---', content, re.DOTALL | re.MULTILINE)
-    if match:
-        metadata = {}
-        for line in match.group(1).split('\n'):
-            if ':' in line:
-                key, value = line.split(':', 1)
-                metadata[key.strip()] = value.strip().replace("'", '')
-        return metadata
-    return {}
+    """Reads YAML-like metadata from a markdown file's frontmatter (cached until the file changes)."""
+    return read_frontmatter(filepath)
 
 
 def log_action(action_type: str, details: dict):
-    """Logs an action to a daily JSON log file."""
-    log_file = LOGS_FOLDER / f"cloud_log_{datetime.now().strftime('%Y-%m-%d')}.json"
+    """Appends an action to the daily cloud JSONL log file."""
     log_entry = {
         "timestamp": datetime.now().isoformat(),
         "action_type": action_type,
         "source": "cloud_orchestrator",
         "details": details
     }
-
-    logs = []
-    if log_file.exists():
-        try:
-            logs = json.loads(log_file.read_text(encoding='utf-8'))
-        except json.JSONDecodeError:
-            pass
-
-    logs.append(log_entry)
-    log_file.write_text(json.dumps(logs, indent=2), encoding='utf-8')
+    append_entry(daily_log_path(LOGS_FOLDER, "cloud_log"), log_entry)
     print(f"[CLOUD LOG] {action_type}: {details}")
 
 
@@ -194,14 +182,22 @@ def update_cloud_status(stats: dict):
     status_path.write_text(content, encoding='utf-8')
 
 
-def process_needs_action_emails(stats: dict):
-    """Process all emails in Needs_Action/Email -> create drafts + approval requests."""
-    email_files = list(NEEDS_ACTION_EMAIL.glob('EMAIL_*.md'))
+EMAIL_QUEUE = PriorityWorkQueue()
+
 
-    if not email_files:
-        return
+def process_needs_action_emails(stats: dict) -> bool:
+    """Drafts the most urgent emails in Needs_Action/Email -> drafts + approval requests.
 
-    print(f"[CLOUD] Found {len(email_files)} emails in Needs_Action/Email")
+    Returns True when emails are left over for the next cycle.
+    """
+    with os.scandir(NEEDS_ACTION_EMAIL) as entries:
+        EMAIL_QUEUE.sync((e, None) for e in entries if e.name.startswith('EMAIL_') and e.name.endswith('.md'))
+
+    if not len(EMAIL_QUEUE):
+        return False
+
+    print(f"[CLOUD] Found {len(EMAIL_QUEUE)} emails in Needs_Action/Email")
+    email_files = [path for path, _ in EMAIL_QUEUE.pop_batch(BATCH_SIZE or None)]
 
     for filepath in email_files:
         try:
@@ -250,6 +246,8 @@ def process_needs_action_emails(stats: dict):
                 'error': str(e)
             })
 
+    return len(EMAIL_QUEUE) > 0
+
 
 def run_cloud_orchestrator():
     """Main loop for the cloud orchestrator."""
@@ -259,9 +257,18 @@ def run_cloud_orchestrator():
     print("  All actions create drafts for Local approval.")
     print("=" * 60)
     print(f"  Vault: {VAULT_ROOT}")
-    print(f"  Poll interval: {POLL_INTERVAL}s")
+    if TRIGGER_MODE == "events":
+        print(f"  Trigger: file events (reconcile every {RECONCILE_INTERVAL}s)")
+    else:
+        print(f"  Poll interval: {POLL_INTERVAL}s")
     print("=" * 60)
 
+    watcher = None
+    if TRIGGER_MODE == "events":
+        from vault_events import VaultEventWatcher
+        watcher = VaultEventWatcher([NEEDS_ACTION_EMAIL])
+        watcher.start()
+
     stats = {
         'emails_processed': 0,
         'drafts_created': 0,
@@ -273,11 +280,12 @@ def run_cloud_orchestrator():
     iteration = 0
     while True:
         iteration += 1
+        backlog = False
         try:
             print(f"\n--- Cloud Orchestration Cycle {iteration} ---")
 
-            # Process emails
-            process_needs_action_emails(stats)
+            # Process emails, most urgent first
+            backlog = process_needs_action_emails(stats)
 
             # Update cloud status
             update_cloud_status(stats)
@@ -290,7 +298,12 @@ def run_cloud_orchestrator():
             print(f"[CLOUD ERROR] Cycle {iteration} failed: {e}")
             log_action('cycle_error', {'iteration': iteration, 'error': str(e)})
 
-        time.sleep(POLL_INTERVAL)
+        if backlog:
+            continue  # more queued emails; start the next batch right away
+        if watcher is None:
+            time.sleep(POLL_INTERVAL)
+        elif not watcher.wait(RECONCILE_INTERVAL):
+            print(f"[CLOUD] No new emails in {RECONCILE_INTERVAL}s. Running reconcile scan.")
 
 
 if __name__ == "__main__":
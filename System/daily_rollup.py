@@ -0,0 +1,304 @@
+"""
+Daily Rollup - per-day activity counters, kept up to date as events happen
+
+The weekly briefings only need counts: items done per channel, plans
+created, social posts, actions logged, revenue-related actions and
+subscription charges. Recomputing them meant stat-ing every file in Done/
+and Plans/ and parsing a week of logs on every run. DailyRollup keeps
+them in a small SQLite table (Logs/.daily_rollup.db) with one row per
+(day, metric, key), incremented where the event happens:
+
+  action, category, revenue, subscription - log_store.append_entries, for the main log_ files
+  done, done_type                         - WorkflowIndex, when an item moves into Done
+  plan                                    - orchestrator.create_plan
+  social                                  - the LinkedIn and social auto-posters, after a successful post
+
+A briefing reads the rows of its 7 days, so its cost does not grow with
+history. Days the rollup did not see in full (history from before it
+existed, including the part of the day it was created on) are backfilled
+from the logs and the vault once. The backfill counts the same things as the
+live counters: a Done item counts on the day it entered Done, taken from the
+workflow index (stage_since). Items the index never saw fall back to the file's
+mtime, and a rename keeps that, so for those it is closer to when the item was
+created. Social posts written to Done count as social, not done:
+
+    python System/daily_rollup.py show <vault_path> --days 7
+    python System/daily_rollup.py rebuild <vault_path> --days 30   # recount from disk
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+# --- Configuration ---
+ROLLUP_FILE = ".daily_rollup.db"  # inside Logs/
+ROLLUP_PREFIX = "log"             # only the main daily logs are rolled up
+ENABLED = os.environ.get("LOG_ROLLUP", "1") != "0"
+
+REVENUE_KEYWORDS = ('payment', 'invoice', 'sale', 'revenue', 'income', 'billing')
+SUBSCRIPTION_PATTERNS = {
+    'netflix.com': 'Netflix',
+    'spotify.com': 'Spotify',
+    'adobe.com': 'Adobe Creative Cloud',
+    'notion.so': 'Notion',
+    'slack.com': 'Slack',
+    'microsoft.com': 'Microsoft 365',
+    'google.com': 'Google Workspace',
+    'amazon.com': 'Amazon Prime',
+    'apple.com': 'Apple Services',
+    'dropbox.com': 'Dropbox',
+    'zoom.us': 'Zoom',
+    'salesforce.com': 'Salesforce',
+    'hubspot.com': 'HubSpot',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup (
+    day    TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    key    TEXT NOT NULL,
+    count  INTEGER NOT NULL,
+    PRIMARY KEY (day, metric, key)
+) WITHOUT ROWID;
+-- Days up to the rollup's creation that have been recounted from disk
+CREATE TABLE IF NOT EXISTS rebuilt_days (day TEXT PRIMARY KEY) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+"""
+
+
+def action_key(entry: dict) -> str:
+    """What an entry counts as in the action breakdowns: its action_type, or an audit event's event_type."""
+    return str(entry.get('action_type') or entry.get('event_type') or 'unknown')
+
+
+def entry_counters(entry: dict, text: str = None) -> List[Tuple[str, str]]:
+    """(metric, key) pairs one log entry contributes. text is the entry's serialised JSON."""
+    counters = [("action", action_key(entry))]
+    details = entry.get('details')
+    details = details if isinstance(details, dict) else {}
+    if details.get('category'):
+        counters.append(("category", str(details['category'])))
+    text = (text if text is not None else json.dumps(entry, default=str)).lower()
+    if any(keyword in text for keyword in REVENUE_KEYWORDS):
+        counters.append(("revenue", ""))
+    description = str(details.get('description', '')).lower()
+    for pattern, name in SUBSCRIPTION_PATTERNS.items():
+        if pattern in description:
+            # Charges are rare; each one keeps what the briefing shows about it
+            counters.append(("subscription", json.dumps(
+                [name, details.get('amount', 'N/A'), entry.get('timestamp', 'N/A'), description])))
+    return counters
+
+
+def social_platform(filename: str) -> str:
+    """Platform of a post record the posters write to Done (LINKEDIN_POSTED_*, <PLATFORM>_POST_*), else ''."""
+    if filename.startswith("LINKEDIN_POSTED_"):
+        return "linkedin"
+    if "_POST_" in filename:
+        return filename.split("_POST_", 1)[0].lower()
+    return ""
+
+
+def day_range(start: date, end: date) -> List[str]:
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+class DailyRollup:
+    def __init__(self, logs_folder: Path):
+        self.logs_folder = Path(logs_folder)
+        self.logs_folder.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.logs_folder / ROLLUP_FILE
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), timeout=10, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('created_day', ?)",
+                          (date.today().isoformat(),))
+        self.created_day = self.conn.execute("SELECT value FROM meta WHERE key = 'created_day'").fetchone()[0]
+
+    # --- Writes ---
+
+    def add(self, counts: Dict[Tuple[str, str, str], int], replace_days: Iterable[str] = ()):
+        """Adds {(day, metric, key): n} in one transaction, first clearing replace_days."""
+        replace_days = list(replace_days)
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for day in replace_days:
+                    self.conn.execute("DELETE FROM rollup WHERE day = ?", (day,))
+                self.conn.executemany(
+                    "INSERT INTO rollup (day, metric, key, count) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(day, metric, key) DO UPDATE SET count = count + excluded.count",
+                    [(day, metric, key, n) for (day, metric, key), n in counts.items()])
+                self.conn.executemany("INSERT OR IGNORE INTO rebuilt_days (day) VALUES (?)",
+                                      [(d,) for d in replace_days])
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def record(self, metric: str, key: str = "", n: int = 1, day: str = None):
+        self.add({(day or date.today().isoformat(), metric, key): n})
+
+    # --- Reads ---
+
+    def incomplete_days(self, start: date, end: date) -> List[str]:
+        """Days in start..end the rollup did not count in full: those up to its creation, not yet rebuilt."""
+        with self.lock:
+            rebuilt = {row[0] for row in self.conn.execute(
+                "SELECT day FROM rebuilt_days WHERE day BETWEEN ? AND ?", (start.isoformat(), end.isoformat()))}
+        return [day for day in day_range(start, end) if day <= self.created_day and day not in rebuilt]
+
+    def totals(self, start: date, end: date) -> Dict[str, Counter]:
+        """{metric: Counter(key -> count)} summed over the days start..end (inclusive)."""
+        totals = defaultdict(Counter)
+        with self.lock:
+            for metric, key, count in self.conn.execute(
+                    "SELECT metric, key, SUM(count) FROM rollup WHERE day BETWEEN ? AND ? GROUP BY metric, key",
+                    (start.isoformat(), end.isoformat())):
+                totals[metric][key] = count
+        return totals
+
+    # --- Backfill ---
+
+    def ensure_days(self, vault_root: Path, start: date, end: date) -> List[str]:
+        """Backfills the days in start..end without complete counters; returns them."""
+        missing = self.incomplete_days(start, end)
+        if missing:
+            self.rebuild(vault_root, missing)
+        return missing
+
+    def rebuild(self, vault_root: Path, days: List[str]):
+        """Recounts the given days from the logs and the vault, replacing what the rollup had."""
+        from log_store import iter_entries, iter_log_sources
+        from frontmatter import read_frontmatter
+        from state_index import INDEX_FILE, WorkflowIndex
+
+        vault_root = Path(vault_root)
+        wanted = set(days)
+        counts = Counter()
+        for day in days:
+            day_start = datetime.strptime(day, "%Y-%m-%d")
+            for log_file, skip in iter_log_sources(self.logs_folder, ROLLUP_PREFIX, day_start, day_start):
+                for entry in iter_entries(log_file, skip):
+                    for metric, key in entry_counters(entry):
+                        counts[(day, metric, key)] += 1
+
+        def file_day(path: Path) -> str:
+            return date.fromtimestamp(path.stat().st_mtime).isoformat()
+
+        # When each item entered Done, as recorded by the moves that put it there
+        entered_done = {}
+        if (vault_root / INDEX_FILE).exists():
+            index = WorkflowIndex(vault_root)
+            try:
+                entered_done = {row['path']: row['stage_since'] for row in index.items("Done")}
+            except sqlite3.Error as e:
+                print(f"[ROLLUP] Workflow index unavailable, using file times for Done: {e}")
+            finally:
+                index.close()
+
+        done = vault_root / "Done"
+        if done.exists():
+            for path in done.glob("**/*.md"):
+                platform = social_platform(path.name)
+                if platform:
+                    day = file_day(path)  # written once, when the post went out
+                    if day in wanted:
+                        counts[(day, "social", platform)] += 1
+                    continue
+                since = entered_done.get(path.relative_to(vault_root).as_posix())
+                day = date.fromtimestamp(since).isoformat() if since else file_day(path)
+                if day not in wanted:
+                    continue
+                category = path.parent.name if path.parent != done else ""
+                counts[(day, "done", category)] += 1
+                item_type = read_frontmatter(path).get('type') or path.name.split('_', 1)[0].lower()
+                counts[(day, "done_type", item_type)] += 1
+        plans = vault_root / "Plans"
+        if plans.exists():
+            for path in plans.glob("PLAN_*.md"):
+                day = file_day(path)
+                if day in wanted:
+                    plan_type = str(read_frontmatter(path).get('type', '')).replace('_plan', '')
+                    counts[(day, "plan", plan_type)] += 1
+
+        self.add(counts, replace_days=days)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# --- Process-wide access ---
+
+_rollups = {}
+_rollups_lock = threading.Lock()
+
+
+def rollup_for(logs_folder: Path) -> DailyRollup:
+    """The shared DailyRollup of a logs folder (one connection per process)."""
+    key = str(Path(logs_folder).resolve())
+    with _rollups_lock:
+        if key not in _rollups:
+            _rollups[key] = DailyRollup(Path(logs_folder))
+        return _rollups[key]
+
+
+def record_events(logs_folder: Path, events: Iterable[Tuple[str, str]]):
+    """Counts (metric, key) events for today. Never raises: a missed count must not break the caller."""
+    if not ENABLED:
+        return
+    today = date.today().isoformat()
+    counts = Counter((today, metric, key) for metric, key in events)
+    try:
+        rollup_for(logs_folder).add(counts)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: failed to update daily rollup ({', '.join(m for _, m, _ in counts)}): {e}")
+
+
+def record_log_entries(log_file: Path, day: str, entries: List[dict], lines: List[str]):
+    """Rolls up entries just appended to a main daily log. Called by log_store."""
+    if not ENABLED:
+        return
+    counts = Counter()
+    for entry, line in zip(entries, lines):
+        for metric, key in entry_counters(entry, line):
+            counts[(day, metric, key)] += 1
+    try:
+        rollup_for(Path(log_file).parent).add(counts)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: failed to update daily rollup for {Path(log_file).name}: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daily activity rollup")
+    parser.add_argument("command", choices=["show", "rebuild"])
+    parser.add_argument("vault_path", type=Path)
+    parser.add_argument("--days", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    end = date.today()
+    start = end - timedelta(days=args.days - 1)
+    rollup = DailyRollup(args.vault_path / "Logs")
+    if args.command == "rebuild":
+        rollup.rebuild(args.vault_path, day_range(start, end))
+        print(f"[ROLLUP] Rebuilt {args.days} day(s) from {start} to {end}")
+    else:
+        rollup.ensure_days(args.vault_path, start, end)
+    for metric, counts in sorted(rollup.totals(start, end).items()):
+        if metric != "subscription":
+            print(f"{metric:12s} {sum(counts.values()):6d}  {dict(counts.most_common(5))}")
+    rollup.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
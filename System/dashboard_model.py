@@ -0,0 +1,157 @@
+"""
+Dashboard Model - structured state behind the auto-updated parts of Dashboard.md
+
+Dashboard.md is mostly hand-written. The orchestrator owns two parts of it:
+the "Live Processing Status" counters and the "## Recent Activity" list.
+Those live in a DashboardModel that is persisted to a sidecar JSON file
+(Dashboard.state.json). The activity list is a bounded ring, so the file
+stops growing no matter how long the system runs.
+
+render() only writes when the model changed (or the "Last checked" stamp is
+older than refresh_interval). Both files are written to a temp file and
+renamed into place, so Obsidian or a sync never sees a half-written dashboard.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from pathlib import Path
+from datetime import datetime
+from collections import deque
+
+# --- Configuration ---
+RECENT_LIMIT = int(os.environ.get("DASHBOARD_RECENT_LIMIT", "50"))  # activity lines kept
+REFRESH_INTERVAL = 60  # seconds; re-stamp "Last checked" at least this often
+
+# Live status lines: counter key -> (label regex, label text)
+STATUS_LINES = {
+    "needs_action_emails": (r'- 📧 \*\*Pending emails in Needs_Action\*\*:\s*\d+\n', '- 📧 **Pending emails in Needs_Action**: {}\n'),
+    "needs_action_whatsapp": (r'- 💬 \*\*Pending WhatsApp in Needs_Action\*\*:\s*\d+\n', '- 💬 **Pending WhatsApp in Needs_Action**: {}\n'),
+    "needs_action_files": (r'- 📁 \*\*Pending files in Needs_Action\*\*:\s*\d+\n', '- 📁 **Pending files in Needs_Action**: {}\n'),
+    "pending_approval": (r'- 🔥 \*\*Important pending in Pending_Approval\*\*:\s*\d+\n', '- 🔥 **Important pending in Pending_Approval**: {}\n'),
+}
+LAST_CHECKED = (r'- 🕐 \*\*Last checked\*\*:\s*.*\n', '- 🕐 **Last checked**: {}\n')
+RECENT_HEADER = "## Recent Activity\n"
+# The activity section runs until the next horizontal rule or heading
+RECENT_SECTION = re.compile(r'## Recent Activity\n(.*?)(?=^---|^## |\Z)', re.DOTALL | re.MULTILINE)
+
+
+def atomic_write_text(path: Path, content: str):
+    """Writes content to a hidden temp file next to path, then renames it over path."""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class DashboardModel:
+    """Counters plus a bounded recent-activity ring, rendered into Dashboard.md on change."""
+
+    def __init__(self, dashboard_file: Path, state_file: Path = None,
+                 recent_limit: int = RECENT_LIMIT, refresh_interval: float = REFRESH_INTERVAL):
+        self.dashboard_file = Path(dashboard_file)
+        self.state_file = Path(state_file) if state_file else self.dashboard_file.with_suffix('.state.json')
+        self.refresh_interval = refresh_interval
+        self.counts = {}
+        self.recent = deque(maxlen=recent_limit)
+        self.rendered_at = 0.0
+        self.renders = 0
+        self._new_activity = []   # added since the last load, merged on render
+        self._state_mtime = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def load(self) -> "DashboardModel":
+        """Loads the sidecar, or seeds the ring from the activity already in Dashboard.md."""
+        if self.state_file.exists():
+            self._load_state()
+        elif self.dashboard_file.exists():
+            match = RECENT_SECTION.search(self.dashboard_file.read_text(encoding='utf-8'))
+            if match:
+                lines = [l for l in match.group(1).splitlines() if l.startswith('- ')]
+                self.recent.extend(lines[:self.recent.maxlen])
+        return self
+
+    def _load_state(self):
+        data = json.loads(self.state_file.read_text(encoding='utf-8'))
+        self.counts = data.get('counts', {})
+        self.recent.clear()
+        self.recent.extend(data.get('recent', [])[:self.recent.maxlen])
+        self.rendered_at = data.get('rendered_at', 0.0)
+        self._state_mtime = self.state_file.stat().st_mtime_ns
+
+    def set_counts(self, counts: dict):
+        with self._lock:
+            if counts != self.counts:
+                self.counts = dict(counts)
+                self._dirty = True
+
+    def add_activity(self, line: str):
+        """Adds '- <line>' to the top of Recent Activity."""
+        entry = line if line.startswith('- ') else f"- {line}"
+        with self._lock:
+            self.recent.appendleft(entry)
+            self._new_activity.append(entry)
+            self._dirty = True
+
+    def render(self, force: bool = False) -> bool:
+        """Writes Dashboard.md and the sidecar if anything changed. Returns True if written."""
+        with self._lock:
+            stale = time.time() - self.rendered_at >= self.refresh_interval
+            if not (force or self._dirty or stale):
+                return False
+            if not self.dashboard_file.exists():
+                print(f"Warning: Dashboard file not found at {self.dashboard_file}. Skipping update.")
+                return False
+
+            self._merge_external_activity()
+            content = self.dashboard_file.read_text(encoding='utf-8')
+            content = self._render_status(content)
+            content = self._render_recent(content)
+            atomic_write_text(self.dashboard_file, content)
+
+            self.rendered_at = time.time()
+            atomic_write_text(self.state_file, json.dumps({
+                'counts': self.counts,
+                'recent': list(self.recent),
+                'rendered_at': self.rendered_at,
+            }, ensure_ascii=False, indent=2))
+            self._state_mtime = self.state_file.stat().st_mtime_ns
+            self._new_activity = []
+            self._dirty = False
+            self.renders += 1
+            return True
+
+    def _merge_external_activity(self):
+        """Picks up entries another process (e.g. ceo_briefing) saved since we last loaded."""
+        try:
+            mtime = self.state_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._state_mtime:
+            return
+        counts, new_activity = self.counts, self._new_activity
+        self._load_state()
+        self.counts = counts
+        for entry in reversed(new_activity):
+            self.recent.appendleft(entry)
+
+    def _render_status(self, content: str) -> str:
+        pattern, template = LAST_CHECKED
+        content = re.sub(pattern, template.format(datetime.now().strftime('%Y-%m-%d %H:%M')), content, count=1)
+        for key, (pattern, template) in STATUS_LINES.items():
+            if key in self.counts:
+                content = re.sub(pattern, template.format(self.counts[key]), content, count=1)
+        return content
+
+    def _render_recent(self, content: str) -> str:
+        body = "".join(f"{entry}\n" for entry in self.recent) + "\n"
+        match = RECENT_SECTION.search(content)
+        if match:
+            return content[:match.start(1)] + body + content[match.end(1):]
+        return content.rstrip('\n') + "\n\n" + RECENT_HEADER + body
@@ -2,6 +2,8 @@ import re
 from pathlib import Path
 from datetime import datetime
 
+from vault_snapshot import VaultSnapshot
+
 def update_dashboard(vault_path: str):
     vault_root = Path(vault_path)
     dashboard_file = vault_root / 'Dashboard.md'
@@ -14,11 +16,12 @@ def update_dashboard(vault_path: str):
         print(f"Error: Needs_Action folder not found at {needs_action_folder}")
         return
 
-    # Count pending actions (markdown files in Needs_Action)
-    pending_emails = len(list(needs_action_folder.glob('EMAIL_*.md')))
+    # Count pending actions (markdown files in Needs_Action), from one directory scan
+    snapshot = VaultSnapshot(vault_root, folders=('Needs_Action',), max_depth=1).scan()
+    pending_emails = snapshot.count(needs_action_folder, 'EMAIL_*.md')
     # Assuming other types of pending actions would also be markdown files,
     # you can refine this count if you have other file types.
-    total_pending_actions = len(list(needs_action_folder.glob('*.md')))
+    total_pending_actions = snapshot.count(needs_action_folder, '*.md')
 
     # Read existing dashboard content
     content = dashboard_file.read_text(encoding='utf-8')
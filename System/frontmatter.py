@@ -0,0 +1,110 @@
+"""
+Frontmatter - shared, cached parser for the YAML-style headers on vault .md files
+
+Every workflow file (EMAIL_*.md, WHATSAPP_*.md, approval requests) starts with a
+"---" delimited header. Orchestrators look at the same files cycle after cycle,
+so parsed headers are kept in an LRU cache keyed on (path, mtime_ns, size): an
+unchanged file is never re-read. On a miss only the header is read, in small
+chunks up to the closing "---"; message bodies are never loaded.
+
+Two parsers are available:
+  "simple" - flat "key: value" lines with quotes stripped (what the
+             orchestrators have always used)
+  "yaml"   - yaml.safe_load, for approval requests with nested values
+"""
+
+import os
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+# --- Configuration ---
+CACHE_SIZE = int(os.environ.get("FRONTMATTER_CACHE_SIZE", "4096"))  # parsed headers kept in memory
+CHUNK_SIZE = 4096
+MAX_HEADER_BYTES = 64 * 1024  # give up on a header that never closes
+
+_cache = OrderedDict()  # (path, parser) -> ((mtime_ns, size), metadata)
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def read_header(filepath: Path) -> str:
+    """Returns the text between the opening and closing '---' lines, or None if there is no header."""
+    with open(filepath, 'rb') as f:
+        data = f.read(CHUNK_SIZE)
+        if data.startswith(b'\xef\xbb\xbf'):
+            data = data[3:]
+        if not data.startswith(b'---'):
+            return None
+        # Search from the end of the opening line for a line starting with ---
+        start = data.find(b'\n')
+        while start != -1:
+            end = data.find(b'\n---', start)
+            if end != -1:
+                return data[start + 1:end].decode('utf-8', errors='replace').replace('\r', '')
+            if len(data) >= MAX_HEADER_BYTES:
+                return None
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return None
+            data += chunk
+        return None
+
+
+def parse_simple(header: str) -> dict:
+    """Flat 'key: value' parsing; quotes are stripped from values."""
+    metadata = {}
+    for line in header.split('\n'):
+        if ':' in line:
+            key, value = line.split(':', 1)
+            metadata[key.strip()] = value.strip().replace("'", '')
+    return metadata
+
+
+def parse_yaml(header: str) -> dict:
+    import yaml
+    data = yaml.safe_load(header)
+    return data if isinstance(data, dict) else {}
+
+
+PARSERS = {"simple": parse_simple, "yaml": parse_yaml}
+
+
+def read_frontmatter(filepath: Path, parser: str = "simple") -> dict:
+    """Parsed header of a vault file ({} if it has none), served from cache while the file is unchanged.
+
+    Raises FileNotFoundError if the file is gone.
+    """
+    filepath = Path(filepath)
+    st = os.stat(filepath)
+    signature = (st.st_mtime_ns, st.st_size)
+    key = (str(filepath), parser)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == signature:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return dict(cached[1])
+        _stats["misses"] += 1
+
+    header = read_header(filepath)
+    metadata = PARSERS[parser](header) if header is not None else {}
+
+    with _cache_lock:
+        _cache[key] = (signature, metadata)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return dict(metadata)
+
+
+def cache_info() -> dict:
+    with _cache_lock:
+        return dict(_stats, size=len(_cache))
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+        _stats["hits"] = _stats["misses"] = 0
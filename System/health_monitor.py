@@ -13,6 +13,8 @@ import shutil
 from pathlib import Path
 from datetime import datetime
 
+from log_store import append_entry, daily_log_path
+
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -214,22 +216,12 @@ def write_critical_alert(message: str):
 
 def log_health_check(overall: str, details: dict):
     """Log health check results."""
-    log_file = LOGS_FOLDER / f"health_log_{datetime.now().strftime('%Y-%m-%d')}.json"
     entry = {
         "timestamp": datetime.now().isoformat(),
         "overall": overall,
         "details": details
     }
-
-    logs = []
-    if log_file.exists():
-        try:
-            logs = json.loads(log_file.read_text(encoding='utf-8'))
-        except json.JSONDecodeError:
-            pass
-
-    logs.append(entry)
-    log_file.write_text(json.dumps(logs, indent=2), encoding='utf-8')
+    append_entry(daily_log_path(LOGS_FOLDER, "health_log"), entry)
 
 
 def run_health_check():
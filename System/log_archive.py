@@ -0,0 +1,171 @@
+"""
+Log Archive - compacts closed daily logs into the columnar format
+
+Once a day is over its logs only get read. Keeping them as JSONL (plus
+any gzipped rotations) wastes disk and makes weekly and monthly reports
+re-parse every key of every line. This job merges each closed day's files,
+per prefix (log_, cloud_log_, sync_log_, ...), into one
+<prefix>_YYYY-MM-DD.logc (see log_columnar) and removes the originals.
+log_store reads the result transparently, so LogAggregator, AuditGenerator,
+ceo_briefing and LogQuery need no changes.
+
+The archive is written to a temporary file, checked, and renamed into place
+before any source is removed. It records the size and SHA-256 of the bytes it
+absorbed from each file. If a run dies between the rename and the cleanup, or a
+file is appended to while the day is compacted (its size changed, so it is not
+deleted), the next pass recognises the absorbed prefix by its hash and merges
+only what follows it; readers skip that prefix too (log_store.iter_log_sources).
+A day that gets late entries after compaction is simply merged again with its
+archive. A torn last line, left by a crash mid-write, is dropped with its file.
+
+    python System/log_archive.py                 # compact <VAULT_PATH>/Logs
+    python System/log_archive.py --logs ./Logs --min-age-days 2
+"""
+
+import io
+import os
+import re
+import sys
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from log_store import (ARCHIVE_SUFFIX, LOG_SUFFIX, SUFFIX_ORDER, _parse_entries, absorbed_bytes,
+                       archived_sources, iter_entries, iter_log_files)
+from log_columnar import ColumnarLog, write_columnar
+from log_query import LogQuery
+
+# --- Configuration ---
+VAULT_ROOT = Path(os.environ.get("VAULT_PATH", "F:/AI_Employee_Vault/AI_Employee_Vault"))
+MIN_AGE_DAYS = int(os.environ.get("LOG_ARCHIVE_MIN_AGE_DAYS", "1"))  # 1 = everything before today
+MAX_REMERGES = 3  # passes over a day whose sources keep changing while it is compacted
+
+DAY_FILE = re.compile(r"^(?P<prefix>.+?)_(?P<day>\d{4}-\d{2}-\d{2})\.")
+
+
+def closed_days(logs_folder: Path, min_age_days: int = MIN_AGE_DAYS) -> Dict[Tuple[str, str], List[Path]]:
+    """(prefix, day) -> files, for days at least min_age_days old that are not yet a single archive."""
+    cutoff = (datetime.now() - timedelta(days=min_age_days)).strftime("%Y-%m-%d")
+    days = defaultdict(list)
+    for path in Path(logs_folder).iterdir():
+        match = DAY_FILE.match(path.name)
+        if not match or not path.is_file() or not path.name.endswith(SUFFIX_ORDER):
+            continue
+        if match["day"] <= cutoff:
+            days[(match["prefix"], match["day"])].append(path)
+    return {key: files for key, files in days.items()
+            if not (len(files) == 1 and files[0].suffix == ARCHIVE_SUFFIX)}
+
+
+def _read_source(path: Path, skip: int = 0) -> Tuple[list, dict, int]:
+    """(entries past the first skip bytes, {"size", "sha256"} of the bytes absorbed, bytes read) for one source.
+
+    A JSONL file is absorbed up to its last complete line. An unterminated
+    tail is read but not absorbed: if the file has not grown by the time the
+    sources are removed, it is the torn write of a crash and goes with the
+    file; if it has grown, the next pass parses the finished line.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.suffix != LOG_SUFFIX:
+        # Rotations and legacy arrays are never appended to: all or nothing
+        entries = [] if skip == len(data) else list(iter_entries(path))
+        return entries, {"size": len(data), "sha256": hashlib.sha256(data).hexdigest()}, len(data)
+    complete = data[:data.rfind(b"\n") + 1]
+    text = complete[skip:].decode("utf-8", errors="replace")
+    record = {"size": len(complete), "sha256": hashlib.sha256(complete).hexdigest()}
+    return list(_parse_entries(io.StringIO(text), path)), record, len(data)
+
+
+def compact_day(logs_folder: Path, prefix: str, day: str) -> dict:
+    """Merges every file of one day into <prefix>_<day>.logc and removes the sources.
+
+    A source that changed after it was read (a late append) is kept; "changed"
+    in the result lists them, and compacting the day again merges only what was added.
+    """
+    logs_folder = Path(logs_folder)
+    target = logs_folder / f"{prefix}_{day}{ARCHIVE_SUFFIX}"
+    day_start = datetime.strptime(day, "%Y-%m-%d")
+    files = list(iter_log_files(logs_folder, prefix, day_start, day_start))
+
+    # What a previous run already merged from files it could not (or did not) delete
+    absorbed = {}
+    entries = []
+    if target in files:
+        absorbed = archived_sources(target)
+        entries = list(iter_entries(target))
+    size_before = target.stat().st_size if target in files else 0
+    consumed = {}
+    read = {}
+    for f in files:
+        if f == target:
+            continue
+        skip = absorbed_bytes(f, absorbed.get(f.name))
+        new_entries, consumed[f], read[f] = _read_source(f, skip)
+        entries.extend(new_entries)
+        size_before += read[f] - skip
+
+    tmp = target.with_name(target.name + ".tmp")
+    rows = write_columnar(tmp, entries, meta={"sources": {f.name: record for f, record in consumed.items()}})
+    if ColumnarLog(tmp).rows != len(entries):
+        tmp.unlink()
+        raise RuntimeError(f"archive check failed for {target.name}")
+    os.replace(tmp, target)
+
+    query = LogQuery(logs_folder, prefix)
+    changed = []
+    for f in consumed:
+        try:
+            if f.stat().st_size != read[f]:
+                changed.append(f.name)  # appended to since it was read: not safe to delete
+                continue
+            f.unlink()
+        except FileNotFoundError:
+            pass
+        query.index_path(f).unlink(missing_ok=True)
+    return {"file": target.name, "rows": rows, "sources": len(files), "changed": changed,
+            "bytes_before": size_before, "bytes_after": target.stat().st_size}
+
+
+def compact_logs(logs_folder: Path, min_age_days: int = MIN_AGE_DAYS) -> List[dict]:
+    results = []
+    for (prefix, day), _ in sorted(closed_days(logs_folder, min_age_days).items()):
+        try:
+            result = compact_day(logs_folder, prefix, day)
+            for _ in range(MAX_REMERGES):
+                if not result["changed"]:
+                    break
+                print(f"[ARCHIVE] {', '.join(result['changed'])} changed during compaction; merging again")
+                result = compact_day(logs_folder, prefix, day)
+            results.append(result)
+        except Exception as e:
+            print(f"[ARCHIVE] Failed to compact {prefix}_{day}: {e}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compact closed daily logs into the columnar format")
+    parser.add_argument("--logs", type=Path, default=VAULT_ROOT / "Logs", help="logs folder")
+    parser.add_argument("--min-age-days", type=int, default=MIN_AGE_DAYS)
+    args = parser.parse_args(argv)
+
+    if not args.logs.exists():
+        print(f"[ARCHIVE] No logs folder at {args.logs}")
+        return
+    results = compact_logs(args.logs, args.min_age_days)
+    before = sum(r["bytes_before"] for r in results)
+    after = sum(r["bytes_after"] for r in results)
+    for r in results:
+        print(f"[ARCHIVE] {r['file']}: {r['rows']} entries from {r['sources']} file(s), "
+              f"{r['bytes_before'] / 1024:.1f} KB -> {r['bytes_after'] / 1024:.1f} KB")
+    if results:
+        print(f"[ARCHIVE] {len(results)} day(s) compacted, {before / 1024:.1f} KB -> {after / 1024:.1f} KB")
+    else:
+        print("[ARCHIVE] Nothing to compact")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,195 @@
+"""
+Log Columnar - compact column-oriented encoding for closed daily logs
+
+JSONL repeats every key and every action type, actor and level on every
+line. A closed day never changes again, so log_archive rewrites it once
+into this layout (Logs/<prefix>_YYYY-MM-DD.logc):
+
+    MAGIC | uint32 header length | header (JSON) | column blocks
+
+The header holds the row count and, per top-level field, its encoding and
+where its block is. Each block is zlib-compressed:
+
+  dict - low-cardinality scalars (action_type, actor, level, result, ...):
+         the distinct values are stored once in the header; the block is an
+         array of 16-bit codes, 0 meaning "field absent on this row". Only
+         columns with at most min(MAX_DICT_VALUES, rows / 4) distinct values
+         qualify, so the uncompressed header stays small
+  time - ISO timestamps that round-trip through datetime: an int64 array of
+         microsecond deltas
+  json - anything else (details, high-cardinality scalars such as ids or
+         paths, ...): one JSON document per row, '\n' separated, '' when absent
+
+Counting a day reads only the header. Filtering on dict columns decodes
+only those columns, and the rest are decoded just for the matching rows.
+Readers get back the same dicts they would have read from the JSONL.
+"""
+
+import sys
+import json
+import zlib
+import struct
+from array import array
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional
+
+MAGIC = b"LOGC\x01"
+FORMAT_VERSION = 1
+MAX_DICT_VALUES = 4096  # distinct values a dict column may have (codes are unsigned 16-bit)
+DICT_MIN_REPEAT = 4  # ... and at most one per this many rows
+COMPRESSION_LEVEL = 6
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_ABSENT = object()
+
+
+def _dict_key(value):
+    # 1, 1.0 and True are equal as dict keys but must round-trip distinctly
+    return type(value).__name__, value
+
+
+def _timestamp_micros(value) -> Optional[int]:
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None or parsed.isoformat() != value:
+        return None
+    return (parsed - _EPOCH) // _MICROSECOND
+
+
+def _encode_column(values: list) -> tuple:
+    """(header fields, raw block) for one column; values holds _ABSENT where a row lacks the field."""
+    present = [v for v in values if v is not _ABSENT]
+
+    micros = [_timestamp_micros(v) for v in present] if len(present) == len(values) else [None]
+    if present and None not in micros:
+        deltas = array("q", [micros[0]] + [b - a for a, b in zip(micros, micros[1:])])
+        return {"encoding": "time"}, deltas.tobytes()
+
+    limit = min(MAX_DICT_VALUES, max(1, len(values) // DICT_MIN_REPEAT))
+    if all(v is None or isinstance(v, (str, int, float, bool)) for v in present):
+        codes_of = {}
+        dictionary = []
+        for v in present:
+            key = _dict_key(v)
+            if key not in codes_of:
+                codes_of[key] = len(dictionary) + 1
+                dictionary.append(v)
+                if len(dictionary) > limit:
+                    break
+        if len(dictionary) <= limit:
+            codes = array("H", [0 if v is _ABSENT else codes_of[_dict_key(v)] for v in values])
+            return {"encoding": "dict", "values": dictionary}, codes.tobytes()
+
+    lines = ["" if v is _ABSENT else json.dumps(v, default=str) for v in values]
+    return {"encoding": "json"}, "\n".join(lines).encode("utf-8")
+
+
+def write_columnar(path: Path, entries: Iterable[dict], meta: dict = None) -> int:
+    """Writes entries to path in the columnar layout; returns the row count.
+
+    meta is stored as-is in the header (log_archive records the files a day was built from).
+    """
+    entries = [e for e in entries if isinstance(e, dict)]
+    names = list(dict.fromkeys(name for entry in entries for name in entry))
+
+    columns, blocks, offset = [], [], 0
+    for name in names:
+        encoding, raw = _encode_column([entry.get(name, _ABSENT) for entry in entries])
+        block = zlib.compress(raw, COMPRESSION_LEVEL)
+        columns.append({"name": name, **encoding, "offset": offset, "length": len(block)})
+        blocks.append(block)
+        offset += len(block)
+
+    header = json.dumps({"version": FORMAT_VERSION, "rows": len(entries), "byteorder": sys.byteorder,
+                         "columns": columns, "meta": meta or {}}, separators=(",", ":")).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for block in blocks:
+            f.write(block)
+    return len(entries)
+
+
+class ColumnarLog:
+    """Reader for one .logc file. Blocks are read lazily, one column at a time."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            prefix = f.read(len(MAGIC) + 4)
+            if len(prefix) < len(MAGIC) + 4 or not prefix.startswith(MAGIC):
+                raise ValueError(f"{self.path} is not a columnar log")
+            (header_length,) = struct.unpack("<I", prefix[len(MAGIC):])
+            self.header = json.loads(f.read(header_length))
+        self.data_start = len(MAGIC) + 4 + header_length
+        self.rows = self.header["rows"]
+        self.columns = {column["name"]: column for column in self.header["columns"]}
+
+    def _raw(self, column: dict) -> bytes:
+        with open(self.path, "rb") as f:
+            f.seek(self.data_start + column["offset"])
+            return zlib.decompress(f.read(column["length"]))
+
+    def _array(self, column: dict, typecode: str) -> array:
+        values = array(typecode)
+        values.frombytes(self._raw(column))
+        if self.header["byteorder"] != sys.byteorder:
+            values.byteswap()
+        return values
+
+    def column(self, name: str) -> list:
+        """Every row's value of one field (_ABSENT where the row lacks it)."""
+        column = self.columns.get(name)
+        if column is None:
+            return [_ABSENT] * self.rows
+        encoding = column["encoding"]
+        if encoding == "dict":
+            lookup = [_ABSENT] + column["values"]
+            return [lookup[code] for code in self._array(column, "H")]
+        if encoding == "time":
+            values, total = [], 0
+            for delta in self._array(column, "q"):
+                total += delta
+                values.append((_EPOCH + total * _MICROSECOND).isoformat())
+            return values
+        lines = self._raw(column).decode("utf-8").split("\n")
+        return [_ABSENT if line == "" else line for line in lines]  # decoded per selected row
+
+    def matching_rows(self, where: Dict[str, object]) -> Optional[List[int]]:
+        """Rows whose dict-encoded fields equal where; None if no condition could be pushed down."""
+        selected = None
+        for name, value in where.items():
+            column = self.columns.get(name)
+            if column is None:
+                return []
+            if column["encoding"] != "dict":
+                continue
+            wanted = [i + 1 for i, v in enumerate(column["values"]) if _dict_key(v) == _dict_key(value)]
+            if not wanted:
+                return []
+            code = wanted[0]
+            rows = {i for i, c in enumerate(self._array(column, "H")) if c == code}
+            selected = rows if selected is None else selected & rows
+            if not selected:
+                return []
+        return None if selected is None else sorted(selected)
+
+    def iter_rows(self, where: Dict[str, object] = None) -> Iterator[dict]:
+        rows = self.matching_rows(where) if where else None
+        if rows == []:
+            return
+        columns = [(name, self.column(name), self.columns[name]["encoding"] == "json")
+                   for name in self.columns]
+        for i in (range(self.rows) if rows is None else rows):
+            entry = {}
+            for name, values, is_json in columns:
+                value = values[i]
+                if value is not _ABSENT:
+                    entry[name] = json.loads(value) if is_json else value
+            yield entry
+
@@ -0,0 +1,171 @@
+"""
+Log Query - date-pruned, index-assisted streaming search over the daily logs
+
+Daily logs are partitioned by date in their file names, so a date range
+picks its files without opening any others (log_store.iter_log_sources). For
+each day it touches, LogQuery decides how much of the file it has to read:
+
+  - days entirely inside the range need no per-entry timestamp checks; only
+    the first and last day parse timestamps, and each one only once
+  - filters on action_type, level and actor are answered from a per-day
+    sidecar index (Logs/.index/<log file>.idx). The index maps each value
+    to the byte offsets of its lines, so the query seeks straight to the
+    matching records, and a day without the value is skipped unread
+
+Sidecars are built the first time a day is queried, then extended
+incrementally: JSONL logs are append-only, so only the bytes past the
+indexed size are read. If a file is replaced (e.g. by rotation), its first
+bytes change and the sidecar is rebuilt. Days compacted by log_archive need no
+sidecar: their dictionary-encoded columns are filtered directly. Legacy JSON
+arrays and gzipped rotations have no line offsets and are simply streamed.
+Results are generators throughout, so memory does not grow with the number
+of days searched.
+"""
+
+import os
+import json
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from log_store import ARCHIVE_SUFFIX, LOG_SUFFIX, iter_entries, iter_log_sources, log_file_date
+from log_columnar import ColumnarLog
+
+# --- Configuration ---
+INDEXED_FIELDS = ("action_type", "level", "actor")
+INDEX_DIR = ".index"
+INDEX_VERSION = 1
+HEAD_BYTES = 64  # identifies the file an index was built from
+
+
+def _head(f) -> str:
+    f.seek(0)
+    return f.read(HEAD_BYTES).hex()
+
+
+def _index_lines(f, offset: int, postings: Dict[str, Dict[str, List[int]]]) -> int:
+    """Adds the complete lines from offset on to postings; returns the offset after the last one."""
+    f.seek(offset)
+    for line in f:
+        if not line.endswith(b"\n"):
+            break  # a write in progress; picked up by the next refresh
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            entry = None
+        if isinstance(entry, dict):
+            for field in INDEXED_FIELDS:
+                value = entry.get(field)
+                if value is not None:
+                    postings[field].setdefault(str(value), []).append(offset)
+        offset += len(line)
+    return offset
+
+
+class LogQuery:
+    def __init__(self, logs_folder: Path, prefix: str = "log", use_index: bool = True):
+        self.logs_folder = Path(logs_folder)
+        self.prefix = prefix
+        self.use_index = use_index
+        self.index_folder = self.logs_folder / INDEX_DIR
+
+    # --- Sidecar indexes ---
+
+    def index_path(self, log_file: Path) -> Path:
+        return self.index_folder / f"{Path(log_file).name}.idx"
+
+    def load_index(self, log_file: Path) -> Optional[dict]:
+        """The up-to-date sidecar index of a JSONL log file, built or extended as needed."""
+        log_file = Path(log_file)
+        index_file = self.index_path(log_file)
+        try:
+            index = json.loads(index_file.read_text(encoding="utf-8"))
+            if index.get("version") != INDEX_VERSION:
+                index = None
+        except (FileNotFoundError, ValueError):
+            index = None
+
+        try:
+            f = open(log_file, "rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            head = _head(f)
+            if index and index["size"] == size and index["head"] == head[:len(index["head"])]:
+                return index
+            if not index or index["size"] > size or index["head"] != head[:len(index["head"])]:
+                index = {"version": INDEX_VERSION, "size": 0, "head": "",
+                         "postings": {field: {} for field in INDEXED_FIELDS}}
+            indexed = _index_lines(f, index["size"], index["postings"])
+            if indexed == index["size"] and index["head"]:
+                return index
+            index["size"], index["head"] = indexed, head
+
+        self.index_folder.mkdir(parents=True, exist_ok=True)
+        tmp = index_file.with_name(f"{index_file.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, index_file)
+        return index
+
+    def _offsets(self, index: dict, filters: dict) -> Optional[List[int]]:
+        """Sorted offsets of lines matching every indexed filter, or None if no filter is indexed."""
+        matched = None
+        for field in INDEXED_FIELDS:
+            if filters.get(field) is None:
+                continue
+            offsets = index["postings"][field].get(str(filters[field]), ())
+            matched = set(offsets) if matched is None else matched.intersection(offsets)
+            if not matched:
+                return []
+        return None if matched is None else sorted(matched)
+
+    # --- Queries ---
+
+    def _day_entries(self, log_file: Path, filters: dict, skip: int = 0) -> Iterator[dict]:
+        if log_file.suffix == ARCHIVE_SUFFIX and filters:
+            # Compacted days filter on their dictionary-encoded columns instead
+            try:
+                archive = ColumnarLog(log_file)
+            except (FileNotFoundError, ValueError):
+                archive = None
+            if archive:
+                yield from archive.iter_rows(where=filters)
+                return
+        if self.use_index and log_file.suffix == LOG_SUFFIX and any(filters.get(f) is not None for f in INDEXED_FIELDS):
+            index = self.load_index(log_file)
+            offsets = self._offsets(index, filters) if index else None
+            if offsets is not None:
+                with open(log_file, "rb") as f:
+                    for offset in offsets:
+                        if offset < skip:
+                            continue  # already in the day's archive
+                        f.seek(offset)
+                        yield json.loads(f.readline())
+                return
+        yield from iter_entries(log_file, skip)
+
+    def search(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+               **filters) -> Iterator[dict]:
+        """Streams entries with start <= timestamp <= end whose fields equal every given filter.
+
+        Filters on INDEXED_FIELDS use the sidecar indexes; any other field is
+        compared after reading. A filter value of None means "any".
+        """
+        filters = {field: value for field, value in filters.items() if value is not None}
+        for log_file, skip in iter_log_sources(self.logs_folder, self.prefix, start, end):
+            day = log_file_date(log_file, self.prefix)
+            # Only boundary days need the per-entry timestamp check
+            check_start = start is not None and day < start
+            check_end = end is not None and end < day + timedelta(days=1) - timedelta(microseconds=1)
+            for entry in self._day_entries(log_file, filters, skip):
+                if any(entry.get(field) != value for field, value in filters.items()):
+                    continue
+                if check_start or check_end:
+                    try:
+                        timestamp = datetime.fromisoformat(entry["timestamp"])
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    if (check_start and timestamp < start) or (check_end and timestamp > end):
+                        continue
+                yield entry
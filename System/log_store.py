@@ -0,0 +1,270 @@
+"""
+Log Store - Append-only JSONL daily logs
+
+Every component writes one JSON object per line to Logs/<prefix>_YYYY-MM-DD.jsonl.
+Appending a line is O(1), unlike the old read-modify-write of a whole JSON array.
+Readers accept the new .jsonl files, the legacy log_YYYY-MM-DD.json arrays, gzipped
+rotations of either (.gz) and closed days compacted by log_archive (.logc, see
+log_columnar), so callers never need to know which form a day is stored in.
+While a file an archive has absorbed is still on disk (log_archive removes it
+right after writing the archive, or keeps it if it grew meanwhile),
+iter_log_sources tells readers how much of it to skip so no entry is read twice.
+
+Fsync policy (LOG_FSYNC env var):
+  always   - fsync after every append (safest, slowest)
+  interval - fsync at most once every LOG_FSYNC_INTERVAL seconds per file (default)
+  never    - leave flushing to the OS
+"""
+
+import io
+import os
+import gzip
+import json
+import hashlib
+import time
+import threading
+import itertools
+from pathlib import Path
+from datetime import datetime, date
+from typing import Iterable, Iterator, Optional, Tuple
+
+from log_columnar import ColumnarLog
+from daily_rollup import ROLLUP_PREFIX, record_log_entries
+
+# --- Configuration ---
+FSYNC_POLICY = os.environ.get("LOG_FSYNC", "interval")  # "always", "interval" or "never"
+FSYNC_INTERVAL = float(os.environ.get("LOG_FSYNC_INTERVAL", "1.0"))  # seconds
+
+LOG_SUFFIX = ".jsonl"
+LEGACY_SUFFIX = ".json"
+GZIP_SUFFIX = ".gz"
+ARCHIVE_SUFFIX = ".logc"
+# Order of a day's files when reading: compacted archive, legacy array, rotated segments, live log
+SUFFIX_ORDER = (ARCHIVE_SUFFIX, LEGACY_SUFFIX, GZIP_SUFFIX, LOG_SUFFIX)
+
+_last_fsync = {}
+_fsync_lock = threading.Lock()
+
+
+def daily_log_path(logs_folder: Path, prefix: str = "log", day: Optional[date] = None) -> Path:
+    """Returns the JSONL log file for a given day (today by default)."""
+    day = day or datetime.now()
+    return Path(logs_folder) / f"{prefix}_{day.strftime('%Y-%m-%d')}{LOG_SUFFIX}"
+
+
+def _should_fsync(log_file: Path) -> bool:
+    if FSYNC_POLICY == "always":
+        return True
+    if FSYNC_POLICY == "never":
+        return False
+    now = time.monotonic()
+    with _fsync_lock:
+        last = _last_fsync.get(log_file)
+        if last is None or now - last >= FSYNC_INTERVAL:
+            _last_fsync[log_file] = now
+            return True
+    return False
+
+
+def append_entries(log_file: Path, entries: Iterable[dict]):
+    """Appends entries to a JSONL log file in a single write.
+
+    Entries of the main daily logs are also counted in the daily rollup (see daily_rollup).
+    """
+    entries = list(entries)
+    lines = [json.dumps(entry, ensure_ascii=False, default=str) for entry in entries]
+    payload = "".join(line + "\n" for line in lines)
+    if not payload:
+        return
+    log_file = Path(log_file)
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_file, "ab") as f:
+        f.write(payload.encode("utf-8"))
+        f.flush()
+        if _should_fsync(log_file):
+            os.fsync(f.fileno())
+    day = log_file_date(log_file, ROLLUP_PREFIX)
+    if day is not None and log_file.suffix == LOG_SUFFIX:
+        record_log_entries(log_file, day.strftime("%Y-%m-%d"), entries, lines)
+
+
+def append_entry(log_file: Path, entry: dict):
+    """Appends one entry to a JSONL log file."""
+    append_entries(log_file, [entry])
+
+
+def iter_entries(log_file: Path, skip: int = 0) -> Iterator[dict]:
+    """Yields entries from a JSONL file, a legacy JSON array file, a gzipped copy of
+    either, or a columnar archive.
+
+    Lines that fail to parse (e.g. a torn write after a crash) are skipped, and
+    so are the first skip bytes (see iter_log_sources).
+    """
+    log_file = Path(log_file)
+    if skip:
+        if log_file.suffix != LOG_SUFFIX:
+            return  # rotations and legacy arrays are only ever absorbed whole
+        try:
+            f = open(log_file, "rb")
+        except FileNotFoundError:
+            return
+        f.seek(skip)
+        with io.TextIOWrapper(f, encoding="utf-8") as text:
+            yield from _parse_entries(text, log_file)
+        return
+    if log_file.suffix == ARCHIVE_SUFFIX:
+        try:
+            archive = ColumnarLog(log_file)
+        except FileNotFoundError:
+            return
+        except ValueError as e:
+            print(f"Warning: {e}. Skipping.")
+            return
+        yield from archive.iter_rows()
+        return
+    try:
+        if log_file.suffix == GZIP_SUFFIX:
+            f = gzip.open(log_file, "rt", encoding="utf-8")
+        else:
+            f = open(log_file, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with f:
+        try:
+            yield from _parse_entries(f, log_file)
+        except (EOFError, gzip.BadGzipFile) as e:
+            print(f"Warning: {log_file} is truncated ({e}). Skipping the rest.")
+
+
+def _parse_entries(f, log_file: Path) -> Iterator[dict]:
+    head = f.read(1)
+    while head and head.isspace():
+        head = f.read(1)
+    if not head:
+        return
+    if head == "[":
+        # Legacy format: the whole file is one JSON array
+        try:
+            entries = json.loads(head + f.read())
+        except json.JSONDecodeError:
+            print(f"Warning: {log_file} is corrupted or not valid JSON. Skipping.")
+            return
+        for entry in entries:
+            if isinstance(entry, dict):
+                yield entry
+        return
+    first_line = head + f.readline()
+    for line in itertools.chain([first_line], f):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(entry, dict):
+            yield entry
+
+
+def count_entries(log_file: Path) -> int:
+    """Number of entries in a log file; a columnar archive answers from its header."""
+    log_file = Path(log_file)
+    if log_file.suffix == ARCHIVE_SUFFIX:
+        try:
+            return ColumnarLog(log_file).rows
+        except (FileNotFoundError, ValueError):
+            return 0
+    return sum(1 for _ in iter_entries(log_file))
+
+
+def read_entries(log_file: Path) -> list:
+    """Returns all entries of a log file as a list."""
+    return list(iter_entries(log_file))
+
+
+def log_file_date(log_file: Path, prefix: str = "log") -> Optional[datetime]:
+    """Parses the date out of a <prefix>_YYYY-MM-DD[.segment].<suffix> filename."""
+    name = Path(log_file).name
+    stem = name.split(".", 1)[0]
+    if not stem.startswith(f"{prefix}_"):
+        return None
+    try:
+        return datetime.strptime(stem[len(prefix) + 1:], "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def iter_log_files(logs_folder: Path, prefix: str = "log",
+                   start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> Iterator[Path]:
+    """Yields daily log files (every stored form) whose date falls in [start, end], oldest first.
+
+    Only the filename is used for date filtering, so out-of-range files are never opened.
+    """
+    logs_folder = Path(logs_folder)
+    if not logs_folder.exists():
+        return
+    start_day = start.replace(hour=0, minute=0, second=0, microsecond=0) if start else None
+    files = []
+    for rank, suffix in enumerate(SUFFIX_ORDER):
+        for log_file in logs_folder.glob(f"{prefix}_*{suffix}"):
+            log_date = log_file_date(log_file, prefix)
+            if log_date is None:
+                continue
+            if start_day and log_date < start_day:
+                continue
+            if end and log_date > end:
+                continue
+            files.append((log_date, rank, log_file.name, log_file))
+    for _, _, _, log_file in sorted(files):
+        yield log_file
+
+
+def archived_sources(archive: Path) -> dict:
+    """{file name: {"size", "sha256"}} of the bytes a columnar archive absorbed from each source."""
+    try:
+        return ColumnarLog(archive).header.get("meta", {}).get("sources", {})
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def absorbed_bytes(log_file: Path, record) -> int:
+    """How many leading bytes of log_file an archive already holds (0 if none, or if they changed).
+
+    Archives written before sources carried a hash only know the size; their
+    leftovers are read again rather than risk dropping entries.
+    """
+    if not isinstance(record, dict):
+        return 0
+    size = record.get("size", 0)
+    try:
+        with open(log_file, "rb") as f:
+            head = f.read(size)
+    except FileNotFoundError:
+        return 0
+    return size if len(head) == size and hashlib.sha256(head).hexdigest() == record.get("sha256") else 0
+
+
+def iter_log_sources(logs_folder: Path, prefix: str = "log",
+                     start: Optional[datetime] = None,
+                     end: Optional[datetime] = None) -> Iterator[Tuple[Path, int]]:
+    """Like iter_log_files, paired with how many leading bytes of each file its day's archive holds.
+
+    Pass the count to iter_entries as skip. It is 0 unless the file is a
+    source the archive absorbed that has not been removed yet.
+    """
+    sources = {}
+    for log_file in iter_log_files(logs_folder, prefix, start, end):
+        if log_file.suffix == ARCHIVE_SUFFIX:
+            sources = archived_sources(log_file)  # a day's archive sorts before its other files
+            yield log_file, 0
+        else:
+            yield log_file, absorbed_bytes(log_file, sources.get(log_file.name))
+
+
+def iter_logs(logs_folder: Path, prefix: str = "log",
+              start: Optional[datetime] = None,
+              end: Optional[datetime] = None) -> Iterator[dict]:
+    """Streams entries from all daily log files in the date range."""
+    for log_file, skip in iter_log_sources(logs_folder, prefix, start, end):
+        yield from iter_entries(log_file, skip)
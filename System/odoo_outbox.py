@@ -0,0 +1,228 @@
+"""
+Odoo Outbox - durable, batched delivery of activity events to the Odoo MCP server
+
+Callers enqueue an event and return immediately: the event is committed to a
+small SQLite outbox first, then a background sender delivers it over one
+keep-alive HTTP session. Failed deliveries stay in the outbox and are retried
+with exponential backoff, including across restarts, so nothing is dropped
+when Odoo is down.
+
+Every event carries an "id". Enqueueing the same id twice is a no-op, and the
+id is sent along so the server can discard the rare duplicate delivery (e.g. a
+crash between a successful POST and the outbox delete).
+
+If ODOO_MCP_BATCH_URL is set, up to OUTBOX_BATCH_SIZE events are POSTed in one
+request as {"events": [...]}; otherwise they are POSTed one by one to the
+regular /log-activity endpoint on the shared session.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from pathlib import Path
+
+import requests
+
+# --- Configuration ---
+ODOO_ACTIVITY_URL = os.environ.get("ODOO_MCP_URL", "http://localhost:3006/log-activity")
+ODOO_BATCH_URL = os.environ.get("ODOO_MCP_BATCH_URL", "")
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_FLUSH_INTERVAL = float(os.environ.get("OUTBOX_FLUSH_INTERVAL", "1.0"))  # seconds
+REQUEST_TIMEOUT = 5  # seconds
+RETRY_BASE = 2.0     # seconds, doubled per failed attempt
+RETRY_MAX = 300.0    # seconds
+CLAIM_LEASE = 30.0   # seconds a sender holds rows it is delivering
+
+
+class OdooOutbox:
+    """SQLite-backed outbox with a background sender thread."""
+
+    def __init__(self, db_path: Path, url: str = ODOO_ACTIVITY_URL, batch_url: str = ODOO_BATCH_URL,
+                 batch_size: int = OUTBOX_BATCH_SIZE, flush_interval: float = OUTBOX_FLUSH_INTERVAL,
+                 retry_base: float = RETRY_BASE, retry_max: float = RETRY_MAX):
+        self.db_path = Path(db_path)
+        self.url = url
+        self.batch_url = batch_url
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.sent = 0
+        self.failed_attempts = 0
+        self._conn = None
+        self._session = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Storage ---
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Several processes (orchestrator, social poster) may share one outbox
+            self._conn = sqlite3.connect(str(self.db_path), timeout=10, check_same_thread=False,
+                                         isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (next_attempt)")
+        return self._conn
+
+    def enqueue(self, event: dict, event_id: str = None) -> str:
+        """Durably stores an event for delivery. Returns its id."""
+        event_id = event_id or event.get("id") or uuid.uuid4().hex
+        event = dict(event, id=event_id)
+        now = time.time()
+        with self._lock:
+            self._db().execute(
+                "INSERT OR IGNORE INTO outbox (id, payload, created, next_attempt) VALUES (?, ?, ?, ?)",
+                (event_id, json.dumps(event), now, now),
+            )
+        self._wake.set()
+        return event_id
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def _claim_due(self) -> list:
+        """Leases up to batch_size due rows so a second sender process skips them."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = db.execute(
+                    "SELECT id, payload, attempts FROM outbox WHERE next_attempt <= ? "
+                    "ORDER BY created LIMIT ?", (now, self.batch_size),
+                ).fetchall()
+                db.executemany("UPDATE outbox SET next_attempt = ? WHERE id = ?",
+                               [(now + CLAIM_LEASE, row[0]) for row in rows])
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return rows
+
+    def _mark_sent(self, ids: list):
+        if not ids:
+            return
+        with self._lock:
+            self._db().executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+        self.sent += len(ids)
+
+    def _mark_failed(self, rows: list):
+        now = time.time()
+        with self._lock:
+            self._db().executemany(
+                "UPDATE outbox SET attempts = ?, next_attempt = ? WHERE id = ?",
+                [(attempts + 1, now + min(self.retry_base * (2 ** attempts), self.retry_max), event_id)
+                 for event_id, _, attempts in rows],
+            )
+        self.failed_attempts += 1
+
+    def _next_due_in(self) -> float:
+        with self._lock:
+            row = self._db().execute("SELECT MIN(next_attempt) FROM outbox").fetchone()
+        if row[0] is None:
+            return self.flush_interval
+        return max(0.0, min(row[0] - time.time(), self.flush_interval))
+
+    # --- Delivery ---
+
+    def _deliver(self, events: list) -> int:
+        """Sends events in order. Returns how many were accepted before the first failure."""
+        if self._session is None:
+            self._session = requests.Session()
+        if self.batch_url:
+            response = self._session.post(self.batch_url, json={"events": events}, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            return len(events)
+        delivered = 0
+        for event in events:
+            try:
+                response = self._session.post(self.url, json=event, timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
+            except requests.RequestException:
+                if delivered == 0:
+                    raise
+                break
+            delivered += 1
+        return delivered
+
+    def send_pending(self) -> int:
+        """Delivers one batch of due events. Returns the number delivered."""
+        rows = self._claim_due()
+        if not rows:
+            return 0
+        try:
+            delivered = self._deliver([json.loads(payload) for _, payload, _ in rows])
+        except requests.RequestException as e:
+            print(f"[ODOO] Delivery failed, {len(rows)} events kept for retry: {e}")
+            delivered = 0
+        self._mark_sent([row[0] for row in rows[:delivered]])
+        if delivered < len(rows):
+            self._mark_failed(rows[delivered:])
+        return delivered
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Sends due events until the outbox is empty, a batch fails, or timeout passes.
+
+        Returns True if nothing is left pending.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self.send_pending():
+            pass
+        return self.pending_count() == 0
+
+    # --- Background sender ---
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sender_loop, name="OdooOutboxSender", daemon=True)
+        self._thread.start()
+
+    def _sender_loop(self):
+        while not self._stop.is_set():
+            try:
+                if self.send_pending():
+                    continue  # more may be due; keep draining
+                wait = self._next_due_in()
+            except Exception as e:
+                print(f"[ODOO] Outbox sender error: {e}")
+                wait = self.flush_interval
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def close(self, timeout: float = 5.0):
+        """Stops the sender after a final flush attempt. Undelivered events stay on disk."""
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join(timeout)
+            self._thread = None
+        try:
+            self.flush(timeout)
+        except Exception as e:
+            print(f"[ODOO] Final outbox flush failed: {e}")
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
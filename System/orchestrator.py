@@ -1,9 +1,21 @@
 import os
-import re
-import json
 import time
+import signal
+import argparse
+import threading
 from pathlib import Path
 from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from log_store import append_entry, daily_log_path
+from odoo_outbox import OdooOutbox
+from frontmatter import read_frontmatter, cache_info
+from vault_snapshot import VaultSnapshot
+from dashboard_model import DashboardModel
+from work_queue import PriorityWorkQueue
+from state_index import WorkflowIndex
+from daily_rollup import record_events
 
 # --- Configuration ---
 VAULT_ROOT = Path(os.environ.get("VAULT_PATH", "F:/AI_Employee_Vault/AI_Employee_Vault"))
@@ -29,14 +41,23 @@ LOGS_FOLDER = VAULT_ROOT / "Logs"
 PLANS_FOLDER = VAULT_ROOT / "Plans"
 DASHBOARD_FILE = VAULT_ROOT / "Dashboard.md"
 
+# "poll" re-scans every POLL_INTERVAL seconds; "events" wakes on watchdog file events
+TRIGGER_MODE = os.environ.get("ORCHESTRATOR_TRIGGER", "poll")
+POLL_INTERVAL = 5  # seconds
+RECONCILE_INTERVAL = int(os.environ.get("ORCHESTRATOR_RECONCILE_INTERVAL", "60"))  # seconds, events mode
+WATCHED_FOLDERS = [NEEDS_ACTION_FOLDER, PENDING_APPROVAL_FOLDER, APPROVED_FOLDER, REJECTED_FOLDER]
+CONCURRENCY = int(os.environ.get("ORCHESTRATOR_CONCURRENCY", "4"))  # items processed in parallel, daemon mode
+BATCH_SIZE = int(os.environ.get("ORCHESTRATOR_BATCH_SIZE", "100"))  # Needs_Action items per cycle, most urgent first
+
 MCP_EMAIL_SERVER_URL = "http://localhost:3005/send-email"
 MCP_ODOO_SERVER_URL  = "http://localhost:3006/log-activity"
+ODOO_OUTBOX = OdooOutbox(LOGS_FOLDER / "odoo_outbox.db", url=MCP_ODOO_SERVER_URL)
+STATE_INDEX = WorkflowIndex(VAULT_ROOT)  # opened on first use; every move below goes through STATE_INDEX.move()
 from dotenv import load_dotenv
-import os
 load_dotenv()  # Load environment variables from .env file
 API_KEY = os.getenv("API_KEY", "AIEMCP_RANDOM_KEY_v27RzD0xW4jL9yP7cFqA8sH3nB5gK6tE")  # Use env var with fallback
 
-# Ensure folders exist
+# Ensure folders exist (called once at startup, not on import)
 all_folders = [
     NEEDS_ACTION_FOLDER, NEEDS_ACTION_EMAIL_FOLDER, NEEDS_ACTION_WHATSAPP_FOLDER, NEEDS_ACTION_FILES_FOLDER,
     PENDING_APPROVAL_FOLDER, PENDING_APPROVAL_EMAIL_FOLDER, PENDING_APPROVAL_WHATSAPP_FOLDER, PENDING_APPROVAL_FILES_FOLDER,
@@ -44,92 +65,52 @@ all_folders = [
     REJECTED_FOLDER, DONE_FOLDER, DONE_EMAIL_FOLDER, DONE_WHATSAPP_FOLDER, DONE_FILES_FOLDER,
     LOGS_FOLDER, PLANS_FOLDER
 ]
-for folder in all_folders:
-    folder.mkdir(exist_ok=True)
+
+def ensure_folders():
+    for folder in all_folders:
+        folder.mkdir(parents=True, exist_ok=True)
 
 # --- Helper Functions ---
 
 def read_email_metadata(filepath: Path) -> dict:
-    """Reads metadata from an EMAIL_*.md file."""
-    content = filepath.read_text(encoding='utf-8')
-    match = re.search(r'^---\n(.*?)\n^---', content, re.DOTALL | re.MULTILINE)
-    if match:
-        metadata_str = match.group(1)
-        metadata = {}
-        for line in metadata_str.split('\n'):
-            if ':' in line:
-                key, value = line.split(':', 1)
-                metadata[key.strip()] = value.strip().replace("'", '')
-        return metadata
-    return {}
-
-def update_dashboard_status(recent_sent_emails: list = None):
-    """Updates the dashboard status in Dashboard.md."""
-    if not DASHBOARD_FILE.exists():
-        print(f"Warning: Dashboard file not found at {DASHBOARD_FILE}. Skipping update.")
-        return
-
-    content = DASHBOARD_FILE.read_text(encoding='utf-8')
+    """Reads metadata from an EMAIL_*.md file (cached until the file changes)."""
+    return read_frontmatter(filepath)
+
+def update_dashboard_status(recent_sent_emails: list = None, state=None, snapshot: VaultSnapshot = None):
+    """Updates the dashboard status in Dashboard.md.
+
+    Counts come from the cycle's VaultSnapshot (one is taken if not given) and
+    go into the DashboardModel, which only rewrites the file when something changed.
+    """
+    snapshot = snapshot or VaultSnapshot(VAULT_ROOT).scan()
 
     # Count all types of pending items in Needs_Action
-    pending_needs_action_emails = len(list(NEEDS_ACTION_EMAIL_FOLDER.glob('EMAIL_*.md')))
-    pending_needs_action_whatsapp = len(list(NEEDS_ACTION_WHATSAPP_FOLDER.glob('WHATSAPP_*.md')))
-    pending_needs_action_files = len(list(NEEDS_ACTION_FILES_FOLDER.glob('FILE_*.md')))
+    pending_needs_action_emails = snapshot.count(NEEDS_ACTION_EMAIL_FOLDER, 'EMAIL_*.md')
+    pending_needs_action_whatsapp = snapshot.count(NEEDS_ACTION_WHATSAPP_FOLDER, 'WHATSAPP_*.md')
+    pending_needs_action_files = snapshot.count(NEEDS_ACTION_FILES_FOLDER, 'FILE_*.md')
     total_pending_needs_action = pending_needs_action_emails + pending_needs_action_whatsapp + pending_needs_action_files
     
     # Count all types of pending items in Pending_Approval
-    pending_approval_emails = len(list(PENDING_APPROVAL_EMAIL_FOLDER.glob('EMAIL_*.md')))
-    pending_approval_whatsapp = len(list(PENDING_APPROVAL_WHATSAPP_FOLDER.glob('WHATSAPP_*.md')))
-    pending_approval_files = len(list(PENDING_APPROVAL_FILES_FOLDER.glob('FILE_*.md')))
+    pending_approval_emails = snapshot.count(PENDING_APPROVAL_EMAIL_FOLDER, 'EMAIL_*.md')
+    pending_approval_whatsapp = snapshot.count(PENDING_APPROVAL_WHATSAPP_FOLDER, 'WHATSAPP_*.md')
+    pending_approval_files = snapshot.count(PENDING_APPROVAL_FILES_FOLDER, 'FILE_*.md')
     total_pending_approval = pending_approval_emails + pending_approval_whatsapp + pending_approval_files
 
-    current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
-    content = re.sub(
-        r'- 🕐 \*\*Last checked\*\*:\s*.*\n',
-        f'- 🕐 **Last checked**: {current_time}\n',
-        content,
-        count=1
-    )
-    content = re.sub(
-        r'- 📧 \*\*Pending emails in Needs_Action\*\*:\s*\d+\n',
-        f'- 📧 **Pending emails in Needs_Action**: {pending_needs_action_emails}\n',
-        content,
-        count=1
-    )
-    content = re.sub(
-        r'- 💬 \*\*Pending WhatsApp in Needs_Action\*\*:\s*\d+\n',
-        f'- 💬 **Pending WhatsApp in Needs_Action**: {pending_needs_action_whatsapp}\n',
-        content,
-        count=1
-    )
-    content = re.sub(
-        r'- 📁 \*\*Pending files in Needs_Action\*\*:\s*\d+\n',
-        f'- 📁 **Pending files in Needs_Action**: {pending_needs_action_files}\n',
-        content,
-        count=1
-    )
-    content = re.sub(
-        r'- 🔥 \*\*Important pending in Pending_Approval\*\*:\s*\d+\n',
-        f'- 🔥 **Important pending in Pending_Approval**: {total_pending_approval}\n',
-        content,
-        count=1
-    )
-
-    if recent_sent_emails:
-        recent_activity_section_start = re.search(r'## Recent Activity\n', content)
-        if recent_activity_section_start:
-            insert_index = recent_activity_section_start.end()
-            new_entries = []
-            for timestamp, to, subject in recent_sent_emails:
-                new_entries.append(f"- {timestamp}: Sent email to {to} - Subject: {subject}\n")
-            content = content[:insert_index] + "".join(new_entries) + content[insert_index:]
-        else:
-            content += "\n## Recent Activity\n"
-            for timestamp, to, subject in recent_sent_emails:
-                content += f"- {timestamp}: Sent email to {to} - Subject: {subject}\n"
+    counts = {
+        'needs_action_emails': pending_needs_action_emails,
+        'needs_action_whatsapp': pending_needs_action_whatsapp,
+        'needs_action_files': pending_needs_action_files,
+        'pending_approval': total_pending_approval,
+    }
+    model = state.dashboard if state is not None else DashboardModel(DASHBOARD_FILE).load()
+    model.set_counts(counts)
+    for timestamp, to, subject in reversed(recent_sent_emails or []):
+        model.add_activity(f"{timestamp}: Sent email to {to} - Subject: {subject}")
 
-    DASHBOARD_FILE.write_text(content, encoding='utf-8')
-    print(f"Dashboard updated: Needs Action emails={pending_needs_action_emails}, WhatsApp={pending_needs_action_whatsapp}, Files={pending_needs_action_files}; Pending Approval total={total_pending_approval}.")
+    if model.render():
+        print(f"Dashboard updated: Needs Action emails={pending_needs_action_emails}, WhatsApp={pending_needs_action_whatsapp}, Files={pending_needs_action_files}; Pending Approval total={total_pending_approval}.")
+    elif state is not None:
+        state.count('dashboard_writes_skipped')
 
 def create_plan(item_type: str, filename: str, metadata: dict) -> Path:
     """Creates a Plan.md file in /Plans/ for each processed item (Silver tier requirement)."""
@@ -200,6 +181,7 @@ Process {item_type} from **{sender}** — Category: {category}
 - Source: /Needs_Action/{item_type.capitalize()}/{filename}
 """
     plan_file.write_text(content, encoding='utf-8')
+    record_events(LOGS_FOLDER, [("plan", item_type)])
     print(f"Created plan: {plan_name}")
     return plan_file
 
@@ -218,278 +200,436 @@ def with_retry(func, max_attempts=3, base_delay=2):
             time.sleep(wait)
 
 
-def log_to_odoo(source: str, subject: str, category: str, action: str, details: str = ""):
-    """Send activity log to Odoo MCP — shows in Odoo dashboard."""
-    try:
-        import urllib.request, json as _json
-        payload = _json.dumps({
-            "source": source,
-            "subject": subject[:100],
-            "category": category,
-            "action": action,
-            "details": details[:200]
-        }).encode("utf-8")
-        req = urllib.request.Request(
-            MCP_ODOO_SERVER_URL,
-            data=payload,
-            headers={"Content-Type": "application/json"},
-            method="POST"
-        )
-        urllib.request.urlopen(req, timeout=3)
-    except Exception as e:
-        print(f"Odoo log skipped (not critical): {e}")
+def log_to_odoo(source: str, subject: str, category: str, action: str, details: str = "", *, item: str):
+    """Queue an activity log for Odoo MCP — shows in Odoo dashboard. Delivered by the outbox sender.
 
+    The event id is derived from the item, so processing it again (e.g. after a
+    crash before its file move) does not queue a second event.
+    """
+    ODOO_OUTBOX.enqueue({
+        "source": source,
+        "subject": subject[:100],
+        "category": category,
+        "action": action,
+        "details": details[:200]
+    }, event_id=f"{source}:{action}:{item}")
 
-def log_action(action_type: str, details: dict):
-    """Logs an action to a daily JSON log file."""
-    log_dir = LOGS_FOLDER
-    log_dir.mkdir(exist_ok=True)
-    log_file = log_dir / f"log_{datetime.now().strftime('%Y-%m-%d')}.json"
 
+def log_action(action_type: str, details: dict):
+    """Appends an action to the daily JSONL log file."""
     log_entry = {
         "timestamp": datetime.now().isoformat(),
         "action_type": action_type,
         "details": details
     }
-
-    logs = []
-    if log_file.exists():
-        try:
-            existing_content = log_file.read_text(encoding='utf-8')
-            if existing_content.strip():
-                logs = json.loads(existing_content)
-        except json.JSONDecodeError:
-            print(f"Warning: {log_file} is corrupted or not valid JSON. Starting new log.")
-
-    logs.append(log_entry)
-    log_file.write_text(json.dumps(logs, indent=2), encoding='utf-8')
+    append_entry(daily_log_path(LOGS_FOLDER), log_entry)
     print(f"Logged action: {action_type}")
 
 def read_whatsapp_metadata(filepath: Path) -> dict:
-    """Reads metadata from a WHATSAPP_*.md file."""
-    content = filepath.read_text(encoding='utf-8')
-    match = re.search(r'^---\n(.*?)\n^---', content, re.DOTALL | re.MULTILINE)
-    if match:
-        metadata_str = match.group(1)
-        metadata = {}
-        for line in metadata_str.split('\n'):
-            if ':' in line:
-                key, value = line.split(':', 1)
-                metadata[key.strip()] = value.strip().replace("'", '')
-        return metadata
-    return {}
+    """Reads metadata from a WHATSAPP_*.md file (cached until the file changes)."""
+    return read_frontmatter(filepath)
+
+def start_event_watcher():
+    """Starts a watchdog watcher on the workflow folders when TRIGGER_MODE is "events"."""
+    if TRIGGER_MODE != "events":
+        return None
+    from vault_events import VaultEventWatcher
+    watcher = VaultEventWatcher(WATCHED_FOLDERS)
+    watcher.start()
+    return watcher
+
+def wait_for_work(watcher=None):
+    """Sleeps until the next cycle: a fixed poll, or the next file event / reconcile timeout."""
+    if watcher is None:
+        time.sleep(POLL_INTERVAL)
+    elif watcher.wait(RECONCILE_INTERVAL):
+        print("File change detected. Re-evaluating now.")
+    else:
+        print(f"No file events in {RECONCILE_INTERVAL}s. Running reconcile scan.")
 
-# --- Main Orchestration Logic ---
+# --- Orchestrator State (carried across daemon cycles) ---
 
-def orchestrate_all():
-    print("Starting full orchestration (emails and WhatsApp)...")
-    all_tasks_processed = False
-    iteration = 0
-    recent_sent = []
+class OrchestratorState:
+    """In-memory state the daemon keeps between cycles instead of rebuilding it on every restart.
 
-    while not all_tasks_processed and iteration < 10:  # Simple Ralph Wiggum loop
-        iteration += 1
-        print(f"\n--- Orchestration Iteration {iteration} ---")
+    Parsed frontmatter lives in the shared frontmatter cache, not here.
+    """
 
-        # 1. Process /Needs_Action/Email files - EMAILS
-        email_files = list(NEEDS_ACTION_EMAIL_FOLDER.glob('EMAIL_*.md'))
-        print(f"Found {len(email_files)} emails in Needs_Action/Email.")
-        for filepath in email_files:
-            print(f"Processing Needs_Action/Email: {filepath.name}")
-            metadata = read_email_metadata(filepath)
-            create_plan('email', filepath.name, metadata)
-            subj = metadata.get('subject', 'No Subject')
-            cat  = metadata.get('category', 'General')
-            if metadata.get('needs_approval', 'False').lower() == 'true':
-                new_path = PENDING_APPROVAL_EMAIL_FOLDER / filepath.name
-                if new_path.exists():
-                    print(f"File {new_path.name} already exists in Pending_Approval/Email. Skipping.")
-                else:
-                    filepath.rename(new_path)
-                    print(f"Moved {filepath.name} to Pending_Approval/Email (requires approval).")
-                    log_action('moved_to_pending_approval', {'filename': filepath.name, 'reason': 'email requires approval'})
-                    log_to_odoo('gmail', subj, cat, 'Pending Approval', f"From: {metadata.get('from','?')}")
-            else:
-                new_path = DONE_EMAIL_FOLDER / filepath.name
-                if new_path.exists():
-                    print(f"File {new_path.name} already exists in Done/Email. Skipping.")
-                else:
-                    filepath.rename(new_path)
-                    print(f"Moved {filepath.name} to Done/Email.")
-                    log_action('processed_email_to_done', {'filename': filepath.name, 'subject': subj})
-                    log_to_odoo('gmail', subj, cat, 'Auto-Processed', f"From: {metadata.get('from','?')}")
-
-        # 2. Process /Needs_Action/WhatsApp files - WHATSAPP
-        whatsapp_files = list(NEEDS_ACTION_WHATSAPP_FOLDER.glob('WHATSAPP_*.md'))
-        print(f"Found {len(whatsapp_files)} WhatsApp messages in Needs_Action/WhatsApp.")
-        for filepath in whatsapp_files:
-            print(f"Processing Needs_Action/WhatsApp: {filepath.name}")
-            metadata = read_whatsapp_metadata(filepath)
-            create_plan('whatsapp', filepath.name, metadata)
-            sender = metadata.get('from', metadata.get('from_contact', 'Unknown'))
-            # WhatsApp messages typically require approval due to personal nature
-            new_path = PENDING_APPROVAL_WHATSAPP_FOLDER / filepath.name
-            if new_path.exists():
-                print(f"File {new_path.name} already exists in Pending_Approval/WhatsApp. Skipping.")
-            else:
-                filepath.rename(new_path)
-                print(f"Moved {filepath.name} to Pending_Approval/WhatsApp (requires approval).")
-                log_action('moved_to_pending_approval', {'filename': filepath.name, 'reason': 'WhatsApp message requires approval'})
-                log_to_odoo('whatsapp', f"Message from {sender}", 'WhatsApp', 'Pending Approval', f"Contact: {sender}")
+    def __init__(self):
+        self.started = datetime.now()
+        self.cycles = 0
+        self.counters = defaultdict(int)
+        self.dashboard = DashboardModel(DASHBOARD_FILE).load()
+        self.moved = False        # set when a handler moved a file this phase
+        self.backlog = False      # set when a phase left queued items for the next cycle
+        self.queues = {}          # phase -> PriorityWorkQueue, kept warm across cycles
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
 
-        # 3. Process /Pending_Approval/Email files - EMAILS
-        pending_email_files = list(PENDING_APPROVAL_EMAIL_FOLDER.glob('EMAIL_*.md'))
-        print(f"Found {len(pending_email_files)} emails in Pending_Approval/Email.")
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
 
-        for filepath in pending_email_files:
-            print(f"Checking Pending_Approval/Email: {filepath.name}")
-            metadata = read_email_metadata(filepath)
+    def record_move(self, name: str):
+        """Counts a file move and marks the cycle's snapshot as stale."""
+        self.count(name)
+        self.moved = True
 
-            approved_path = APPROVED_EMAIL_FOLDER / filepath.name
-            rejected_path = REJECTED_FOLDER / filepath.name
+    def end_cycle(self):
+        with self._lock:
+            self.cycles += 1
 
-            if approved_path.exists():
-                print(f"{filepath.name} was approved! Sending email via MCP...")
-                to_email = metadata.get('from', 'unknown@example.com')
-                original_subject = metadata.get('subject', 'No Subject')
-                subject_email = f"Re: {original_subject}"
-                category = metadata.get('category', 'General')
-                priority = metadata.get('priority', 'medium')
 
-                # Context-specific reply based on category
-                if category == 'Payment':
-                    text_email = (
-                        f"Thank you for your message regarding '{original_subject}'. "
-                        "We have received your payment-related request and are processing it. "
-                        "Our team will follow up with the relevant details shortly."
-                    )
-                elif category == 'Client':
-                    text_email = (
-                        f"Thank you for reaching out regarding '{original_subject}'. "
-                        "We appreciate your interest and will get back to you with a detailed response "
-                        "within 24 hours."
-                    )
-                elif category == 'Project':
-                    text_email = (
-                        f"Thank you for your update on '{original_subject}'. "
-                        "We have noted the project details and will review and respond accordingly."
-                    )
-                elif category == 'Event':
-                    text_email = (
-                        f"Thank you for the information about '{original_subject}'. "
-                        "We have registered your event details and will confirm participation shortly."
-                    )
-                elif category in ('Urgent', 'Security') or priority in ('high', 'critical'):
-                    text_email = (
-                        f"We have received your urgent message regarding '{original_subject}'. "
-                        "This has been flagged as high priority and is being handled immediately."
-                    )
-                else:
-                    text_email = (
-                        f"Thank you for your email regarding '{original_subject}'. "
-                        "Your message has been received and processed. "
-                        "We will follow up if any further action is required."
-                    )
+# --- Main Orchestration Logic ---
 
-                print(f"POST {MCP_EMAIL_SERVER_URL} to={to_email} subject={subject_email}")
+def handle_new_email(state: OrchestratorState, filepath: Path) -> list:
+    """Stage 1: route a /Needs_Action/Email item to Pending_Approval or Done."""
+    print(f"Processing Needs_Action/Email: {filepath.name}")
+    metadata = read_email_metadata(filepath)
+    create_plan('email', filepath.name, metadata)
+    subj = metadata.get('subject', 'No Subject')
+    cat  = metadata.get('category', 'General')
+    if metadata.get('needs_approval', 'False').lower() == 'true':
+        new_path = PENDING_APPROVAL_EMAIL_FOLDER / filepath.name
+        if new_path.exists():
+            print(f"File {new_path.name} already exists in Pending_Approval/Email. Skipping.")
+        else:
+            STATE_INDEX.move(filepath, new_path)
+            state.record_move('emails_to_pending_approval')
+            print(f"Moved {filepath.name} to Pending_Approval/Email (requires approval).")
+            log_action('moved_to_pending_approval', {'filename': filepath.name, 'reason': 'email requires approval'})
+            log_to_odoo('gmail', subj, cat, 'Pending Approval', f"From: {metadata.get('from','?')}", item=filepath.name)
+    else:
+        new_path = DONE_EMAIL_FOLDER / filepath.name
+        if new_path.exists():
+            print(f"File {new_path.name} already exists in Done/Email. Skipping.")
+        else:
+            STATE_INDEX.move(filepath, new_path)
+            state.record_move('emails_auto_processed')
+            print(f"Moved {filepath.name} to Done/Email.")
+            log_action('processed_email_to_done', {'filename': filepath.name, 'subject': subj})
+            log_to_odoo('gmail', subj, cat, 'Auto-Processed', f"From: {metadata.get('from','?')}", item=filepath.name)
+    return []
+
+def handle_new_whatsapp(state: OrchestratorState, filepath: Path) -> list:
+    """Stage 2: route a /Needs_Action/WhatsApp item to Pending_Approval."""
+    print(f"Processing Needs_Action/WhatsApp: {filepath.name}")
+    metadata = read_whatsapp_metadata(filepath)
+    create_plan('whatsapp', filepath.name, metadata)
+    sender = metadata.get('from', metadata.get('from_contact', 'Unknown'))
+    # WhatsApp messages typically require approval due to personal nature
+    new_path = PENDING_APPROVAL_WHATSAPP_FOLDER / filepath.name
+    if new_path.exists():
+        print(f"File {new_path.name} already exists in Pending_Approval/WhatsApp. Skipping.")
+    else:
+        STATE_INDEX.move(filepath, new_path)
+        state.record_move('whatsapp_to_pending_approval')
+        print(f"Moved {filepath.name} to Pending_Approval/WhatsApp (requires approval).")
+        log_action('moved_to_pending_approval', {'filename': filepath.name, 'reason': 'WhatsApp message requires approval'})
+        log_to_odoo('whatsapp', f"Message from {sender}", 'WhatsApp', 'Pending Approval', f"Contact: {sender}",
+                    item=filepath.name)
+    return []
+
+def compose_email_reply(original_subject: str, category: str, priority: str) -> str:
+    """Context-specific reply based on category."""
+    if category == 'Payment':
+        return (
+            f"Thank you for your message regarding '{original_subject}'. "
+            "We have received your payment-related request and are processing it. "
+            "Our team will follow up with the relevant details shortly."
+        )
+    elif category == 'Client':
+        return (
+            f"Thank you for reaching out regarding '{original_subject}'. "
+            "We appreciate your interest and will get back to you with a detailed response "
+            "within 24 hours."
+        )
+    elif category == 'Project':
+        return (
+            f"Thank you for your update on '{original_subject}'. "
+            "We have noted the project details and will review and respond accordingly."
+        )
+    elif category == 'Event':
+        return (
+            f"Thank you for the information about '{original_subject}'. "
+            "We have registered your event details and will confirm participation shortly."
+        )
+    elif category in ('Urgent', 'Security') or priority in ('high', 'critical'):
+        return (
+            f"We have received your urgent message regarding '{original_subject}'. "
+            "This has been flagged as high priority and is being handled immediately."
+        )
+    return (
+        f"Thank you for your email regarding '{original_subject}'. "
+        "Your message has been received and processed. "
+        "We will follow up if any further action is required."
+    )
 
-                sent_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
-                recent_sent.append((sent_timestamp, to_email, subject_email))
+def handle_pending_email(state: OrchestratorState, filepath: Path) -> list:
+    """Stage 3: send an approved email or archive a rejected one. Returns recent-activity entries."""
+    print(f"Checking Pending_Approval/Email: {filepath.name}")
+    metadata = read_email_metadata(filepath)
 
-                # Move to Done after sending
-                new_path = DONE_EMAIL_FOLDER / filepath.name
-                if new_path.exists():
-                    print(f"File already in Done/Email, skipping move.")
-                else:
-                    filepath.rename(new_path)
-                print(f"Sent email and moved {filepath.name} to Done/Email.")
-                log_action('email_sent_via_mcp', {'filename': filepath.name, 'to': to_email, 'subject': subject_email, 'category': category})
+    approved_path = APPROVED_EMAIL_FOLDER / filepath.name
+    rejected_path = REJECTED_FOLDER / filepath.name
 
-            elif rejected_path.exists():
-                print(f"{filepath.name} was rejected. Moving to Rejected folder.")
-                filepath.rename(REJECTED_FOLDER / filepath.name)
-                print(f"Moved {filepath.name} to Rejected.")
-                log_action('email_rejected', {'filename': filepath.name, 'subject': metadata.get('subject')})
-            else:
-                print(f"{filepath.name} is still pending approval. Waiting...")
+    if approved_path.exists():
+        print(f"{filepath.name} was approved! Sending email via MCP...")
+        to_email = metadata.get('from', 'unknown@example.com')
+        original_subject = metadata.get('subject', 'No Subject')
+        subject_email = f"Re: {original_subject}"
+        category = metadata.get('category', 'General')
+        priority = metadata.get('priority', 'medium')
+        text_email = compose_email_reply(original_subject, category, priority)
 
-        # 4. Process /Pending_Approval/WhatsApp files - WHATSAPP
-        pending_whatsapp_files = list(PENDING_APPROVAL_WHATSAPP_FOLDER.glob('WHATSAPP_*.md'))
-        print(f"Found {len(pending_whatsapp_files)} WhatsApp messages in Pending_Approval/WhatsApp.")
+        print(f"POST {MCP_EMAIL_SERVER_URL} to={to_email} subject={subject_email}")
 
-        for filepath in pending_whatsapp_files:
-            print(f"Checking Pending_Approval/WhatsApp: {filepath.name}")
-            metadata = read_whatsapp_metadata(filepath)
+        sent_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
 
-            approved_path = APPROVED_WHATSAPP_FOLDER / filepath.name
-            rejected_path = REJECTED_FOLDER / filepath.name
+        # Move to Done after sending
+        new_path = DONE_EMAIL_FOLDER / filepath.name
+        if new_path.exists():
+            print(f"File already in Done/Email, skipping move.")
+        else:
+            STATE_INDEX.move(filepath, new_path)
+        state.record_move('emails_sent')
+        print(f"Sent email and moved {filepath.name} to Done/Email.")
+        log_action('email_sent_via_mcp', {'filename': filepath.name, 'to': to_email, 'subject': subject_email, 'category': category})
+        return [(sent_timestamp, to_email, subject_email)]
+
+    elif rejected_path.exists():
+        print(f"{filepath.name} was rejected. Moving to Rejected folder.")
+        STATE_INDEX.move(filepath, REJECTED_FOLDER / filepath.name)
+        state.record_move('emails_rejected')
+        print(f"Moved {filepath.name} to Rejected.")
+        log_action('email_rejected', {'filename': filepath.name, 'subject': metadata.get('subject')})
+    else:
+        print(f"{filepath.name} is still pending approval. Waiting...")
+    return []
 
-            if approved_path.exists():
-                print(f"{filepath.name} was approved! Processing WhatsApp message via MCP...")
-                # In a real implementation, this would send a WhatsApp message via an API
-                # For now, we'll just log the action
-                from_contact = metadata.get('from', 'unknown')
-                message_text = metadata.get('message_text', 'No message content')
+def handle_pending_whatsapp(state: OrchestratorState, filepath: Path) -> list:
+    """Stage 4: process an approved WhatsApp reply or archive a rejected one. Returns recent-activity entries."""
+    print(f"Checking Pending_Approval/WhatsApp: {filepath.name}")
+    metadata = read_whatsapp_metadata(filepath)
 
-                print(f"WhatsApp message to {from_contact} approved: {message_text[:50]}...")
+    approved_path = APPROVED_WHATSAPP_FOLDER / filepath.name
+    rejected_path = REJECTED_FOLDER / filepath.name
 
-                sent_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
-                recent_sent.append((sent_timestamp, from_contact, f"WhatsApp: {message_text[:30]}..."))
+    if approved_path.exists():
+        print(f"{filepath.name} was approved! Processing WhatsApp message via MCP...")
+        # In a real implementation, this would send a WhatsApp message via an API
+        # For now, we'll just log the action
+        from_contact = metadata.get('from', 'unknown')
+        message_text = metadata.get('message_text', 'No message content')
 
-                # Move to Done after processing
-                new_path = DONE_WHATSAPP_FOLDER / filepath.name
-                if new_path.exists():
-                    print(f"File already in Done/WhatsApp, skipping move.")
-                else:
-                    filepath.rename(new_path)
-                print(f"Processed WhatsApp message and moved {filepath.name} to Done/WhatsApp.")
-                log_action('whatsapp_processed_via_mcp', {'filename': filepath.name, 'to': from_contact, 'message': message_text})
+        print(f"WhatsApp message to {from_contact} approved: {message_text[:50]}...")
 
-            elif rejected_path.exists():
-                print(f"{filepath.name} was rejected. Moving to Rejected folder.")
-                filepath.rename(REJECTED_FOLDER / filepath.name)
-                print(f"Moved {filepath.name} to Rejected.")
-                log_action('whatsapp_rejected', {'filename': filepath.name, 'from': metadata.get('from')})
-            else:
-                print(f"{filepath.name} is still pending approval. Waiting...")
+        sent_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
 
-        # 5. Update Dashboard.md
-        update_dashboard_status(recent_sent)
-        recent_sent = []  # Clear for next iteration
+        # Move to Done after processing
+        new_path = DONE_WHATSAPP_FOLDER / filepath.name
+        if new_path.exists():
+            print(f"File already in Done/WhatsApp, skipping move.")
+        else:
+            STATE_INDEX.move(filepath, new_path)
+        state.record_move('whatsapp_processed')
+        print(f"Processed WhatsApp message and moved {filepath.name} to Done/WhatsApp.")
+        log_action('whatsapp_processed_via_mcp', {'filename': filepath.name, 'to': from_contact, 'message': message_text})
+        return [(sent_timestamp, from_contact, f"WhatsApp: {message_text[:30]}...")]
+
+    elif rejected_path.exists():
+        print(f"{filepath.name} was rejected. Moving to Rejected folder.")
+        STATE_INDEX.move(filepath, REJECTED_FOLDER / filepath.name)
+        state.record_move('whatsapp_rejected')
+        print(f"Moved {filepath.name} to Rejected.")
+        log_action('whatsapp_rejected', {'filename': filepath.name, 'from': metadata.get('from')})
+    else:
+        print(f"{filepath.name} is still pending approval. Waiting...")
+    return []
+
+# Pipeline phases: (folder, pattern, label, handler). Intake finishes before
+# approvals are checked, so an item can move all the way to Done in one cycle.
+INTAKE_STAGES = [
+    (NEEDS_ACTION_EMAIL_FOLDER, 'EMAIL_*.md', 'emails in Needs_Action/Email', handle_new_email),
+    (NEEDS_ACTION_WHATSAPP_FOLDER, 'WHATSAPP_*.md', 'WhatsApp messages in Needs_Action/WhatsApp', handle_new_whatsapp),
+]
+APPROVAL_STAGES = [
+    (PENDING_APPROVAL_EMAIL_FOLDER, 'EMAIL_*.md', 'emails in Pending_Approval/Email', handle_pending_email),
+    (PENDING_APPROVAL_WHATSAPP_FOLDER, 'WHATSAPP_*.md', 'WhatsApp messages in Pending_Approval/WhatsApp', handle_pending_whatsapp),
+]
 
-        # Check for completion
-        current_email_needs_action = list(NEEDS_ACTION_EMAIL_FOLDER.glob('EMAIL_*.md'))
-        current_whatsapp_needs_action = list(NEEDS_ACTION_WHATSAPP_FOLDER.glob('WHATSAPP_*.md'))
-        current_pending_approval = (
-            list(PENDING_APPROVAL_EMAIL_FOLDER.glob('*')) +
-            list(PENDING_APPROVAL_WHATSAPP_FOLDER.glob('*')) +
-            list(PENDING_APPROVAL_FILES_FOLDER.glob('*'))
-        )
-        current_approved = (
-            list(APPROVED_EMAIL_FOLDER.glob('*')) +
-            list(APPROVED_WHATSAPP_FOLDER.glob('*')) +
-            list(APPROVED_FILES_FOLDER.glob('*'))
-        )
+def all_tasks_done(snapshot: VaultSnapshot = None) -> bool:
+    """True when nothing is left in Needs_Action, Pending_Approval or Approved."""
+    snapshot = snapshot or VaultSnapshot(VAULT_ROOT).scan()
+    current_email_needs_action = snapshot.count(NEEDS_ACTION_EMAIL_FOLDER, 'EMAIL_*.md')
+    current_whatsapp_needs_action = snapshot.count(NEEDS_ACTION_WHATSAPP_FOLDER, 'WHATSAPP_*.md')
+    current_pending_approval = sum(snapshot.count(folder) for folder in (
+        PENDING_APPROVAL_EMAIL_FOLDER, PENDING_APPROVAL_WHATSAPP_FOLDER, PENDING_APPROVAL_FILES_FOLDER))
+    current_approved = sum(snapshot.count(folder) for folder in (
+        APPROVED_EMAIL_FOLDER, APPROVED_WHATSAPP_FOLDER, APPROVED_FILES_FOLDER))
+    return not current_email_needs_action and not current_whatsapp_needs_action and not current_pending_approval and not current_approved
+
+def _process_item(state: OrchestratorState, handler, filepath: Path) -> list:
+    """Runs every step for one item on a single worker, so per-item ordering is kept."""
+    try:
+        return handler(state, filepath)
+    except FileNotFoundError:
+        # Moved by a human (or another process) between the scan and the handler
+        print(f"{filepath.name} disappeared before it was processed. Skipping.")
+    except Exception as e:
+        state.count('item_errors')
+        print(f"Failed to process {filepath.name}: {e}")
+        log_action('item_error', {'filename': filepath.name, 'error': str(e)})
+    return []
+
+def run_phase(stages, state: OrchestratorState, snapshot: VaultSnapshot, executor=None, batch_size: int = None) -> list:
+    """Processes the most urgent batch_size items (all if None) of the given stages,
+    fanned out on the worker pool when one is given."""
+    queue = state.queues.setdefault(tuple((str(folder), pattern) for folder, pattern, _, _ in stages), PriorityWorkQueue())
+    found = []
+    for folder, pattern, label, handler in stages:
+        entries = snapshot.files(folder, pattern)
+        print(f"Found {len(entries)} {label}.")
+        found.extend((entry, handler) for entry in entries)
+    queue.sync(found)
+
+    work = [(handler, filepath) for filepath, handler in queue.pop_batch(batch_size or None)]
+    if len(queue):
+        state.backlog = True
+        print(f"{len(queue)} lower-priority items deferred to the next cycle.")
+
+    results = []
+    if executor is None:
+        for handler, filepath in work:
+            results.extend(_process_item(state, handler, filepath))
+    else:
+        # map() keeps submission order, so recent activity stays in priority order
+        for item_result in executor.map(lambda job: _process_item(state, *job), work):
+            results.extend(item_result)
+    return results
+
+def run_cycle(state: OrchestratorState, executor=None) -> bool:
+    """Runs one orchestration cycle. Returns True when all tasks are processed.
+
+    Listings, dashboard counts and the completion check all come from one
+    VaultSnapshot, rescanned only after a phase actually moved files.
+    """
+    snapshot = VaultSnapshot(VAULT_ROOT).scan()
+    state.moved = False
+    state.backlog = False
+    # Intake items leave their folder once handled, so a batch always makes progress.
+    # Approvals stay put until someone decides, so every one is checked each cycle.
+    run_phase(INTAKE_STAGES, state, snapshot, executor, BATCH_SIZE)
+    if state.moved:
+        snapshot.rescan()
+        state.moved = False
+    recent_sent = run_phase(APPROVAL_STAGES, state, snapshot, executor)
+    if state.moved:
+        snapshot.rescan()
+
+    # Update Dashboard.md
+    update_dashboard_status(recent_sent, state, snapshot)
+    state.end_cycle()
+
+    return all_tasks_done(snapshot)
+
+def orchestrate_all():
+    print("Starting full orchestration (emails and WhatsApp)...")
+    ensure_folders()
+    ODOO_OUTBOX.start()
+    state = OrchestratorState()
+    all_tasks_processed = False
+    iteration = 0
+    watcher = start_event_watcher()
+    executor = ThreadPoolExecutor(max_workers=CONCURRENCY) if CONCURRENCY > 1 else None
 
-        if not current_email_needs_action and not current_whatsapp_needs_action and not current_pending_approval and not current_approved:
+    while not all_tasks_processed and iteration < 10:  # Simple Ralph Wiggum loop
+        iteration += 1
+        print(f"\n--- Orchestration Iteration {iteration} ---")
+
+        # Check for completion
+        if run_cycle(state, executor):
             all_tasks_processed = True
             print("All tasks processed. Exiting Ralph Wiggum loop.")
         else:
             print("More tasks pending. Will re-evaluate in next iteration.")
-            time.sleep(5)  # Simulate waiting for new tasks
-
+            if not state.backlog:
+                wait_for_work(watcher)
+
+    if executor:
+        executor.shutdown(wait=True)
+    ODOO_OUTBOX.close()
+    if watcher:
+        watcher.stop()
     if not all_tasks_processed:
         print("Ralph Wiggum loop reached max iterations. Some tasks may still be pending.")
 
     print("Full orchestration complete.")
     print("<TASK_COMPLETE>")
 
+def run_daemon(concurrency: int = None):
+    """Long-running orchestrator: cycles until SIGTERM/SIGINT, keeping caches and counters warm."""
+    concurrency = concurrency or CONCURRENCY
+    print("=" * 60)
+    print("  ORCHESTRATOR DAEMON")
+    print(f"  Vault: {VAULT_ROOT}")
+    print(f"  Trigger: {TRIGGER_MODE} | Concurrency: {concurrency}")
+    print("=" * 60)
+
+    ensure_folders()
+    ODOO_OUTBOX.start()
+    print(f"State index reconciled: {STATE_INDEX.reconcile()}")
+    state = OrchestratorState()
+    watcher = start_event_watcher()
+
+    def request_stop(signum, frame):
+        print(f"\nReceived signal {signum}. Finishing current cycle and shutting down...")
+        state.stop_event.set()
+        if watcher:
+            watcher.wake()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    log_action('orchestrator_started', {'mode': MODE, 'trigger': TRIGGER_MODE, 'concurrency': concurrency})
+    executor = ThreadPoolExecutor(max_workers=concurrency) if concurrency > 1 else None
+    try:
+        while not state.stop_event.is_set():
+            print(f"\n--- Orchestration Cycle {state.cycles + 1} ---")
+            try:
+                run_cycle(state, executor)
+            except Exception as e:
+                state.count('cycle_errors')
+                print(f"Orchestration cycle failed: {e}")
+                log_action('cycle_error', {'cycle': state.cycles, 'error': str(e)})
+            if state.stop_event.is_set():
+                break
+            if state.backlog:
+                continue  # queued work left over; no need to wait for new events
+            if watcher is None:
+                state.stop_event.wait(POLL_INTERVAL)
+            else:
+                wait_for_work(watcher)
+    finally:
+        if executor:
+            executor.shutdown(wait=True)
+        ODOO_OUTBOX.close()
+        if watcher:
+            watcher.stop()
+        state.counters['odoo_events_sent'] = ODOO_OUTBOX.sent
+        state.counters['frontmatter_cache_hits'] = cache_info()['hits']
+        state.dashboard.render(force=True)
+        log_action('orchestrator_stopped', {'cycles': state.cycles, 'counters': dict(state.counters)})
+        print(f"Orchestrator stopped after {state.cycles} cycles. Counters: {dict(state.counters)}")
+
 def orchestrate_emails():
     """Legacy function for email-only orchestration"""
     print("Starting email orchestration...")
+    ensure_folders()
     all_tasks_processed = False
     iteration = 0
     recent_sent = []
+    watcher = start_event_watcher()
 
     while not all_tasks_processed and iteration < 10:  # Simple Ralph Wiggum loop
         iteration += 1
@@ -506,7 +646,7 @@ def orchestrate_emails():
                 if new_path.exists():
                     print(f"File {new_path.name} already exists in Pending_Approval/Email. Skipping.")
                 else:
-                    filepath.rename(new_path)
+                    STATE_INDEX.move(filepath, new_path)
                     print(f"Moved {filepath.name} to Pending_Approval/Email (requires approval).")
                     log_action('moved_to_pending_approval', {'filename': filepath.name, 'reason': 'email requires approval'})
             else:
@@ -514,7 +654,7 @@ def orchestrate_emails():
                 if new_path.exists():
                     print(f"File {new_path.name} already exists in Done/Email. Skipping.")
                 else:
-                    filepath.rename(new_path)
+                    STATE_INDEX.move(filepath, new_path)
                     print(f"Moved {filepath.name} to Done/Email.")
                     log_action('processed_email_to_done', {'filename': filepath.name, 'subject': metadata.get('subject')})
 
@@ -582,13 +722,13 @@ def orchestrate_emails():
                 if new_path.exists():
                     print(f"File already in Done/Email, skipping move.")
                 else:
-                    filepath.rename(new_path)
+                    STATE_INDEX.move(filepath, new_path)
                 print(f"Sent email and moved {filepath.name} to Done/Email.")
                 log_action('email_sent_via_mcp', {'filename': filepath.name, 'to': to_email, 'subject': subject_email, 'category': category})
 
             elif rejected_path.exists():
                 print(f"{filepath.name} was rejected. Moving to Rejected folder.")
-                filepath.rename(REJECTED_FOLDER / filepath.name)
+                STATE_INDEX.move(filepath, REJECTED_FOLDER / filepath.name)
                 print(f"Moved {filepath.name} to Rejected.")
                 log_action('email_rejected', {'filename': filepath.name, 'subject': metadata.get('subject')})
             else:
@@ -608,8 +748,10 @@ def orchestrate_emails():
             print("All email-related tasks processed. Exiting Ralph Wiggum loop.")
         else:
             print("More tasks pending. Will re-evaluate in next iteration.")
-            time.sleep(5)  # Simulate waiting for new tasks
+            wait_for_work(watcher)
 
+    if watcher:
+        watcher.stop()
     if not all_tasks_processed:
         print("Ralph Wiggum loop reached max iterations. Some tasks may still be pending.")
 
@@ -617,4 +759,11 @@ def orchestrate_emails():
     print("<TASK_COMPLETE>")
 
 if __name__ == "__main__":
-    orchestrate_all()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="AI Employee orchestrator")
+    parser.add_argument('--daemon', action='store_true', help='run until SIGTERM/SIGINT instead of the 10-iteration loop')
+    parser.add_argument('--concurrency', type=int, default=None, help='items processed in parallel (daemon mode)')
+    args = parser.parse_args()
+    if args.daemon:
+        run_daemon(args.concurrency)
+    else:
+        orchestrate_all()
\ No newline at end of file
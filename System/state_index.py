@@ -0,0 +1,287 @@
+"""
+State Index - SQLite (WAL) index of where every workflow item is
+
+The Markdown vault stays the source of truth: an item's stage is the folder it
+sits in. Listing folders to answer "how many are pending" or "what has been
+pending for more than 24h" costs a full scan, though. WorkflowIndex keeps one
+row per item (id, type, stage, category, agent, priority, timestamps, path),
+so those become indexed lookups.
+
+Watchers call record() for each action file they write. Components that
+move items call move(). It renames the file, then records the move in one
+transaction. If the rename fails, the index is left untouched.
+Anything that changes the vault behind the index's back (a human dragging
+files in Obsidian, a git sync) is repaired by reconcile(), which rebuilds the
+index from disk and keeps the timestamps of items that did not move:
+
+    python System/state_index.py reconcile <vault_path>
+    python System/state_index.py counts <vault_path>
+    python System/state_index.py stale <vault_path> --stage Pending_Approval --hours 24
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from frontmatter import read_frontmatter
+from daily_rollup import record_events
+
+# --- Configuration ---
+STAGES = ("Needs_Action", "In_Progress", "Pending_Approval", "Approved", "Rejected", "Done")
+INDEX_FILE = ".workflow_index.db"
+RECONCILE_DEPTH = 3  # Stage/<category or agent>/<item>
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    path        TEXT PRIMARY KEY,   -- vault-relative, '/' separated
+    id          TEXT NOT NULL,      -- file name without extension
+    type        TEXT,
+    stage       TEXT NOT NULL,
+    category    TEXT NOT NULL DEFAULT '',
+    agent       TEXT,
+    priority    TEXT,
+    created     REAL NOT NULL,      -- first seen anywhere in the workflow
+    stage_since REAL NOT NULL,      -- entered the current stage
+    updated     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_stage ON items (stage, category, stage_since);
+CREATE INDEX IF NOT EXISTS items_id ON items (id);
+CREATE INDEX IF NOT EXISTS items_type ON items (type, stage);
+"""
+
+
+class WorkflowIndex:
+    def __init__(self, vault_root: Path, db_path: Path = None):
+        self.vault_root = Path(vault_root)
+        self.db_path = Path(db_path) if db_path else self.vault_root / INDEX_FILE
+        self.lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._conn = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Opened on first use, so creating an index (e.g. at import) touches nothing on disk."""
+        if self._conn is None:
+            with self._open_lock:
+                if self._conn is None:
+                    self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                    conn = sqlite3.connect(str(self.db_path), timeout=10, check_same_thread=False,
+                                           isolation_level=None)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                    conn.executescript(SCHEMA)
+                    self._conn = conn
+        return self._conn
+
+    # --- Path helpers ---
+
+    def _relative(self, path) -> Optional[str]:
+        try:
+            return Path(path).resolve().relative_to(self.vault_root.resolve()).as_posix()
+        except ValueError:
+            return None
+
+    def _describe(self, rel: str, path: Path) -> Optional[dict]:
+        """Row fields for an item at vault-relative rel, or None if it is not in a workflow stage."""
+        parts = rel.split('/')
+        if parts[0] not in STAGES or len(parts) < 2 or not parts[-1].endswith('.md'):
+            return None
+        category = parts[1] if len(parts) > 2 else ''
+        agent = None
+        if parts[0] == 'In_Progress':
+            agent, category = (parts[1], '') if len(parts) > 2 else (None, '')
+        try:
+            meta = read_frontmatter(path)
+        except OSError:
+            meta = {}
+        return {
+            'path': rel,
+            'id': Path(parts[-1]).stem,
+            'type': meta.get('type') or parts[-1].split('_', 1)[0].lower(),
+            'stage': parts[0],
+            'category': category,
+            'agent': agent,
+            'priority': meta.get('priority'),
+        }
+
+    def _upsert(self, row: dict, now: float, created: float = None, stage_since: float = None):
+        self.conn.execute(
+            "INSERT INTO items (path, id, type, stage, category, agent, priority, created, stage_since, updated) "
+            "VALUES (:path, :id, :type, :stage, :category, :agent, :priority, :created, :stage_since, :updated) "
+            "ON CONFLICT(path) DO UPDATE SET type = excluded.type, priority = excluded.priority, "
+            "updated = excluded.updated",
+            {**row, 'created': created or now, 'stage_since': stage_since or now, 'updated': now},
+        )
+
+    # --- Writes ---
+
+    def record(self, path) -> bool:
+        """Adds or refreshes a single item (e.g. one a watcher just wrote)."""
+        rel = self._relative(path)
+        row = self._describe(rel, Path(path)) if rel else None
+        if row is None:
+            return False
+        try:
+            with self.lock:
+                self._upsert(row, time.time())
+        except sqlite3.Error as e:
+            # Same as move(): a missed row is repaired by reconcile()
+            print(f"[INDEX] Failed to record {Path(path).name}: {e}")
+            return False
+        return True
+
+    def remove(self, path):
+        rel = self._relative(path)
+        if rel:
+            with self.lock:
+                self.conn.execute("DELETE FROM items WHERE path = ?", (rel,))
+
+    def record_move(self, source, destination):
+        """Moves an item's row from source to destination in one transaction, keeping its created time.
+
+        Arrivals in Done are also counted in the daily rollup.
+        """
+        src_rel, dst_rel = self._relative(source), self._relative(destination)
+        row = self._describe(dst_rel, Path(destination)) if dst_rel else None
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                created = None
+                if src_rel:
+                    found = self.conn.execute("SELECT created FROM items WHERE path = ?", (src_rel,)).fetchone()
+                    created = found[0] if found else None
+                    self.conn.execute("DELETE FROM items WHERE path = ?", (src_rel,))
+                if row:
+                    self.conn.execute("DELETE FROM items WHERE path = ?", (dst_rel,))
+                    self._upsert(row, now, created=created, stage_since=now)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        if row and row['stage'] == 'Done' and not (src_rel or '').startswith('Done/'):
+            record_events(self.vault_root / "Logs", [("done", row['category']), ("done_type", row['type'])])
+
+    def move(self, source, destination, mover=os.rename):
+        """Renames source to destination, then records the move. Nothing is recorded if the rename fails."""
+        mover(source, destination)
+        try:
+            self.record_move(source, destination)
+        except sqlite3.Error as e:
+            # The vault is the source of truth; reconcile() repairs a missed update
+            print(f"[INDEX] Failed to record move of {Path(source).name}: {e}")
+
+    def reconcile(self) -> Dict[str, int]:
+        """Rebuilds the index from disk. Items still at the same path keep their timestamps."""
+        now = time.time()
+        rows = []
+        for stage in STAGES:
+            self._walk(self.vault_root / stage, 1, rows)
+
+        with self.lock:
+            known = {path: (created, since) for path, created, since in
+                     self.conn.execute("SELECT path, created, stage_since FROM items")}
+            created_by_id = {item_id: created for item_id, created in
+                             self.conn.execute("SELECT id, MIN(created) FROM items GROUP BY id")}
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("DELETE FROM items")
+                for row, mtime in rows:
+                    created, since = known.get(row['path'], (None, None))
+                    if since is None:
+                        # Moved behind our back: keep when it entered the workflow, stage time from the file
+                        created = created_by_id.get(row['id'], mtime)
+                        since = mtime
+                    self._upsert(row, now, created=created, stage_since=since)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return self.stage_counts()
+
+    def _walk(self, folder: Path, depth: int, rows: list):
+        try:
+            entries = list(os.scandir(folder))
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir():
+                if depth < RECONCILE_DEPTH - 1:
+                    self._walk(Path(entry.path), depth + 1, rows)
+            elif entry.name.endswith('.md'):
+                rel = self._relative(entry.path)
+                row = self._describe(rel, Path(entry.path))
+                if row:
+                    rows.append((row, entry.stat().st_mtime))
+
+    # --- Queries ---
+
+    def count(self, stage: str, category: str = None) -> int:
+        sql, args = "SELECT COUNT(*) FROM items WHERE stage = ?", [stage]
+        if category is not None:
+            sql, args = sql + " AND category = ?", args + [category]
+        with self.lock:
+            return self.conn.execute(sql, args).fetchone()[0]
+
+    def stage_counts(self) -> Dict[str, int]:
+        with self.lock:
+            counts = dict(self.conn.execute("SELECT stage, COUNT(*) FROM items GROUP BY stage"))
+        return {stage: counts.get(stage, 0) for stage in STAGES}
+
+    def items(self, stage: str, category: str = None, older_than: float = None,
+              item_type: str = None, limit: int = None) -> List[dict]:
+        """Items in a stage, oldest in the stage first. older_than is in seconds."""
+        sql, args = "SELECT * FROM items WHERE stage = ?", [stage]
+        if category is not None:
+            sql, args = sql + " AND category = ?", args + [category]
+        if older_than is not None:
+            sql, args = sql + " AND stage_since <= ?", args + [time.time() - older_than]
+        if item_type is not None:
+            sql, args = sql + " AND type = ?", args + [item_type]
+        sql += " ORDER BY stage_since"
+        if limit:
+            sql, args = sql + " LIMIT ?", args + [limit]
+        with self.lock:
+            cursor = self.conn.execute(sql, args)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, r)) for r in cursor.fetchall()]
+
+    def close(self):
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def main(argv: Iterable[str] = None):
+    parser = argparse.ArgumentParser(description="Workflow state index")
+    parser.add_argument("command", choices=["reconcile", "counts", "stale"])
+    parser.add_argument("vault_path")
+    parser.add_argument("--stage", default="Pending_Approval")
+    parser.add_argument("--hours", type=float, default=24)
+    args = parser.parse_args(argv)
+
+    index = WorkflowIndex(Path(args.vault_path))
+    if args.command == "reconcile":
+        start = time.time()
+        counts = index.reconcile()
+        print(f"[INDEX] Rebuilt in {time.time() - start:.2f}s: {counts}")
+    elif args.command == "counts":
+        for stage, count in index.stage_counts().items():
+            print(f"{stage:18s} {count}")
+    else:
+        for item in index.items(args.stage, older_than=args.hours * 3600):
+            waited = (time.time() - item['stage_since']) / 3600
+            print(f"{item['path']}  ({waited:.1f}h, priority: {item['priority'] or '-'})")
+    index.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -5,17 +5,18 @@ Handles automated git sync between Cloud and Local machines.
 Cloud: auto-commits and pushes new drafts/signals/logs every N minutes.
 Local: pulls cloud changes.
 
-SECURITY: Only syncs .md and .json files. Never syncs .env, tokens, credentials, sessions.
+SECURITY: Only syncs .md, .json, .jsonl and .logc files. Never syncs .env, tokens, credentials, sessions.
 """
 
 import os
 import re
 import subprocess
 import time
-import json
 from pathlib import Path
 from datetime import datetime
 
+from log_store import append_entry, daily_log_path
+
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -28,8 +29,8 @@ LOGS_FOLDER = VAULT_ROOT / "Logs"
 SIGNALS_FOLDER.mkdir(parents=True, exist_ok=True)
 LOGS_FOLDER.mkdir(parents=True, exist_ok=True)
 
-# Files/patterns that are SAFE to sync
-SAFE_EXTENSIONS = {'.md', '.json'}
+# Files/patterns that are SAFE to sync (.jsonl = daily append-only logs, .logc = days compacted by log_archive)
+SAFE_EXTENSIONS = {'.md', '.json', '.jsonl', '.logc'}
 
 # Files/patterns that must NEVER be synced
 BLOCKED_PATTERNS = [
@@ -81,7 +82,7 @@ def run_git(args: str, cwd: str = None) -> tuple:
 
 
 def is_safe_file(filepath: str) -> bool:
-    """Check if a file is safe to sync (only .md and .json, not in blocked list)."""
+    """Check if a file is safe to sync (only .md, .json, .jsonl and .logc, not in blocked list)."""
     path = Path(filepath)
 
     # Check extension
@@ -190,23 +191,13 @@ def local_pull():
 
 def log_sync(action: str, details: dict):
     """Log sync actions."""
-    log_file = LOGS_FOLDER / f"sync_log_{datetime.now().strftime('%Y-%m-%d')}.json"
     entry = {
         "timestamp": datetime.now().isoformat(),
         "action": action,
         "mode": SYNC_MODE,
         "details": details
     }
-
-    logs = []
-    if log_file.exists():
-        try:
-            logs = json.loads(log_file.read_text(encoding='utf-8'))
-        except json.JSONDecodeError:
-            pass
-
-    logs.append(entry)
-    log_file.write_text(json.dumps(logs, indent=2), encoding='utf-8')
+    append_entry(daily_log_path(LOGS_FOLDER, "sync_log"), entry)
 
 
 def ensure_gitignore():
@@ -235,6 +226,11 @@ def ensure_gitignore():
         "# Python bytecode",
         "*.pyc",
         "*.pyo",
+        "# Machine-local SQLite state (workflow index, watcher state); rebuilt per machine",
+        "*.db",
+        "*.db-wal",
+        "*.db-shm",
+        "Logs/.index/",
     ]
 
     existing = ""
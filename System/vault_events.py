@@ -0,0 +1,85 @@
+"""
+Vault Events - watchdog-driven wake-ups for the orchestrators
+
+Instead of re-globbing the workflow folders every few seconds, an orchestrator
+waits on a VaultEventWatcher. Any file created in (or moved into) a watched
+folder wakes it within milliseconds. If nothing happens, wait() still returns
+after the reconcile timeout so a full scan runs as a safety net.
+"""
+
+import time
+import threading
+from pathlib import Path
+from typing import Iterable
+
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+# Files that never represent work items
+IGNORED_SUFFIXES = ('.tmp', '.swp', '.lock', '.part', '.crdownload')
+
+
+class _WakeHandler(FileSystemEventHandler):
+    def __init__(self, watcher: "VaultEventWatcher"):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.notify(Path(event.src_path))
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.notify(Path(event.dest_path))
+
+
+class VaultEventWatcher:
+    """Sets a wake flag whenever a work file appears in one of the watched folders."""
+
+    def __init__(self, folders: Iterable[Path], settle_seconds: float = 0.2):
+        self.folders = [Path(folder) for folder in folders]
+        self.settle_seconds = settle_seconds
+        self.events_seen = 0
+        self._wake = threading.Event()
+        self._observer = None
+
+    def start(self):
+        self._observer = Observer()
+        handler = _WakeHandler(self)
+        for folder in self.folders:
+            folder.mkdir(parents=True, exist_ok=True)
+            self._observer.schedule(handler, str(folder), recursive=True)
+        self._observer.start()
+        print(f"[EVENTS] Watching {len(self.folders)} folders for new work")
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        self._wake.set()
+
+    def wake(self):
+        """Interrupts a pending wait(), e.g. when a shutdown signal arrives."""
+        self._wake.set()
+
+    def notify(self, path: Path):
+        """Called from the observer thread for every created/moved-in file."""
+        if path.name.startswith('.') or path.suffix.lower() in IGNORED_SUFFIXES:
+            return
+        if not any(folder == path.parent or folder in path.parents for folder in self.folders):
+            return
+        self.events_seen += 1
+        self._wake.set()
+
+    def wait(self, timeout: float) -> bool:
+        """Blocks until a file event arrives or timeout passes.
+
+        Returns True when woken by an event. Bursts (e.g. a git pull dropping many
+        files) are coalesced by waiting settle_seconds before clearing the flag, so
+        one cycle picks them all up. Events arriving during that cycle wake the next wait().
+        """
+        triggered = self._wake.wait(timeout)
+        if triggered:
+            time.sleep(self.settle_seconds)
+            self._wake.clear()
+        return triggered
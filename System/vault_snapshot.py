@@ -0,0 +1,84 @@
+"""
+Vault Snapshot - one os.scandir pass over the workflow folders
+
+Dashboards, completion checks and reports all ask the same questions ("how
+many EMAIL_*.md are waiting in Pending_Approval/Email?"). Instead of each one
+re-globbing the tree, take a VaultSnapshot once per cycle and answer every
+count and listing from it. DirEntry objects are kept, so their stat results
+(free on Windows, cached after the first call elsewhere) are reused too.
+
+A snapshot is a point-in-time view: call rescan() after moving files.
+"""
+
+import os
+import time
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Iterable, List
+
+# Folders the orchestrators act on; Done/ and Logs/ grow without bound and are left out
+WORKFLOW_FOLDERS = ("Needs_Action", "Pending_Approval", "Approved", "Rejected")
+
+
+class VaultSnapshot:
+    """Directory listings for a set of vault folders, captured in a single walk."""
+
+    def __init__(self, vault_root: Path, folders: Iterable[str] = WORKFLOW_FOLDERS, max_depth: int = 2):
+        self.vault_root = Path(vault_root)
+        self.folders = tuple(folders)
+        self.max_depth = max_depth
+        self.taken_at = None
+        self._entries = {}  # absolute folder path -> list of DirEntry
+
+    def scan(self) -> "VaultSnapshot":
+        self._entries = {}
+        for folder in self.folders:
+            self._scan(str(self.vault_root / folder), 1)
+        self.taken_at = time.time()
+        return self
+
+    def rescan(self) -> "VaultSnapshot":
+        return self.scan()
+
+    def _scan(self, path: str, depth: int):
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        self._entries[path] = entries
+        if depth < self.max_depth:
+            for entry in entries:
+                if entry.is_dir():
+                    self._scan(entry.path, depth + 1)
+
+    # --- Queries ---
+
+    def _key(self, folder) -> str:
+        folder = Path(folder)
+        return str(folder if folder.is_absolute() else self.vault_root / folder)
+
+    def entries(self, folder, pattern: str = None) -> List[os.DirEntry]:
+        """All entries (files and folders) directly inside folder, optionally filtered by a glob pattern."""
+        entries = self._entries.get(self._key(folder), [])
+        if pattern is None:
+            return list(entries)
+        return [e for e in entries if fnmatchcase(e.name, pattern)]
+
+    def files(self, folder, pattern: str = None) -> List[os.DirEntry]:
+        return [e for e in self.entries(folder, pattern) if e.is_file()]
+
+    def paths(self, folder, pattern: str = None) -> List[Path]:
+        return [Path(e.path) for e in self.files(folder, pattern)]
+
+    def count(self, folder, pattern: str = None) -> int:
+        return len(self.files(folder, pattern))
+
+    def subfolders(self, folder) -> List[str]:
+        return [e.name for e in self.entries(folder) if e.is_dir()]
+
+    def exists(self, folder) -> bool:
+        return self._key(folder) in self._entries
+
+    def contains(self, folder, name: str) -> bool:
+        return any(e.name == name for e in self.entries(folder))
@@ -0,0 +1,111 @@
+"""
+Work Queue - priority order with aging for items waiting in the vault
+
+Watchers stamp every item with `priority: critical|high|medium|low` in its
+frontmatter. PriorityWorkQueue hands items out in that order, with aging so
+low-priority work is never starved. Each level is worth AGING_SECONDS of
+waiting. A medium item that has waited 2 * AGING_SECONDS ranks level with a
+critical item that just arrived.
+
+Because every item ages at the same rate, the order never changes while the
+items wait. The sort key is simply `arrival + rank * AGING_SECONDS`, and the
+queue is a plain heap. Arrival is the file's mtime, which the watcher set
+when it wrote the item, so the order survives restarts with no extra
+state. sync() is incremental. It only reads the frontmatter of files that
+are new or changed since the last sync (through the shared frontmatter
+cache), and it lazily drops files that have left the folder.
+"""
+
+import os
+import heapq
+import itertools
+from pathlib import Path
+from typing import Any, Iterable, List, Tuple
+
+from frontmatter import read_frontmatter
+
+# --- Configuration ---
+AGING_SECONDS = float(os.environ.get("WORK_QUEUE_AGING_SECONDS", "300"))  # waiting time worth one level
+PRIORITY_RANK = {'critical': 0, 'urgent': 0, 'high': 1, 'medium': 2, 'normal': 2, 'low': 3}
+DEFAULT_RANK = PRIORITY_RANK['medium']
+
+
+def priority_rank(metadata: dict) -> int:
+    return PRIORITY_RANK.get(str(metadata.get('priority', '')).strip().lower(), DEFAULT_RANK)
+
+
+class PriorityWorkQueue:
+    """Heap of vault items keyed on arrival time plus a per-priority delay."""
+
+    def __init__(self, aging_seconds: float = AGING_SECONDS):
+        self.aging_seconds = aging_seconds
+        self._heap = []           # (key, seq, path)
+        self._items = {}          # path -> (key, mtime_ns, payload)
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, path) -> bool:
+        return str(path) in self._items
+
+    def _key(self, path: str, mtime: float) -> float:
+        try:
+            rank = priority_rank(read_frontmatter(path))
+        except OSError:
+            rank = DEFAULT_RANK
+        return mtime + rank * self.aging_seconds
+
+    def push(self, path, payload: Any = None, stat: os.stat_result = None):
+        """Adds (or re-keys, if the file changed) one item."""
+        path = str(path)
+        stat = stat or os.stat(path)
+        current = self._items.get(path)
+        if current and current[1] == stat.st_mtime_ns:
+            if current[2] is not payload:
+                self._items[path] = (current[0], current[1], payload)
+            return
+        key = self._key(path, stat.st_mtime)
+        self._items[path] = (key, stat.st_mtime_ns, payload)
+        heapq.heappush(self._heap, (key, next(self._seq), path))
+
+    def discard(self, path):
+        self._items.pop(str(path), None)
+
+    def sync(self, items: Iterable[Tuple[Any, Any]]):
+        """Makes the queue hold exactly these (path or os.DirEntry, payload) items."""
+        present = set()
+        for item, payload in items:
+            if isinstance(item, os.DirEntry):
+                path, stat = item.path, item.stat()
+            else:
+                path, stat = str(item), None
+            present.add(path)
+            try:
+                self.push(path, payload, stat)
+            except FileNotFoundError:
+                present.discard(path)
+        for path in [p for p in self._items if p not in present]:
+            del self._items[path]
+        # Rebuild once the heap is mostly stale entries, so it cannot grow without bound
+        if len(self._heap) > 2 * len(self._items) + 64:
+            self._heap = [(k, s, p) for k, s, p in self._heap if self._is_live(k, p)]
+            heapq.heapify(self._heap)
+
+    def _is_live(self, key: float, path: str) -> bool:
+        current = self._items.get(path)
+        return current is not None and current[0] == key
+
+    def pop_batch(self, limit: int = None) -> List[Tuple[Path, Any]]:
+        """Removes and returns up to limit (path, payload) items, most urgent first."""
+        batch = []
+        while self._heap and (limit is None or len(batch) < limit):
+            key, _, path = heapq.heappop(self._heap)
+            if not self._is_live(key, path):
+                continue
+            batch.append((Path(path), self._items.pop(path)[2]))
+        return batch
+
+    def ordered(self) -> List[Path]:
+        """All queued paths, most urgent first, without removing them."""
+        return [Path(path) for path, _ in sorted(self._items.items(), key=lambda kv: kv[1][0])]
@@ -0,0 +1,20 @@
+"""
+Fixtures shared by the tests in this folder
+"""
+import os
+import time
+
+import pytest
+
+
+@pytest.fixture
+def make_item():
+    """Factory for an email action file at folder/rel, with the given priority and age."""
+    def make(folder, rel, priority="medium", age_seconds=0):
+        path = folder / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"---\ntype: email\npriority: {priority}\n---\n\nbody\n", encoding="utf-8")
+        stamp = time.time() - age_seconds
+        os.utime(path, (stamp, stamp))
+        return path
+    return make
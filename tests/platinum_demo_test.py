@@ -273,10 +273,11 @@ Hi, could you please send me the Q1 2026 invoice? Thanks!
     step(6, "Verify logging and signals")
 
     # Check logs folder has entries
-    log_files = list((VAULT_ROOT / "Logs").glob("cloud_log_*.json"))
+    from log_store import iter_log_files, read_entries
+    log_files = list(iter_log_files(VAULT_ROOT / "Logs", prefix="cloud_log"))
     if log_files:
-        latest_log = sorted(log_files)[-1]
-        logs = json.loads(latest_log.read_text(encoding='utf-8'))
+        latest_log = log_files[-1]
+        logs = read_entries(latest_log)
         if len(logs) > 0:
             passed(f"Cloud logs present: {len(logs)} entries in {latest_log.name}")
             results.append(True)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-pass streaming audit (Auditing/audit_stream.py)
+"""
+import sys
+import json
+import pytest
+from pathlib import Path
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "System"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Auditing"))
+import audit_generator
+from log_store import iter_logs
+from daily_rollup import entry_counters
+from audit_generator import AuditGenerator
+from audit_stream import (Aggregator, ActionCounts, EntryCount, SubscriptionCharges,
+                          default_aggregators, run_audit)
+
+
+def write_day(logs, day, entries):
+    logs.mkdir(parents=True, exist_ok=True)
+    with open(logs / f"log_{day.strftime('%Y-%m-%d')}.jsonl", "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write((entry if isinstance(entry, str) else json.dumps(entry)) + "\n")
+
+
+def entry(when, action_type, **details):
+    return {"timestamp": when.isoformat(), "action_type": action_type, "details": details}
+
+
+def test_one_pass_feeds_every_aggregator_and_skips_old_days(tmp_path):
+    logs = tmp_path / "Logs"
+    now = datetime.now()
+    # Days outside the period are left out
+    write_day(logs, now - timedelta(days=30), [entry(now - timedelta(days=30), "email_sent")])
+    write_day(logs, now - timedelta(days=2), [
+        entry(now - timedelta(days=2), "email_sent"),
+        entry(now - timedelta(days=2), "odoo_sync", description="Invoice from zoom.us", amount=15),
+    ])
+    write_day(logs, now, [entry(now, "email_sent", note="payment received")])
+
+    seen = []
+
+    class Spy(Aggregator):
+        name = "spy"
+
+        def add(self, entry, text=None):
+            seen.append(entry["action_type"])
+
+        def result(self):
+            return len(seen)
+
+    results = run_audit(logs, default_aggregators() + [Spy()], start=now - timedelta(days=7))
+    assert results["entries"] == results["spy"] == 3
+    assert results["actions"] == {"email_sent": 2, "odoo_sync": 1}
+    assert results["revenue"] == 2  # the invoice and the payment
+    assert [(s["name"], s["amount"]) for s in results["subscriptions"]] == [("Zoom", 15)]
+
+
+def test_actions_are_keyed_like_the_rollup(tmp_path):
+    now = datetime.now()
+    # Audit events carry an event_type instead of an action_type
+    write_day(tmp_path, now, [entry(now, "email_sent"), {"timestamp": now.isoformat(), "event_type": "approval_granted"}])
+    results = run_audit(tmp_path, [ActionCounts()])
+    rollup = Counter(key for e in iter_logs(tmp_path) for metric, key in entry_counters(e) if metric == "action")
+    assert results["actions"] == rollup == {"email_sent": 1, "approval_granted": 1}
+
+
+def test_half_implemented_aggregator_fails_at_construction():
+    class NoResult(Aggregator):
+        def add(self, entry, text=None):
+            pass
+
+    with pytest.raises(TypeError):
+        NoResult()
+
+
+def test_subscription_charges_keep_a_bounded_tail(tmp_path):
+    now = datetime.now()
+    write_day(tmp_path, now, [entry(now + timedelta(seconds=i), "odoo_sync", description=f"slack.com #{i}", amount=i)
+                              for i in range(10)])
+    charges = SubscriptionCharges(limit=3)
+    run_audit(tmp_path, [EntryCount(), ActionCounts(), charges])
+    assert charges.found == 10
+    assert [s["amount"] for s in charges.result()] == [7, 8, 9]
+
+
+def test_briefing_streams_the_logs_when_the_rollup_is_off(tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_generator, "ROLLUP_ENABLED", False)
+    now = datetime.now()
+    write_day(tmp_path / "Logs", now, [entry(now, "email_sent")] * 4 + [
+        entry(now, "odoo_sync", description="Billing from notion.so", amount=10)])
+    for rel in ("Done/Email/EMAIL_a.md", "Done/WhatsApp/WHATSAPP_b.md"):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text("done\n", encoding="utf-8")
+
+    briefing = AuditGenerator(tmp_path).generate_ceo_briefing(7).read_text(encoding="utf-8")
+    assert "System processed 5 actions and completed 2 tasks." in briefing
+    assert "- **Revenue Activities**: 1 identified" in briefing
+    assert "  - Email: 1\n  - WhatsApp: 1\n  - Files: 0" in briefing
+    assert "- **Notion**: $10 detected on" in briefing
+    assert not (tmp_path / "Logs" / ".daily_rollup.db").exists()
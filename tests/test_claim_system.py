@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for atomic task claiming (System/claim_system.py)
+
+The stress test starts several claimant processes against the same
+Needs_Action folder and checks every task ends up claimed exactly once.
+"""
+import os
+import sys
+import time
+import multiprocessing
+from pathlib import Path
+
+SYSTEM_DIR = str(Path(__file__).resolve().parent.parent / "System")
+sys.path.insert(0, SYSTEM_DIR)
+import claim_system
+from claim_system import ClaimSystem
+
+AGENTS = 6
+TASKS = 300
+
+
+def _claimant(vault, agent, start, results):
+    sys.path.insert(0, SYSTEM_DIR)
+    import logging
+    logging.disable(logging.CRITICAL)
+    from claim_system import ClaimSystem
+
+    claims = ClaimSystem(vault, agent)
+    start.wait()
+    won = []
+    while True:
+        tasks = claims.scan_unclaimed_tasks()
+        if not tasks:
+            break
+        won.extend(t.name for t in tasks if claims.claim_task(t))
+    results.put((agent, won))
+
+
+def test_concurrent_claimants_never_double_claim(tmp_path):
+    needs_action = tmp_path / "Needs_Action"
+    needs_action.mkdir()
+    for i in range(TASKS):
+        (needs_action / f"TASK_{i:04d}.md").write_text(f"---\ntype: task\n---\n\nTask {i}\n", encoding="utf-8")
+
+    ctx = multiprocessing.get_context("spawn")
+    start, results = ctx.Event(), ctx.Queue()
+    workers = [ctx.Process(target=_claimant, args=(str(tmp_path), f"agent_{n}", start, results))
+               for n in range(AGENTS)]
+    for w in workers:
+        w.start()
+    start.set()
+    won = dict(results.get(timeout=60) for _ in workers)
+    for w in workers:
+        w.join(timeout=10)
+
+    claimed = [name for names in won.values() for name in names]
+    assert len(claimed) == len(set(claimed)) == TASKS
+    for agent, names in won.items():
+        on_disk = {p.name for p in (tmp_path / "In_Progress" / agent).glob("*.md")}
+        assert on_disk == set(names)
+    assert not list(needs_action.glob("*.md"))
+
+
+def test_release_clears_the_claim(tmp_path):
+    (tmp_path / "Needs_Action").mkdir()
+    (tmp_path / "Done").mkdir()
+    task = tmp_path / "Needs_Action" / "TASK_1.md"
+    task.write_text("body", encoding="utf-8")
+
+    local, cloud = ClaimSystem(str(tmp_path), "local"), ClaimSystem(str(tmp_path), "cloud")
+    assert local.claim_task(task)
+    assert not cloud.claim_task(task)
+    assert "claimed_by: local" in (local.in_progress_path / "TASK_1.md").read_text(encoding="utf-8")
+
+    local.release_task(local.in_progress_path / "TASK_1.md")
+    assert cloud.scan_unclaimed_tasks() == [task]
+    assert cloud.claim_task(task)
+    cloud.release_task(cloud.in_progress_path / "TASK_1.md", "Done")
+    assert local.claimed_names() == set()
+
+
+def test_expired_lease_returns_task_and_heartbeat_keeps_it(tmp_path):
+    (tmp_path / "Needs_Action").mkdir()
+    for name in ("TASK_A.md", "TASK_B.md"):
+        (tmp_path / "Needs_Action" / name).write_text("body", encoding="utf-8")
+
+    crashed = ClaimSystem(str(tmp_path), "cloud", lease_seconds=60)
+    alive = ClaimSystem(str(tmp_path), "local", lease_seconds=60)
+    assert crashed.claim_task(tmp_path / "Needs_Action" / "TASK_A.md")
+    assert alive.claim_task(tmp_path / "Needs_Action" / "TASK_B.md")
+
+    stale = time.time() - 120
+    for name in ("TASK_A.md", "TASK_B.md"):
+        os.utime(crashed.claims_path / name, (stale, stale))
+    assert alive.renew_leases() == 1  # only local's heartbeat runs
+
+    assert alive.scan_unclaimed_tasks() == [tmp_path / "Needs_Action" / "TASK_A.md"]
+    assert not (crashed.in_progress_path / "TASK_A.md").exists()
+    assert (alive.in_progress_path / "TASK_B.md").exists()
+    assert alive.claimed_names() == {"TASK_B.md"}
+    assert alive.claim_task(tmp_path / "Needs_Action" / "TASK_A.md")
+
+
+def test_janitor_drops_its_marker_when_a_new_claim_appears(tmp_path, monkeypatch):
+    (tmp_path / "Needs_Action").mkdir()
+    (tmp_path / "Needs_Action" / "TASK_A.md").write_text("body", encoding="utf-8")
+    claims = ClaimSystem(str(tmp_path), "cloud", lease_seconds=60)
+    assert claims.claim_task(tmp_path / "Needs_Action" / "TASK_A.md")
+    stale = time.time() - 120
+    os.utime(claims.claims_path / "TASK_A.md", (stale, stale))
+
+    real_rename = os.rename
+
+    def rename_then_renew_and_reclaim(src, dst):
+        real_rename(src, dst)
+        os.utime(dst)  # the owner's heartbeat lands on the marker...
+        Path(src).write_text("local", encoding="utf-8")  # ...and a new claim takes the name
+    monkeypatch.setattr(claim_system.os, "rename", rename_then_renew_and_reclaim)
+
+    assert claims.expire_leases() == []
+    assert [p.name for p in claims.claims_path.iterdir()] == ["TASK_A.md"]
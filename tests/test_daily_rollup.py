@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental daily rollup (System/daily_rollup.py)
+"""
+import os
+import sys
+import json
+import time
+from pathlib import Path
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "System"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Auditing"))
+from log_store import append_entries, daily_log_path
+from daily_rollup import DailyRollup, day_range, record_events
+from state_index import WorkflowIndex
+from audit_generator import AuditGenerator
+
+
+def entry(action_type, **details):
+    return {"timestamp": datetime.now().isoformat(), "action_type": action_type, "details": details}
+
+
+def test_appended_log_entries_are_counted(tmp_path):
+    logs = tmp_path / "Logs"
+    append_entries(daily_log_path(logs), [
+        entry("email_sent", category="Email"),
+        entry("email_sent", description="Invoice #12 paid"),
+        entry("odoo_sync", description="Charge from adobe.com", amount=54.99),
+    ])
+    # Secondary logs (cloud_log_, sync_log_, ...) are not part of the rollup
+    append_entries(daily_log_path(logs, "sync_log"), [entry("cloud_push")])
+
+    today = date.today()
+    totals = DailyRollup(logs).totals(today, today)
+    assert totals["action"] == {"email_sent": 2, "odoo_sync": 1}
+    assert totals["category"] == {"Email": 1}
+    assert totals["revenue"][""] == 1
+    [charge] = totals["subscription"]
+    assert json.loads(charge)[:2] == ["Adobe Creative Cloud", 54.99]
+
+
+def test_moves_into_done_and_events_are_counted(tmp_path):
+    index = WorkflowIndex(tmp_path)
+    item = tmp_path / "Needs_Action/Email/EMAIL_a.md"
+    item.parent.mkdir(parents=True)
+    item.write_text("---\ntype: email\n---\n\nbody\n", encoding="utf-8")
+    done = tmp_path / "Done/Email/EMAIL_a.md"
+    done.parent.mkdir(parents=True)
+
+    index.move(item, done)
+    index.move(done, tmp_path / "Done/EMAIL_a.md")  # reshuffling inside Done is not a new completion
+    record_events(tmp_path / "Logs", [("social", "linkedin"), ("plan", "email")])
+
+    today = date.today()
+    totals = DailyRollup(tmp_path / "Logs").totals(today, today)
+    assert totals["done"] == {"Email": 1}
+    assert totals["done_type"] == {"email": 1}
+    assert totals["social"] == {"linkedin": 1} and totals["plan"] == {"email": 1}
+
+
+def test_days_from_before_the_rollup_are_backfilled_once(tmp_path):
+    logs = tmp_path / "Logs"
+    logs.mkdir()
+    past = date.today() - timedelta(days=2)
+    lines = [json.dumps(entry("file_moved")), json.dumps(entry("payment_received"))]
+    (logs / f"log_{past}.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    posted = tmp_path / "Done/LinkedIn/LINKEDIN_POSTED_x.md"
+    posted.parent.mkdir(parents=True)
+    posted.write_text("posted\n", encoding="utf-8")
+    stamp = time.mktime(past.timetuple()) + 3600
+    os.utime(posted, (stamp, stamp))
+
+    rollup = DailyRollup(logs)
+    assert rollup.incomplete_days(past, date.today()) == [
+        past.isoformat(), (past + timedelta(days=1)).isoformat(), date.today().isoformat()]
+    rollup.ensure_days(tmp_path, past, date.today())
+    assert rollup.incomplete_days(past, date.today()) == []
+
+    totals = rollup.totals(past, past)
+    assert totals["action"] == {"file_moved": 1, "payment_received": 1}
+    assert totals["revenue"][""] == 1 and totals["social"] == {"linkedin": 1}
+
+    # Later events add to the backfilled counts instead of triggering another recount
+    record_events(logs, [("social", "linkedin")])
+    rollup.ensure_days(tmp_path, past, date.today())
+    assert rollup.totals(past, date.today())["social"]["linkedin"] == 2
+
+
+def test_ceo_briefing_reads_the_rollup(tmp_path):
+    append_entries(daily_log_path(tmp_path / "Logs"), [entry("email_sent")] * 6 + [
+        entry("odoo_sync", description="Invoice from slack.com", amount=8)])
+    # The rollup is new, so today is recounted from disk: completions must exist as files
+    for rel in ("Done/Email/EMAIL_a.md", "Done/Email/EMAIL_b.md", "Done/Files/FILE_c.md"):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text("done\n", encoding="utf-8")
+
+    briefing = AuditGenerator(tmp_path).generate_ceo_briefing(7).read_text(encoding="utf-8")
+    assert "System processed 7 actions and completed 3 tasks." in briefing
+    assert "- **Revenue Activities**: 1 identified" in briefing
+    assert "  - Email: 2\n  - WhatsApp: 0\n  - Files: 1" in briefing
+    assert "- **Slack**: $8 detected on" in briefing
+
+
+def test_rebuilt_days_count_what_the_live_counters_count(tmp_path):
+    logs = tmp_path / "Logs"
+    rollup = DailyRollup(logs)
+    past, today = date.today() - timedelta(days=3), date.today()
+    rollup.rebuild(tmp_path, day_range(past, today))  # nothing on disk yet: every day is complete
+
+    # An item that arrived days ago is completed today; the rename keeps its old mtime
+    item = tmp_path / "Needs_Action/Email/EMAIL_old.md"
+    item.parent.mkdir(parents=True)
+    item.write_text("---\ntype: email\n---\n\nbody\n", encoding="utf-8")
+    stamp = time.mktime(past.timetuple()) + 3600
+    os.utime(item, (stamp, stamp))
+    (tmp_path / "Done/Email").mkdir(parents=True)
+    WorkflowIndex(tmp_path).move(item, tmp_path / "Done/Email/EMAIL_old.md")
+
+    # A post the social auto-poster wrote straight into Done
+    post = tmp_path / "Done/Facebook/FACEBOOK_POST_20260101_100000.md"
+    post.parent.mkdir(parents=True)
+    post.write_text("---\ntype: social_post\n---\n", encoding="utf-8")
+    record_events(logs, [("social", "facebook")])
+
+    live = rollup.totals(past, today)
+    rollup.rebuild(tmp_path, day_range(past, today))
+    rebuilt = rollup.totals(past, today)
+    assert rebuilt == live
+    assert rebuilt["done"] == {"Email": 1} and rebuilt["social"] == {"facebook": 1}
+    assert rollup.totals(today, today)["done"] == {"Email": 1}
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the Dashboard.md model and renderer (System/dashboard_model.py)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "System"))
+from dashboard_model import DashboardModel
+
+DASHBOARD = """# AI Employee Dashboard
+
+## Live Processing Status
+
+- 🕐 **Last checked**: 2026-01-01 00:00
+- 📧 **Pending emails in Needs_Action**: 0
+- 🔥 **Important pending in Pending_Approval**: 0
+
+---
+
+## Recent Activity
+- 2026-01-01: System installed
+
+---
+
+## Upcoming Tasks
+
+- Weekly CEO briefing
+"""
+
+
+def test_ring_is_bounded_and_hand_written_sections_survive(tmp_path):
+    dashboard = tmp_path / "Dashboard.md"
+    dashboard.write_text(DASHBOARD, encoding="utf-8")
+
+    model = DashboardModel(dashboard, recent_limit=3).load()
+    model.set_counts({"needs_action_emails": 4, "pending_approval": 2})
+    for i in range(5):
+        model.add_activity(f"event {i}")
+    assert model.render()
+
+    content = dashboard.read_text(encoding="utf-8")
+    assert "- 📧 **Pending emails in Needs_Action**: 4\n" in content
+    assert "## Recent Activity\n- event 4\n- event 3\n- event 2\n\n---\n\n## Upcoming Tasks" in content
+    assert "System installed" not in content  # pushed out of the ring
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_render_skips_unchanged_model_and_merges_other_writers(tmp_path):
+    dashboard = tmp_path / "Dashboard.md"
+    dashboard.write_text(DASHBOARD, encoding="utf-8")
+
+    daemon = DashboardModel(dashboard).load()
+    daemon.set_counts({"needs_action_emails": 1})
+    assert daemon.render()
+    daemon.set_counts({"needs_action_emails": 1})
+    assert not daemon.render()
+
+    # A separate process (e.g. ceo_briefing) adds an entry through the sidecar
+    briefing = DashboardModel(dashboard).load()
+    briefing.add_activity("briefing generated")
+    briefing.render()
+
+    daemon.add_activity("email sent")
+    daemon.render()
+    content = dashboard.read_text(encoding="utf-8")
+    assert "- email sent\n- briefing generated\n- 2026-01-01: System installed\n" in content
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the drop-folder handler (watchers/filesystem_watcher.py)
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "watchers"))
+from filesystem_watcher import DropDebouncer, DropFolderHandler
+
+
+def test_duplicate_drops_are_hashed_once_and_linked(tmp_path):
+    handler = DropFolderHandler(str(tmp_path))
+    payload = os.urandom(3 * 1024 * 1024 + 17)  # spans several copy chunks
+    first = tmp_path / "report.pdf"
+    first.write_bytes(payload)
+    second = tmp_path / "report copy.pdf"
+    second.write_bytes(payload)
+
+    handler.process_file(first)
+    handler.process_file(second)
+
+    copy_a = tmp_path / "Needs_Action" / "Files" / "FILE_report.pdf"
+    copy_b = tmp_path / "Needs_Action" / "Files" / "FILE_report copy.pdf"
+    assert copy_a.read_bytes() == payload
+    assert os.path.samefile(copy_a, copy_b)
+    metas = sorted((tmp_path / "Needs_Action" / "Files").glob("*.md"))
+    assert any("duplicate_of: FILE_report.pdf" in m.read_text(encoding="utf-8") for m in metas)
+
+    # The index survives a restart
+    assert len(DropFolderHandler(str(tmp_path)).content_index) == 1
+    handler.executor.shutdown()
+
+
+def test_debouncer_emits_once_after_writes_settle(tmp_path):
+    emitted = []
+    debouncer = DropDebouncer(emitted.append, settle_seconds=0.3, poll_interval=3600)  # driven manually
+    drop = tmp_path / "big.csv"
+
+    with open(drop, "wb") as f:
+        for i in range(3):
+            f.write(b"x" * 1024)
+            f.flush()
+            debouncer.touch(drop)  # created, then modified twice
+            debouncer.check()
+    assert emitted == []  # still changing
+
+    debouncer.check()
+    time.sleep(0.35)
+    debouncer.check()
+    debouncer.check()
+    assert emitted == [drop]
+
+    closed = tmp_path / "closed.txt"
+    closed.write_text("done", encoding="utf-8")
+    debouncer.touch(closed)
+    debouncer.closed(closed)  # close-write: no need to wait for the settle time
+    debouncer.check()
+    assert emitted == [drop, closed]
+    debouncer.stop()
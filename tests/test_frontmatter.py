@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached frontmatter parser (System/frontmatter.py)
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "System"))
+import frontmatter
+
+
+def test_unchanged_files_are_not_reparsed(tmp_path):
+    frontmatter.clear_cache()
+    email = tmp_path / "EMAIL_1.md"
+    email.write_text("---\nfrom: 'a@example.com'\nsubject: Hi: there\n---\n\n" + "body\n" * 100000,
+                     encoding="utf-8")
+
+    assert frontmatter.read_frontmatter(email) == {"from": "a@example.com", "subject": "Hi: there"}
+    for _ in range(5):
+        frontmatter.read_frontmatter(email)
+    assert frontmatter.cache_info()["misses"] == 1
+
+    email.write_text("---\nfrom: b@example.com\n---\n", encoding="utf-8")
+    os.utime(email, ns=(1, 1))  # force a different mtime even on coarse clocks
+    assert frontmatter.read_frontmatter(email) == {"from": "b@example.com"}
+    assert frontmatter.cache_info()["misses"] == 2
+
+
+def test_header_parsing_edge_cases(tmp_path):
+    no_header = tmp_path / "plain.md"
+    no_header.write_text("just text\n---\nkey: value\n---\n", encoding="utf-8")
+    assert frontmatter.read_frontmatter(no_header) == {}
+
+    crlf = tmp_path / "crlf.md"
+    crlf.write_bytes(b"---\r\naction: payment\r\namount: 12.5\r\n---\r\nbody")
+    assert frontmatter.read_frontmatter(crlf, parser="yaml") == {"action": "payment", "amount": 12.5}
+
+    long_header = tmp_path / "long.md"
+    long_header.write_text("---\n" + "".join(f"k{i}: v{i}\n" for i in range(2000)) + "---\n", encoding="utf-8")
+    assert len(frontmatter.read_frontmatter(long_header)) == 2000
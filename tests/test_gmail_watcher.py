@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Tests for the Gmail watcher's state store and incremental sync (watchers_gmail/)
+
+FakeGmailService stands in for googleapiclient's Gmail resource: the same
+method chain (service.users().messages().get(...).execute()), backed by dicts.
+"""
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "watchers_gmail"))
+from gmail_watcher import GmailWatcher
+
+
+class FakeHttpError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.resp = type("Resp", (), {"status": status})()
+
+
+class FakeRequest:
+    def __init__(self, service, name, fn):
+        self.service = service
+        self.name = name
+        self.fn = fn
+
+    def execute(self):
+        self.service.calls.append(self.name)
+        return self.fn()
+
+
+class FakeGmailService:
+    def __init__(self):
+        self.store = {}
+        self.history_log = []  # (history_id, message_id)
+        self.history_id = 100
+        self.min_history_id = 0
+        self.calls = []
+
+    def add_message(self, message_id, subject, labels=("UNREAD", "INBOX"), snippet=""):
+        self.history_id += 1
+        self.store[message_id] = {
+            "id": message_id, "labelIds": list(labels), "snippet": snippet,
+            "payload": {"headers": [{"name": "Subject", "value": subject},
+                                    {"name": "From", "value": "sender@example.com"},
+                                    {"name": "Date", "value": "Mon, 1 Jun 2026 10:00:00"}]},
+        }
+        self.history_log.append((self.history_id, message_id))
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return FakeMessages(self)
+
+    def history(self):
+        return FakeHistory(self)
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+    def getProfile(self, userId):
+        return FakeRequest(self, "getProfile", lambda: {"historyId": str(self.history_id)})
+
+
+class FakeBatch:
+    """One HTTP round trip carrying several requests, like BatchHttpRequest."""
+
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.calls.append("batch")
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, request.fn(), None)
+            except Exception as e:
+                self.callback(request_id, None, e)
+
+
+class FakeHistory:
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, userId, startHistoryId, historyTypes=None, pageToken=None):
+        def run():
+            if int(startHistoryId) < self.service.min_history_id:
+                raise FakeHttpError(404)
+            records = [{"id": str(h), "messagesAdded": [{"message": {"id": m}}]}
+                       for h, m in self.service.history_log if h > int(startHistoryId)]
+            return {"history": records, "historyId": str(self.service.history_id)}
+        return FakeRequest(self.service, "history.list", run)
+
+
+class FakeMessages:
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, userId, q, maxResults):
+        keywords = [kw.strip('"') for kw in q.split("AND", 1)[1].strip(" ()").split(" OR ")]
+
+        def run():
+            matched = [m for m in reversed(list(self.service.store.values()))
+                       if {"UNREAD", "IMPORTANT"} & set(m["labelIds"])
+                       and any(kw in m["payload"]["headers"][0]["value"].lower() for kw in keywords)]
+            return {"messages": [{"id": m["id"]} for m in matched[:maxResults]]}
+        return FakeRequest(self.service, "messages.list", run)
+
+    def get(self, userId, id, format="full", metadataHeaders=None):
+        def run():
+            if id not in self.service.store:
+                raise FakeHttpError(404)
+            return dict(self.service.store[id])
+        return FakeRequest(self.service, f"messages.get:{format}", run)
+
+    def modify(self, userId, id, body):
+        return FakeRequest(self.service, "messages.modify",
+                           lambda: self._remove_labels([id], body.get("removeLabelIds", [])))
+
+    def batchModify(self, userId, body):
+        return FakeRequest(self.service, "messages.batchModify",
+                           lambda: self._remove_labels(body["ids"], body.get("removeLabelIds", [])))
+
+    def _remove_labels(self, ids, labels):
+        for message_id in ids:
+            for label in labels:
+                if label in self.service.store[message_id]["labelIds"]:
+                    self.service.store[message_id]["labelIds"].remove(label)
+        return {}
+
+
+def poll(watcher):
+    messages = watcher.check_for_updates()
+    watcher.process_messages(messages)
+    watcher.commit_sync()
+    return messages
+
+
+def test_restart_does_not_reprocess_and_polls_fetch_only_deltas(tmp_path):
+    service = FakeGmailService()
+    service.add_message("m1", "Project deadline moved")
+    service.add_message("m2", "Lunch?")  # no keyword
+
+    watcher = GmailWatcher(str(tmp_path), service=service)
+    assert [m["id"] for m in poll(watcher)] == ["m1"]
+    assert (tmp_path / "Needs_Action" / "Email" / "EMAIL_m1.md").exists()
+    assert watcher.state_index.count("Needs_Action", "Email") == 1  # indexed as written, not at reconcile
+
+    # Restart: nothing new, so the poll is a single history call
+    watcher = GmailWatcher(str(tmp_path), service=service)
+    service.calls.clear()
+    assert poll(watcher) == []
+    assert service.calls == ["history.list"]
+
+    service.add_message("m3", "Invoice attached")
+    service.add_message("m4", "Weekend plans")
+    assert [m["id"] for m in poll(watcher)] == ["m3"]
+    assert "messages.list" not in service.calls
+
+
+def test_expired_history_id_falls_back_to_full_sync(tmp_path):
+    service = FakeGmailService()
+    service.add_message("m1", "Urgent: meeting today")
+    watcher = GmailWatcher(str(tmp_path), service=service)
+    poll(watcher)
+
+    service.add_message("m2", "Exam results")
+    service.min_history_id = 10_000  # Gmail only keeps about a week of history
+    assert [m["id"] for m in poll(watcher)] == ["m2"]
+    assert watcher.state.get("history_id") == str(service.history_id)
+
+
+def test_poll_uses_one_batch_get_and_one_batch_modify(tmp_path):
+    service = FakeGmailService()
+    watcher = GmailWatcher(str(tmp_path), service=service)
+    poll(watcher)
+
+    for i in range(5):
+        service.add_message(f"m{i}", f"Meeting #{i}")
+    service.add_message("gone", "Payment reminder")
+    del service.store["gone"]  # deleted before we fetched it
+    service.calls.clear()
+
+    assert len(poll(watcher)) == 5
+    assert service.calls == ["history.list", "batch", "messages.batchModify"]
+    assert all("UNREAD" not in m["labelIds"] for m in service.store.values())
+    assert len(list((tmp_path / "Needs_Action" / "Email").glob("EMAIL_*.md"))) == 5
+
+
+def test_failed_mark_as_read_does_not_duplicate_action_files(tmp_path, monkeypatch):
+    service = FakeGmailService()
+    watcher = GmailWatcher(str(tmp_path), service=service)
+    poll(watcher)
+    service.add_message("m1", "Invoice attached")
+
+    def fail(self, userId, body):
+        raise FakeHttpError(500)
+    with monkeypatch.context() as m:
+        m.setattr(FakeMessages, "batchModify", fail)
+        with pytest.raises(FakeHttpError):
+            poll(watcher)
+    action = tmp_path / "Needs_Action" / "Email" / "EMAIL_m1.md"
+    action.unlink()  # already picked up by the orchestrator
+
+    assert poll(watcher) == []
+    assert not action.exists()
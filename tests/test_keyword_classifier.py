@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared compiled keyword classifier (System/keyword_classifier.py)
+"""
+import sys
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "System"))
+from keyword_classifier import KeywordClassifier
+
+CATEGORIES = {
+    'Payment': ['payment', 'pay', 'invoice', '.inv'],
+    'Chat': ['hi', 'help', 'as soon as possible'],
+    'Urgent': ['urgent', 'asap', 'pay'],
+}
+
+
+def naive(text):
+    text = text.lower()
+    return [name for name, kws in CATEGORIES.items() if any(kw in text for kw in kws)]
+
+
+def test_matches_naive_substring_semantics():
+    classifier = KeywordClassifier(CATEGORIES)
+    cases = {
+        "This is fine": ["Chat"],                      # 'hi' inside 'this'
+        "Payday!": ["Payment", "Urgent"],              # 'pay' prefix of a longer word
+        "See invoice.inv": ["Payment"],
+        "Reply As Soon\tAs Possible": [],              # phrase split by a tab is not a substring
+        "reply as soon as possible, URGENT": ["Chat", "Urgent"],
+        "": [],
+    }
+    for text, expected in cases.items():
+        assert classifier.match(text) == expected == naive(text), text
+
+    assert classifier.keywords_in("PAYMENT help, pay now") == ["payment", "pay", "help"]
+    assert classifier.first("no match") is None
+
+    rng = random.Random(1)
+    alphabet = "payment invoice hi help urgent asap .inv xyz "
+    for _ in range(2000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert classifier.match(text) == naive(text), text
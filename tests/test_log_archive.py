@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for closed-day log compaction (System/log_archive.py, System/log_columnar.py)
+"""
+import sys
+import gzip
+import json
+import shutil
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "System"))
+from log_store import append_entries, count_entries, daily_log_path, iter_logs
+import log_archive
+from log_archive import compact_logs
+from log_query import LogQuery
+from log_columnar import ColumnarLog, write_columnar
+
+
+def entries_for(day, count):
+    return [{"timestamp": f"{day}T{i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}.{i:06d}",
+             "level": "error" if i % 50 == 0 else "info",
+             "action_type": ("email_sent", "file_moved", "plan_created")[i % 3],
+             "actor": f"agent{i % 4}", "details": {"n": i, "to": f"user{i}@example.com"},
+             "approval_status": None}
+            for i in range(count)]
+
+
+def test_compaction_round_trips_every_stored_form(tmp_path):
+    old, older = (datetime.now() - timedelta(days=d) for d in (1, 2))
+    old_day, older_day = old.strftime("%Y-%m-%d"), older.strftime("%Y-%m-%d")
+
+    # Older day: a gzipped rotation followed by the live JSONL
+    rotated = entries_for(older_day, 300)
+    append_entries(tmp_path / f"log_{older_day}.jsonl", rotated[:200])
+    with open(tmp_path / f"log_{older_day}.jsonl", "rb") as f_in, \
+            gzip.open(tmp_path / f"log_{older_day}.093000.jsonl.gz", "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    (tmp_path / f"log_{older_day}.jsonl").unlink()
+    append_entries(tmp_path / f"log_{older_day}.jsonl", rotated[200:])
+
+    # Yesterday: a legacy array plus JSONL, with an odd timestamp; today stays live
+    (tmp_path / f"log_{old_day}.json").write_text(json.dumps([{"timestamp": "yesterday", "x": 1}]), encoding="utf-8")
+    append_entries(tmp_path / f"log_{old_day}.jsonl", entries_for(old_day, 1000))
+    append_entries(daily_log_path(tmp_path), entries_for(datetime.now().strftime("%Y-%m-%d"), 10))
+    list(LogQuery(tmp_path).search(action_type="email_sent"))  # builds sidecars
+
+    before = list(iter_logs(tmp_path))
+    size_before = sum(f.stat().st_size for f in tmp_path.glob(f"log_{old_day}.*"))
+    results = compact_logs(tmp_path)
+
+    assert sorted(r["file"] for r in results) == [f"log_{older_day}.logc", f"log_{old_day}.logc"]
+    assert sorted(f.name for f in tmp_path.glob("log_*")) == sorted(
+        [f"log_{older_day}.logc", f"log_{old_day}.logc", daily_log_path(tmp_path).name])
+    assert [f.name for f in (tmp_path / ".index").iterdir()] == [daily_log_path(tmp_path).name + ".idx"]
+    assert list(iter_logs(tmp_path)) == before
+    assert (tmp_path / f"log_{old_day}.logc").stat().st_size * 5 < size_before
+    assert count_entries(tmp_path / f"log_{old_day}.logc") == 1001
+
+    errors = list(LogQuery(tmp_path).search(datetime.strptime(older_day, "%Y-%m-%d"), level="error", actor="agent0"))
+    assert [e["details"]["n"] for e in errors] == [0, 100, 200] + list(range(0, 1000, 100)) + [0]  # + today
+
+    # Compacting again is a no-op
+    assert compact_logs(tmp_path) == []
+
+
+def test_high_cardinality_columns_stay_out_of_the_header(tmp_path):
+    day = datetime.now().strftime("%Y-%m-%d")
+    entries = [{**entry, "resource": f"/vault/Done/EMAIL_{i}.md"} for i, entry in enumerate(entries_for(day, 5000))]
+    write_columnar(tmp_path / "day.logc", entries)
+
+    archive = ColumnarLog(tmp_path / "day.logc")
+    assert archive.columns["resource"]["encoding"] == "json"
+    assert archive.columns["action_type"]["encoding"] == "dict"
+    assert archive.data_start * 10 < (tmp_path / "day.logc").stat().st_size
+    assert list(archive.iter_rows()) == entries
+
+
+def test_late_entries_and_interrupted_cleanup(tmp_path):
+    day = (datetime.now() - timedelta(days=3)).strftime("%Y-%m-%d")
+    live = tmp_path / f"log_{day}.jsonl"
+    append_entries(live, entries_for(day, 20))
+    kept = live.read_bytes()
+    compact_logs(tmp_path)
+
+    # A run that died before removing its source: the leftover is dropped, not merged twice
+    live.write_bytes(kept)
+    compact_logs(tmp_path)
+    assert not live.exists()
+    assert count_entries(tmp_path / f"log_{day}.logc") == 20
+
+    # Entries that arrive after compaction are merged into the archive
+    append_entries(live, [{"timestamp": f"{day}T23:59:59", "action_type": "late"}])
+    compact_logs(tmp_path)
+    assert [e["action_type"] for e in iter_logs(tmp_path)][-1] == "late"
+    assert count_entries(tmp_path / f"log_{day}.logc") == 21
+
+
+def test_same_size_late_file_is_merged_not_dropped(tmp_path):
+    day = (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d")
+    live = tmp_path / f"log_{day}.jsonl"
+    append_entries(live, [{"timestamp": f"{day}T10:00:00", "action_type": "first"}])
+    compact_logs(tmp_path)
+
+    # Late entries recreate the file at exactly the absorbed size, with different content
+    append_entries(live, [{"timestamp": f"{day}T11:00:00", "action_type": "later"}])
+    assert live.stat().st_size == len(json.dumps({"timestamp": f"{day}T10:00:00", "action_type": "first"})) + 1
+    compact_logs(tmp_path)
+    assert [e["action_type"] for e in iter_logs(tmp_path)] == ["first", "later"]
+
+
+def test_appends_during_compaction_are_not_lost(tmp_path, monkeypatch):
+    day = (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d")
+    live = tmp_path / f"log_{day}.jsonl"
+    append_entries(live, entries_for(day, 5))
+    read_source = log_archive._read_source
+    appended = []
+
+    def read_then_append(path, skip=0):
+        result = read_source(path, skip)
+        if not appended:  # a writer appends after the file was read, before the sources are removed
+            appended.append(True)
+            append_entries(path, [{"timestamp": f"{day}T23:59:59", "action_type": "late"}])
+        return result
+
+    monkeypatch.setattr(log_archive, "_read_source", read_then_append)
+    compact_logs(tmp_path)
+
+    assert not live.exists()
+    entries = list(iter_logs(tmp_path))
+    assert len(entries) == 6 and entries[-1]["action_type"] == "late"
+
+
+def test_torn_tail_of_a_closed_day_is_dropped_with_its_file(tmp_path):
+    day = (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d")
+    live = tmp_path / f"log_{day}.jsonl"
+    append_entries(live, entries_for(day, 3))
+    with open(live, "ab") as f:
+        f.write(b'{"timestamp": "' + day.encode() + b'T23:59')  # the write a crash cut short
+
+    assert compact_logs(tmp_path)[0]["changed"] == []
+    assert not live.exists()
+    assert len(list(iter_logs(tmp_path))) == len(list(LogQuery(tmp_path).search())) == 3
+    assert compact_logs(tmp_path) == []
+
+
+def test_readers_skip_what_the_archive_already_holds(tmp_path):
+    day = (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d")
+    live = tmp_path / f"log_{day}.jsonl"
+    append_entries(live, entries_for(day, 6))
+    kept = live.read_bytes()
+    compact_logs(tmp_path)
+
+    # Between the archive's rename and the removal of its sources, both are on disk
+    live.write_bytes(kept)
+    assert len(list(iter_logs(tmp_path))) == 6
+    assert len(list(LogQuery(tmp_path).search(action_type="email_sent"))) == 2
+
+    # A source kept because it grew: only what was added is new
+    append_entries(live, [{"timestamp": f"{day}T23:59:59", "action_type": "email_sent"}])
+    assert len(list(iter_logs(tmp_path))) == 7
+    assert len(list(LogQuery(tmp_path).search(action_type="email_sent"))) == 3
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the indexed log query engine (System/log_query.py)
+"""
+import sys
+import json
+from pathlib import Path
+from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "System"))
+from log_store import append_entries, append_entry
+from log_query import LogQuery
+
+
+def write_day(folder, day, count):
+    append_entries(folder / f"log_{day}.jsonl", [
+        {"timestamp": f"{day}T{h:02d}:00:00", "level": "error" if h % 6 == 0 else "info",
+         "action_type": "email_sent" if h % 2 else "file_moved", "actor": f"agent{h % 3}"}
+        for h in range(count)
+    ])
+
+
+def test_search_prunes_days_and_trims_boundary_days(tmp_path):
+    for day in ("2026-03-01", "2026-03-02", "2026-03-03", "2026-03-04"):
+        write_day(tmp_path, day, 24)
+    (tmp_path / "log_2026-03-01.jsonl").write_text("not json\n", encoding="utf-8")  # outside the range, never read
+
+    query = LogQuery(tmp_path)
+    found = list(query.search(datetime(2026, 3, 2, 12), datetime(2026, 3, 3, 23, 59, 59, 999999)))
+    assert len(found) == 12 + 24
+    assert found[0]["timestamp"] == "2026-03-02T12:00:00"
+
+    errors = list(query.search(datetime(2026, 3, 2), level="error", action_type="file_moved", actor="agent0"))
+    assert [e["timestamp"][11:13] for e in errors] == ["00", "06", "12", "18"] * 3
+
+
+def test_sidecar_index_is_extended_and_rebuilt(tmp_path):
+    log_file = tmp_path / "log_2026-03-01.jsonl"
+    write_day(tmp_path, "2026-03-01", 4)
+    query = LogQuery(tmp_path)
+    assert len(list(query.search(action_type="email_sent"))) == 2
+    index = json.loads(query.index_path(log_file).read_text(encoding="utf-8"))
+    assert index["size"] == log_file.stat().st_size
+
+    # Appends are picked up incrementally, including a torn line once it is completed
+    append_entry(log_file, {"timestamp": "2026-03-01T05:00:00", "action_type": "email_sent"})
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write('{"timestamp": "2026-03-01T06:00:00", "action_type": "email_')
+    assert len(list(query.search(action_type="email_sent"))) == 3
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write('sent"}\n')
+    assert len(list(query.search(action_type="email_sent"))) == 4
+
+    # A replaced (rotated) file gets a fresh index
+    log_file.write_text('{"timestamp": "2026-03-01T07:00:00", "action_type": "rotated"}\n', encoding="utf-8")
+    assert list(query.search(action_type="email_sent")) == []
+    assert len(list(query.search(action_type="rotated"))) == 1
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for the append-only JSONL log store (System/log_store.py)
+"""
+import sys
+import json
+from pathlib import Path
+from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "System"))
+from log_store import append_entry, daily_log_path, iter_log_files, iter_logs, read_entries
+
+
+def test_append_and_read_jsonl(tmp_path):
+    log_file = daily_log_path(tmp_path)
+    for i in range(3):
+        append_entry(log_file, {"timestamp": datetime.now().isoformat(), "action_type": f"a{i}"})
+
+    lines = log_file.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+    assert [e["action_type"] for e in read_entries(log_file)] == ["a0", "a1", "a2"]
+
+
+def test_reader_accepts_legacy_array_and_torn_lines(tmp_path):
+    legacy = tmp_path / "log_2026-01-01.json"
+    legacy.write_text(json.dumps([{"action_type": "old"}], indent=2), encoding="utf-8")
+    assert read_entries(legacy) == [{"action_type": "old"}]
+
+    new = tmp_path / "log_2026-01-02.jsonl"
+    new.write_text('{"action_type": "ok"}\n{"action_type": "to', encoding="utf-8")
+    assert read_entries(new) == [{"action_type": "ok"}]
+
+
+def test_date_range_prunes_files(tmp_path):
+    for day in ("2026-01-01", "2026-01-05", "2026-01-09"):
+        append_entry(tmp_path / f"log_{day}.jsonl", {"day": day})
+    (tmp_path / "cloud_log_2026-01-05.jsonl").write_text('{"day": "cloud"}\n', encoding="utf-8")
+
+    files = list(iter_log_files(tmp_path, start=datetime(2026, 1, 2), end=datetime(2026, 1, 8)))
+    assert [f.name for f in files] == ["log_2026-01-05.jsonl"]
+    assert [e["day"] for e in iter_logs(tmp_path)] == ["2026-01-01", "2026-01-05", "2026-01-09"]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the write-behind mode of AILogger (Logging/logging_system.py)
+"""
+import sys
+import time
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Logging"))
+from datetime import datetime
+
+from logging_system import AILogger, AuditEventType, LogAggregator, LogLevel
+from log_store import read_entries
+
+
+def test_write_behind_batches_and_flushes_on_close(tmp_path):
+    logger = AILogger(str(tmp_path), write_behind=True, batch_size=50,
+                      flush_interval_ms=10000, max_queue_size=20)
+    for i in range(120):
+        logger.log_audit_event(AuditEventType.FILE_MOVED, "orchestrator", f"EMAIL_{i}.md")
+    logger.close()
+
+    entries = read_entries(logger.get_current_log_file())
+    assert [e["resource"] for e in entries] == [f"EMAIL_{i}.md" for i in range(120)]
+
+
+def test_flush_logs_writes_queued_entries(tmp_path):
+    logger = AILogger(str(tmp_path), write_behind=True, batch_size=1000, flush_interval_ms=10000)
+    logger.log_action("email_sent", {"to": "a@example.com"})
+    logger.flush_logs()
+    assert len(read_entries(logger.get_current_log_file())) == 1
+
+    logger.close()
+    logger.log_action("after_close", {})
+    assert len(read_entries(logger.get_current_log_file())) == 2
+
+
+def test_flush_logs_keeps_file_order_while_the_flusher_runs(tmp_path):
+    logger = AILogger(str(tmp_path), write_behind=True, batch_size=7, flush_interval_ms=5)
+    write_batch = logger._write_batch
+
+    def slow_write_batch(entries):
+        time.sleep(0.002)  # widen the window in which a batch is in flight
+        write_batch(entries)
+
+    logger._write_batch = slow_write_batch
+    done = threading.Event()
+
+    def flush_repeatedly():
+        while not done.is_set():
+            logger.flush_logs()
+
+    flusher = threading.Thread(target=flush_repeatedly)
+    flusher.start()
+    for i in range(500):
+        logger.log_action("tick", {"n": i})
+    done.set()
+    flusher.join()
+    logger.close()
+
+    assert [e["details"]["n"] for e in read_entries(logger.get_current_log_file())] == list(range(500))
+
+
+def test_flush_logs_returns_while_other_threads_keep_logging(tmp_path):
+    logger = AILogger(str(tmp_path), write_behind=True, batch_size=50, flush_interval_ms=5)
+    write_batch = logger._write_batch
+
+    def slow_write_batch(entries):
+        time.sleep(0.002)  # producers outpace the flusher, so the queue never runs dry
+        write_batch(entries)
+
+    logger._write_batch = slow_write_batch
+    done = threading.Event()
+
+    def produce():
+        while not done.is_set():
+            logger.log_action("tick", {})
+
+    producers = [threading.Thread(target=produce) for _ in range(3)]
+    for producer in producers:
+        producer.start()
+    try:
+        time.sleep(0.05)
+        logger.log_action("marker", {})
+        assert logger.flush_logs(timeout=5)
+        assert "marker" in [e["action_type"] for e in read_entries(logger.get_current_log_file())]
+    finally:
+        done.set()
+        for producer in producers:
+            producer.join()
+        logger.close()
+
+
+def test_search_and_compliance_report_cover_the_requested_days(tmp_path):
+    logger = AILogger(str(tmp_path))
+    logger.log_action("email_sent", {"to": "a@example.com"}, actor="orchestrator")
+    logger.log_action("email_failed", {}, actor="orchestrator", level=LogLevel.ERROR)
+    logger.log_audit_event(AuditEventType.FILE_MOVED, "orchestrator", "EMAIL_1.md")
+
+    assert len(logger.search_logs(actor="orchestrator")) == 3
+    assert [e["action_type"] for e in logger.search_logs(level=LogLevel.ERROR)] == ["email_failed"]
+    assert logger.search_logs(start_date=datetime(2000, 1, 1), end_date=datetime(2000, 1, 2)) == []
+
+    today = datetime.now().strftime('%Y-%m-%d')
+    report = LogAggregator(str(tmp_path)).generate_compliance_report(today, today)
+    assert report['summary'] == {'total_events': 3, 'audit_events': 1, 'security_events': 0, 'errors': 1}
+    logger.close()
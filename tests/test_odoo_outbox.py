@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the Odoo activity outbox (System/odoo_outbox.py)
+"""
+import sys
+import json
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "System"))
+from odoo_outbox import OdooOutbox
+
+
+@pytest.fixture
+def odoo_server():
+    """Local stand-in for the Odoo MCP server; fails the first `fail_next` requests."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            status = 200
+            if server.fail_next > 0:
+                server.fail_next -= 1
+                status = 503
+            else:
+                received.append(body)
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    server.fail_next = 0
+    server.received = received
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+def test_failed_events_survive_restart_and_are_retried(tmp_path, odoo_server):
+    odoo_server.fail_next = 1
+    outbox = OdooOutbox(tmp_path / "outbox.db", url=odoo_server.url + "/log-activity", retry_base=0)
+    outbox.enqueue({"action": "a"}, event_id="e1")
+    outbox.enqueue({"action": "b"}, event_id="e2")
+    outbox.enqueue({"action": "a again"}, event_id="e1")  # duplicate id is ignored
+
+    assert outbox.send_pending() == 0  # server down
+    outbox.close(timeout=0)
+
+    reopened = OdooOutbox(tmp_path / "outbox.db", url=odoo_server.url + "/log-activity")
+    assert reopened.pending_count() == 2
+    assert reopened.flush(timeout=5)
+    assert [e["id"] for e in odoo_server.received] == ["e1", "e2"]
+    assert odoo_server.received[0]["action"] == "a"
+    reopened.close()
+
+
+def test_background_sender_batches_into_one_request(tmp_path, odoo_server):
+    outbox = OdooOutbox(tmp_path / "outbox.db", batch_url=odoo_server.url + "/log-activity-batch",
+                        flush_interval=0.05)
+    for i in range(5):
+        outbox.enqueue({"action": f"a{i}"})
+    outbox.start()
+    outbox.close(timeout=5)
+
+    assert len(odoo_server.received) == 1
+    assert [e["action"] for e in odoo_server.received[0]["events"]] == [f"a{i}" for i in range(5)]
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the orchestrator item pipeline (System/orchestrator.py)
+"""
+import os
+import sys
+import importlib
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "System"))
+
+
+@pytest.fixture(scope="module")
+def orchestrator(tmp_path_factory):
+    # Folder constants are read from VAULT_PATH at import time
+    previous = os.environ.get("VAULT_PATH")
+    os.environ["VAULT_PATH"] = str(tmp_path_factory.mktemp("vault"))
+    module = importlib.reload(importlib.import_module("orchestrator"))
+    module.ensure_folders()
+    yield module
+    if previous is None:
+        os.environ.pop("VAULT_PATH")
+    else:
+        os.environ["VAULT_PATH"] = previous
+
+
+def write_email(folder: Path, name: str, needs_approval: bool):
+    folder.joinpath(name).write_text(
+        f"---\nfrom: client@example.com\nsubject: {name}\ncategory: Client\n"
+        f"needs_approval: {needs_approval}\n---\n\nBody\n",
+        encoding="utf-8",
+    )
+
+
+def test_items_queue_odoo_events_without_waiting_for_odoo(orchestrator):
+    # The outbox sender is not started, so Odoo is never contacted during the cycle
+    for i in range(10):
+        write_email(orchestrator.NEEDS_ACTION_EMAIL_FOLDER, f"EMAIL_{i}.md", needs_approval=False)
+
+    state = orchestrator.OrchestratorState()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert orchestrator.run_cycle(state, executor)
+    assert state.counters["emails_auto_processed"] == 10
+    assert len(list(orchestrator.DONE_EMAIL_FOLDER.glob("EMAIL_*.md"))) == 10
+    assert orchestrator.ODOO_OUTBOX.pending_count() == 10
+
+
+def test_item_moves_to_done_in_one_cycle_when_approved(orchestrator):
+    write_email(orchestrator.NEEDS_ACTION_EMAIL_FOLDER, "EMAIL_A.md", needs_approval=True)
+    write_email(orchestrator.APPROVED_EMAIL_FOLDER, "EMAIL_A.md", needs_approval=True)
+
+    state = orchestrator.OrchestratorState()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        orchestrator.run_cycle(state, executor)
+    assert (orchestrator.DONE_EMAIL_FOLDER / "EMAIL_A.md").exists()
+    assert state.counters["emails_sent"] == 1
+
+
+def test_email_loop_waits_while_an_email_is_pending(orchestrator, monkeypatch):
+    monkeypatch.setattr(orchestrator, "POLL_INTERVAL", 0)
+    pending = orchestrator.PENDING_APPROVAL_EMAIL_FOLDER / "EMAIL_waiting.md"
+    write_email(pending.parent, pending.name, needs_approval=True)
+    try:
+        orchestrator.orchestrate_emails()
+        assert pending.exists()
+    finally:
+        pending.unlink()
+
+
+def test_every_pending_approval_is_checked_each_cycle(orchestrator, monkeypatch):
+    monkeypatch.setattr(orchestrator, "BATCH_SIZE", 10)
+    folder = orchestrator.PENDING_APPROVAL_EMAIL_FOLDER
+    names = [f"EMAIL_wait{i:02d}.md" for i in range(25)]
+    for name in names:
+        write_email(folder, name, needs_approval=True)
+    try:
+        state = orchestrator.OrchestratorState()
+        orchestrator.run_cycle(state)
+        assert not state.backlog  # undecided approvals are not a backlog to spin on
+
+        # An approval anywhere in the queue is acted on in the next cycle
+        write_email(orchestrator.APPROVED_EMAIL_FOLDER, names[-1], needs_approval=True)
+        orchestrator.run_cycle(state)
+        assert (orchestrator.DONE_EMAIL_FOLDER / names[-1]).exists()
+        assert state.counters["emails_sent"] == 1
+    finally:
+        for path in folder.glob("EMAIL_wait*.md"):
+            path.unlink()
+
+
+def test_reprocessed_item_queues_one_odoo_event(orchestrator):
+    before = orchestrator.ODOO_OUTBOX.pending_count()
+    for _ in range(2):  # e.g. a crash before the file move, then the same item again
+        orchestrator.log_to_odoo('gmail', 'Subject', 'Client', 'Auto-Processed', item='EMAIL_dup.md')
+    assert orchestrator.ODOO_OUTBOX.pending_count() == before + 1
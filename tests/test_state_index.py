@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the workflow state index (System/state_index.py)
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "System"))
+from state_index import WorkflowIndex
+from claim_system import ClaimSystem
+
+
+def test_moves_update_the_index_and_queries_answer_from_it(tmp_path, make_item):
+    index = WorkflowIndex(tmp_path)
+    item = make_item(tmp_path, "Needs_Action/Email/EMAIL_a.md", priority="high")
+    assert index.record(item)
+    created = index.items("Needs_Action")[0]["created"]
+
+    pending = tmp_path / "Pending_Approval/Email/EMAIL_a.md"
+    pending.parent.mkdir(parents=True)
+    index.move(item, pending)
+
+    assert index.count("Needs_Action") == 0
+    assert index.count("Pending_Approval", "Email") == 1
+    row = index.items("Pending_Approval")[0]
+    assert row["path"] == "Pending_Approval/Email/EMAIL_a.md"
+    assert (row["id"], row["type"], row["priority"]) == ("EMAIL_a", "email", "high")
+    assert row["created"] == created
+    assert index.items("Pending_Approval", older_than=3600) == []
+
+
+def test_failed_rename_leaves_the_index_untouched(tmp_path, make_item):
+    index = WorkflowIndex(tmp_path)
+    item = make_item(tmp_path, "Needs_Action/Email/EMAIL_a.md")
+    index.record(item)
+
+    with pytest.raises(FileNotFoundError):
+        index.move(item, tmp_path / "Done/Missing/EMAIL_a.md")
+
+    assert index.stage_counts()["Needs_Action"] == 1
+    assert index.count("Done") == 0
+
+
+def test_reconcile_rebuilds_from_disk_and_keeps_timestamps(tmp_path, make_item):
+    index = WorkflowIndex(tmp_path)
+    kept = make_item(tmp_path, "Pending_Approval/Email/EMAIL_kept.md")
+    index.record(kept)
+    index.conn.execute("UPDATE items SET stage_since = stage_since - 90000")
+
+    # Changes made behind the index's back
+    make_item(tmp_path, "Pending_Approval/WhatsApp/WHATSAPP_new.md", age_seconds=7200)
+    make_item(tmp_path, "In_Progress/cloud_agent/TASK_x.md")
+    index.conn.execute(
+        "INSERT INTO items VALUES ('Done/gone.md', 'gone', 'email', 'Done', '', NULL, NULL, 0, 0, 0)")
+
+    counts = index.reconcile()
+
+    assert counts["Pending_Approval"] == 2 and counts["In_Progress"] == 1 and counts["Done"] == 0
+    stale = index.items("Pending_Approval", older_than=24 * 3600)
+    assert [row["id"] for row in stale] == ["EMAIL_kept"]
+    assert index.items("In_Progress")[0]["agent"] == "cloud_agent"
+    assert [row["id"] for row in index.items("Pending_Approval", older_than=3600)] == ["EMAIL_kept", "WHATSAPP_new"]
+
+
+def test_claim_and_release_are_recorded(tmp_path, make_item):
+    task = make_item(tmp_path, "Needs_Action/TASK_a.md")
+    claims = ClaimSystem(tmp_path, "local_agent")
+    claims.index.record(task)
+
+    assert claims.claim_task(task)
+    row = claims.index.items("In_Progress")[0]
+    assert row["agent"] == "local_agent"
+
+    (tmp_path / "Done").mkdir()
+    claims.release_task(tmp_path / "In_Progress/local_agent/TASK_a.md", "Done")
+    assert claims.index.stage_counts()["Done"] == 1
+    assert claims.index.count("In_Progress") == 0
+
+
+def test_index_touches_disk_only_on_first_use(tmp_path, make_item):
+    vault = tmp_path / "vault"
+    index = WorkflowIndex(vault)
+    assert not vault.exists()
+
+    make_item(vault, "Needs_Action/Email/EMAIL_a.md")
+    assert index.record(vault / "Needs_Action/Email/EMAIL_a.md")
+    assert (vault / ".workflow_index.db").exists()
+    index.close()
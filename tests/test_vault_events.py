@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Tests for the watchdog wake-up helper used by the orchestrators (System/vault_events.py)
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "System"))
+from vault_events import VaultEventWatcher
+
+
+def test_wakes_on_new_file_and_times_out_when_idle(tmp_path):
+    needs_action = tmp_path / "Needs_Action" / "Email"
+    approved = tmp_path / "Approved"
+    needs_action.mkdir(parents=True)
+    watcher = VaultEventWatcher([tmp_path / "Needs_Action", approved], settle_seconds=0.05)
+    watcher.start()
+    try:
+        assert watcher.wait(0.2) is False
+
+        (needs_action / "EMAIL_1.md").write_text("---\nfrom: a\n---\n", encoding="utf-8")
+        start = time.monotonic()
+        assert watcher.wait(5) is True
+        assert time.monotonic() - start < 2
+
+        # Temp files and files outside the watched folders do not wake the loop
+        (needs_action / ".EMAIL_2.md.tmp").write_text("x", encoding="utf-8")
+        (tmp_path / "Dashboard.md").write_text("x", encoding="utf-8")
+        assert watcher.wait(0.3) is False
+
+        # A move into a watched folder does
+        outside = tmp_path / "EMAIL_3.md"
+        outside.write_text("x", encoding="utf-8")
+        time.sleep(0.1)
+        watcher.wait(0.1)
+        outside.rename(approved / "EMAIL_3.md")
+        assert watcher.wait(5) is True
+    finally:
+        watcher.stop()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-pass vault scanner (System/vault_snapshot.py)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "System"))
+from vault_snapshot import VaultSnapshot
+
+
+def test_snapshot_answers_counts_and_listings(tmp_path):
+    email = tmp_path / "Needs_Action" / "Email"
+    email.mkdir(parents=True)
+    (tmp_path / "Pending_Approval" / "WhatsApp").mkdir(parents=True)
+    for name in ("EMAIL_1.md", "EMAIL_2.md", "notes.txt"):
+        (email / name).write_text("x", encoding="utf-8")
+
+    snapshot = VaultSnapshot(tmp_path).scan()
+    assert snapshot.count(email, "EMAIL_*.md") == 2
+    assert snapshot.count("Needs_Action/Email") == 3
+    assert sorted(snapshot.subfolders(tmp_path / "Needs_Action")) == ["Email"]
+    assert snapshot.exists(tmp_path / "Pending_Approval" / "WhatsApp")
+    assert snapshot.count(tmp_path / "Approved" / "Email") == 0  # missing folders read as empty
+
+    (email / "EMAIL_1.md").rename(tmp_path / "Pending_Approval" / "WhatsApp" / "EMAIL_1.md")
+    assert snapshot.count(email, "EMAIL_*.md") == 2  # point-in-time until rescanned
+    snapshot.rescan()
+    assert snapshot.count(email, "EMAIL_*.md") == 1
+    assert snapshot.contains("Pending_Approval/WhatsApp", "EMAIL_1.md")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-evaluate chat extraction and the activity observer (watchers_whatsapp/whatsapp_extractor.py)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "watchers_whatsapp"))
+from whatsapp_extractor import ActivityObserver
+from whatsapp_watcher import WhatsAppWatcher
+
+
+class ExtractorPage:
+    """Answers EXTRACT_JS with canned chats and counts browser round trips."""
+
+    def __init__(self, chats):
+        self.chats = chats
+        self.evaluations = 0
+        self.bindings = {}
+
+    def evaluate(self, script, arg=None):
+        self.evaluations += 1
+        if arg and 'maxChats' in arg:
+            return self.chats
+        return True
+
+    def expose_binding(self, name, callback):
+        self.bindings[name] = callback
+
+    def wait_for_timeout(self, ms):
+        self.bindings[ActivityObserver.BINDING](None, ["Alice"])
+
+
+def test_poll_reads_all_unread_chats_in_one_evaluate(tmp_path):
+    page = ExtractorPage([
+        {"name": "Alice", "unread": 2, "preview": "", "messages": [
+            {"id": "false_1@c.us_A1", "meta": "[10:01, 1/6/2026] Alice: ", "text": "Invoice is due today"},
+            {"id": "false_1@c.us_A2", "meta": "[10:02, 1/6/2026] Alice: ", "text": "ok"},
+        ]},
+        {"name": "Bob", "unread": 1, "preview": "urgent: call me", "messages": []},
+    ])
+    watcher = WhatsAppWatcher(str(tmp_path))
+    watcher.session.ensure = lambda: page
+
+    messages = watcher.check_for_updates()
+    assert page.evaluations == 1
+    assert [(m["from"], m["priority"]) for m in messages] == [("Alice", "high"), ("Alice", "medium"), ("Bob", "high")]
+    assert messages[0]["data_id"] == "false_1@c.us_A1"
+
+
+def test_activity_observer_wakes_on_binding_call():
+    page = ExtractorPage([])
+    observer = ActivityObserver()
+    observer.install(page)
+    assert observer.wait(page, timeout=5)
+    assert observer.drain() == ["Alice"] and observer.pending == []
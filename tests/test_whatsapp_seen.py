@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded seen-message store behind WhatsApp dedupe (watchers_whatsapp/whatsapp_seen.py)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "watchers_whatsapp"))
+from whatsapp_seen import SeenStore, fingerprint
+from whatsapp_watcher import WhatsAppWatcher
+
+
+class ChatPage:
+    """Returns the same unread chats on every poll."""
+
+    def __init__(self, chats):
+        self.chats = chats
+
+    def evaluate(self, script, arg=None):
+        if arg and 'maxChats' in arg:
+            return self.chats
+        return True
+
+    def expose_binding(self, name, callback):
+        pass
+
+
+def test_repolls_and_restarts_do_not_duplicate_action_files(tmp_path):
+    page = ChatPage([{"name": "Alice", "unread": 2, "preview": "", "messages": [
+        {"id": "false_1@c.us_A1", "meta": None, "text": "Payment sent"},
+        {"id": None, "meta": "[10:02, 1/6/2026] Alice: ", "text": "Payment sent"},
+    ]}])
+
+    for _ in range(2):  # second pass is a restarted watcher
+        watcher = WhatsAppWatcher(str(tmp_path))
+        watcher.session.ensure = lambda: page
+        for _ in range(3):
+            for item in watcher.check_for_updates():
+                watcher.create_action_file(item)
+        watcher.seen.close()
+
+    assert len(list((tmp_path / "Needs_Action" / "WhatsApp").glob("WHATSAPP_*.md"))) == 2
+
+
+def test_repeated_preview_only_messages_are_not_taken_for_one(tmp_path):
+    watcher = WhatsAppWatcher(str(tmp_path))
+    for time in ("10:01", "10:01", "10:05"):  # the same "ok" polled twice, then a second "ok"
+        page = ChatPage([{"name": "Alice", "unread": 1, "time": time, "preview": "ok", "messages": []}])
+        watcher.session.ensure = lambda: page
+        for item in watcher.check_for_updates():
+            watcher.create_action_file(item)
+    watcher.seen.close()
+
+    assert len(list((tmp_path / "Needs_Action" / "WhatsApp").glob("WHATSAPP_*.md"))) == 2
+
+
+def test_seen_store_is_bounded_and_keeps_recently_seen(tmp_path):
+    store = SeenStore(tmp_path / "seen.db", max_entries=3, ttl_seconds=3600)
+    store.add(["a", "b", "c"])
+    store.conn.execute("UPDATE seen SET last_seen = last_seen - 10")
+    store.conn.execute("UPDATE seen SET last_seen = last_seen - 10 WHERE fp = 'b'")
+    assert store.filter_new(["a", "x"]) == ["x"]  # touches "a"
+    store.add(["x"])
+    store.evict()
+    assert len(store) == 3
+    assert store.filter_new(["a", "b", "c", "x"]) == ["b"]  # least recently seen went first
+
+    store.conn.execute("UPDATE seen SET last_seen = last_seen - 7200")
+    store.evict()
+    assert len(store) == 0
+    assert fingerprint("Alice", "hi", meta="[10:01] Alice: ") != fingerprint("Alice", "hi", meta="[10:05] Alice: ")
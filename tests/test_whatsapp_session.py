@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the long-lived WhatsApp Web browser session (watchers_whatsapp/whatsapp_session.py)
+
+A fake Playwright stands in for Chromium: only the calls WhatsAppSession makes.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "watchers_whatsapp"))
+from whatsapp_session import WhatsAppSession
+
+
+class FakePage:
+    def __init__(self):
+        self.handlers = {}
+        self.closed = False
+        self.chat_list = True
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def emit(self, event):
+        self.handlers[event]()
+
+    def goto(self, url, wait_until=None):
+        pass
+
+    def wait_for_selector(self, selector, timeout=None):
+        return True
+
+    def query_selector(self, selector):
+        return None
+
+    def is_closed(self):
+        return self.closed
+
+    def evaluate(self, script, arg=None):
+        return self.chat_list
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = [FakePage()]
+        self.closed = False
+
+    def on(self, event, handler):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakePlaywright:
+    def __init__(self, launcher):
+        self.launcher = launcher
+        self.chromium = self
+
+    def start(self):
+        return self
+
+    def launch_persistent_context(self, user_data_dir, **kwargs):
+        if self.launcher.fail:
+            raise RuntimeError("chromium failed to start")
+        context = FakeContext()
+        self.launcher.contexts.append(context)
+        return context
+
+    def stop(self):
+        pass
+
+
+class Launcher:
+    def __init__(self):
+        self.contexts = []
+        self.fail = False
+
+    def __call__(self):
+        return FakePlaywright(self)
+
+
+def test_page_is_reused_across_polls_and_relaunched_after_crash(tmp_path):
+    launcher = Launcher()
+    session = WhatsAppSession(tmp_path, playwright_factory=launcher)
+
+    page = session.ensure()
+    assert session.ensure() is page and session.ensure() is page
+    assert session.launches == 1
+
+    page.emit("crash")
+    new_page = session.ensure()
+    assert new_page is not page and session.launches == 2
+    assert launcher.contexts[0].closed
+
+    new_page.chat_list = False  # logged out or navigated away
+    assert session.ensure() is not new_page and session.launches == 3
+
+
+def test_failed_launch_backs_off(tmp_path):
+    launcher = Launcher()
+    launcher.fail = True
+    session = WhatsAppSession(tmp_path, playwright_factory=launcher)
+
+    assert session.ensure() is None
+    launcher.fail = False
+    assert session.ensure() is None  # still inside the backoff window
+    session._next_attempt = 0
+    assert session.ensure() is not None
+    assert session.failures == 0
+
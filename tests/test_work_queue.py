@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Tests for the priority work queue with aging (System/work_queue.py)
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "System"))
+from work_queue import PriorityWorkQueue
+
+
+def test_urgent_items_jump_a_backlog_and_old_items_age_up(tmp_path, make_item):
+    for i in range(500):
+        make_item(tmp_path, f"EMAIL_m{i:03d}.md", "medium", age_seconds=60)
+    make_item(tmp_path, "EMAIL_critical.md", "critical", age_seconds=0)
+    make_item(tmp_path, "EMAIL_high.md", "high", age_seconds=0)
+    make_item(tmp_path, "EMAIL_starved.md", "low", age_seconds=3 * 300 + 30)  # waited 3 levels' worth
+
+    queue = PriorityWorkQueue(aging_seconds=300)
+    queue.sync((entry, "payload") for entry in os.scandir(tmp_path))
+    first = [path.name for path, _ in queue.pop_batch(3)]
+    assert first == ["EMAIL_starved.md", "EMAIL_critical.md", "EMAIL_high.md"]
+    assert len(queue) == 500
+
+    # Incremental: a new critical item is served before the remaining backlog
+    make_item(tmp_path, "EMAIL_new_critical.md", "critical", age_seconds=0)
+    for name in first:
+        (tmp_path / name).unlink()
+    queue.sync((entry, None) for entry in os.scandir(tmp_path))
+    assert queue.pop_batch(1)[0][0].name == "EMAIL_new_critical.md"
+    assert len(queue) == 500 and len(queue._heap) < 1100
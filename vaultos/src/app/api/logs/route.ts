@@ -1,6 +1,8 @@
 import { NextResponse } from "next/server";
 import fs from "fs";
 import path from "path";
+import crypto from "crypto";
+import { readColumnarLog, type SourceRecord } from "@/lib/logc";
 
 export const dynamic = 'force-dynamic';
 
@@ -12,27 +14,59 @@ export async function GET() {
       return NextResponse.json({ logs: [], error: "Logs directory not found" });
     }
 
-    // Read all JSON log files
-    const files = fs.readdirSync(LOGS_DIR).filter(file => file.endsWith(".json"));
+    // Read all JSON log files (legacy arrays), JSONL daily logs and compacted
+    // days (.logc, see System/log_archive.py). Archives go first: a source they
+    // absorbed may still be on disk for a moment, and its absorbed bytes are skipped.
+    const files = fs.readdirSync(LOGS_DIR)
+      .filter(file => file.endsWith(".json") || file.endsWith(".jsonl") || file.endsWith(".logc"))
+      .sort((a, b) => Number(b.endsWith(".logc")) - Number(a.endsWith(".logc")));
     
     const allLogs: any[] = [];
+    const absorbed: Record<string, SourceRecord> = {};
     
     files.forEach(file => {
       const filePath = path.join(LOGS_DIR, file);
-      const content = fs.readFileSync(filePath, "utf-8");
       
       try {
-        const logData = JSON.parse(content);
-        
-        // Handle both array and single object logs
-        const logs = Array.isArray(logData) ? logData : [logData];
+        let logs: any[];
+        if (file.endsWith(".logc")) {
+          const archive = readColumnarLog(filePath, [
+            "timestamp", "date", "created", "level", "type", "source", "service", "message", "msg", "text"]);
+          Object.assign(absorbed, archive.sources);
+          logs = archive.rows;
+        } else {
+          let data = fs.readFileSync(filePath);
+          const record = absorbed[file];
+          if (record && data.length >= record.size &&
+              crypto.createHash("sha256").update(data.subarray(0, record.size)).digest("hex") === record.sha256) {
+            data = data.subarray(record.size);
+          }
+          const content = data.toString("utf-8");
+          if (file.endsWith(".jsonl")) {
+            // One JSON object per line; skip torn or blank lines
+            logs = content.split("\n").flatMap(line => {
+              if (!line.trim()) return [];
+              try {
+                return [JSON.parse(line)];
+              } catch {
+                return [];
+              }
+            });
+          } else if (!content.trim()) {
+            logs = [];  // a legacy array already absorbed whole
+          } else {
+            const logData = JSON.parse(content);
+            // Handle both array and single object logs
+            logs = Array.isArray(logData) ? logData : [logData];
+          }
+        }
         
         logs.forEach((log: any, index: number) => {
           allLogs.push({
             id: `${file}-${index}`,
             timestamp: log.timestamp || log.date || log.created || "",
             level: log.level || log.type || "info",
-            source: log.source || log.service || file.replace(".json", ""),
+            source: log.source || log.service || file.replace(/\.(jsonl?|logc)$/, ""),
             message: log.message || log.msg || log.text || "",
           });
         });
@@ -0,0 +1,64 @@
+import fs from "fs";
+import zlib from "zlib";
+
+// Reader for the columnar day archives (Logs/<prefix>_YYYY-MM-DD.logc) written
+// by System/log_archive.py; the layout is documented in System/log_columnar.py.
+
+const MAGIC = Buffer.from("LOGC\x01", "latin1");
+const EPOCH_MS = Date.UTC(1970, 0, 1);
+
+export interface SourceRecord {
+  size: number;
+  sha256: string;
+}
+
+export interface ColumnarLog {
+  rows: Record<string, any>[];
+  // Bytes absorbed from each source file, while the source may still be on disk
+  sources: Record<string, SourceRecord>;
+}
+
+function isoFromMicros(micros: number): string {
+  // Matches Python's naive datetime.isoformat()
+  const seconds = Math.floor(micros / 1000000);
+  const fraction = micros - seconds * 1000000;
+  const iso = new Date(EPOCH_MS + seconds * 1000).toISOString().slice(0, 19);
+  return fraction ? `${iso}.${String(fraction).padStart(6, "0")}` : iso;
+}
+
+// Decodes the given fields (every field if omitted) of a .logc file into row objects.
+export function readColumnarLog(filePath: string, fields?: string[]): ColumnarLog {
+  const data = fs.readFileSync(filePath);
+  if (data.length < MAGIC.length + 4 || !data.subarray(0, MAGIC.length).equals(MAGIC)) {
+    throw new Error(`${filePath} is not a columnar log`);
+  }
+  const headerLength = data.readUInt32LE(MAGIC.length);
+  const dataStart = MAGIC.length + 4 + headerLength;
+  const header = JSON.parse(data.subarray(MAGIC.length + 4, dataStart).toString("utf-8"));
+  const littleEndian = header.byteorder === "little";
+
+  const rows: Record<string, any>[] = Array.from({ length: header.rows }, () => ({}));
+  for (const column of header.columns) {
+    if (fields && !fields.includes(column.name)) continue;
+    const start = dataStart + column.offset;
+    const raw = zlib.inflateSync(data.subarray(start, start + column.length));
+
+    if (column.encoding === "dict") {
+      for (let i = 0; i < header.rows; i++) {
+        const code = littleEndian ? raw.readUInt16LE(i * 2) : raw.readUInt16BE(i * 2);
+        if (code) rows[i][column.name] = column.values[code - 1];
+      }
+    } else if (column.encoding === "time") {
+      let total = 0;
+      for (let i = 0; i < header.rows; i++) {
+        total += Number(littleEndian ? raw.readBigInt64LE(i * 8) : raw.readBigInt64BE(i * 8));
+        rows[i][column.name] = isoFromMicros(total);
+      }
+    } else {
+      raw.toString("utf-8").split("\n").forEach((line, i) => {
+        if (line !== "") rows[i][column.name] = JSON.parse(line);
+      });
+    }
+  }
+  return { rows, sources: header.meta?.sources ?? {} };
+}
@@ -1,13 +1,116 @@
+import os
+import sys
 import time
 from pathlib import Path
 import shutil
 import hashlib
 import mimetypes
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from collections import defaultdict
 import re
 
+sys.path.append(str(Path(__file__).resolve().parent.parent / "System"))
+from log_store import append_entry, iter_entries
+from keyword_classifier import KeywordClassifier
+from state_index import WorkflowIndex
+
+HASH_CHUNK_SIZE = 1024 * 1024  # 1MB reads for copy + hash
+HASH_WORKERS = int(os.environ.get("FILE_HASH_WORKERS", "2"))  # files copied/hashed in parallel
+SETTLE_SECONDS = float(os.environ.get("FILE_SETTLE_SECONDS", "1.0"))  # size/mtime must hold still this long
+TEMP_SUFFIXES = ['.tmp', '.swp', '.lock', '.part', '.crdownload']
+# Vault files rewritten in place by other components (atomic rename), never drops
+IGNORED_NAMES = {'Dashboard.md', 'Dashboard.state.json'}
+
+# File categories by extension or name fragment; the first matching category wins
+FILE_CATEGORIES = {
+    'Document': ['.pdf', '.doc', '.docx', '.txt', '.rtf', '.odt', '.xls', '.xlsx', '.ppt', '.pptx'],
+    'Image': ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp'],
+    'Data': ['.csv', '.json', '.xml', '.yaml', '.sql', '.db'],
+    'Code': ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.html', '.css', '.php', '.rb', '.go', '.rs'],
+    'Media': ['.mp3', '.mp4', '.avi', '.mov', '.wav', '.flv'],
+    'Archive': ['.zip', '.rar', '.7z', '.tar', '.gz'],
+    'Financial': ['.inv', '.bill', '.invoice', '.tax', '.pay', '.receipt'],
+    'Educational': ['.edu', 'course', 'lesson', 'quiz', 'exam', 'assignment']
+}
+SUSPICIOUS_NAME_KEYWORDS = ['password', 'credential', 'login', 'key', 'secret', 'confidential', 'private']
+FILE_CLASSIFIER = KeywordClassifier(FILE_CATEGORIES)
+SUSPICIOUS_CLASSIFIER = KeywordClassifier({'suspicious': SUSPICIOUS_NAME_KEYWORDS})
+
+
+def is_temp_name(name: str) -> bool:
+    return name.startswith('.') or Path(name).suffix.lower() in TEMP_SUFFIXES
+
+
+class DropDebouncer:
+    """Coalesces file events per path and emits one job once the file has finished being written.
+
+    A file is ready when its (size, mtime) has not changed for settle_seconds, or
+    as soon as a close-after-write event arrives (inotify IN_CLOSE_WRITE on Linux).
+    """
+
+    def __init__(self, emit, settle_seconds: float = SETTLE_SECONDS, poll_interval: float = 0.25):
+        self.emit = emit
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.pending = {}  # path -> {'sig': (size, mtime_ns), 'changed_at': float, 'closed': bool}
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="drop-debouncer", daemon=True)
+        self._thread.start()
+
+    def touch(self, path: Path):
+        """Registers a new or still-changing file; restarts its settle timer."""
+        with self.lock:
+            self.pending[path] = {'sig': None, 'changed_at': time.monotonic(), 'closed': False}
+
+    def is_pending(self, path: Path) -> bool:
+        with self.lock:
+            return path in self.pending
+
+    def closed(self, path: Path):
+        with self.lock:
+            if path in self.pending:
+                self.pending[path]['closed'] = True
+
+    def forget(self, path: Path):
+        with self.lock:
+            self.pending.pop(path, None)
+
+    def check(self):
+        """One pass over pending files; emits the ones that are complete."""
+        now = time.monotonic()
+        ready = []
+        with self.lock:
+            for path, info in list(self.pending.items()):
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    del self.pending[path]
+                    continue
+                sig = (st.st_size, st.st_mtime_ns)
+                if sig != info['sig'] and not info['closed']:
+                    info['sig'] = sig
+                    info['changed_at'] = now
+                elif info['closed'] or now - info['changed_at'] >= self.settle_seconds:
+                    del self.pending[path]
+                    ready.append(path)
+        for path in ready:
+            self.emit(path)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"❌ Debounce check failed: {e}")
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
 
 class DropFolderHandler(FileSystemEventHandler):
     def __init__(self, vault_path: str):
@@ -23,6 +126,7 @@ class DropFolderHandler(FileSystemEventHandler):
         self.done_folder.mkdir(parents=True, exist_ok=True)
         self.pending_approval.mkdir(parents=True, exist_ok=True)
         self.plans_folder.mkdir(exist_ok=True)
+        self.state_index = WorkflowIndex(self.vault_path)
 
         # Analytics tracking
         self.analytics = {
@@ -32,65 +136,50 @@ class DropFolderHandler(FileSystemEventHandler):
             'by_category': defaultdict(int)
         }
 
+        # Content-addressed index: sha256 -> first copy in Needs_Action/Files.
+        # Append-only JSONL so restarts keep recognising earlier drops.
+        self.index_file = self.vault_path / '.file_index.jsonl'
+        self.content_index = {}
+        self.sizes_seen = set()
+        for entry in iter_entries(self.index_file):
+            self.content_index[entry['hash']] = entry
+            self.sizes_seen.add(entry['size'])
+        self.lock = threading.Lock()
+
+        # Copy + hash off the watchdog thread so multi-GB drops never block event delivery
+        self.executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="file-hash")
+        self.debouncer = DropDebouncer(lambda path: self.executor.submit(self._process_safely, path))
+
         # Security patterns to watch for
-        self.security_patterns = [
+        self.security_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in [
             r'\.(exe|bat|cmd|com|scr|vbs|js|jar)$',  # Executable files
             r'(password|credential|secret|key).*\.txt',  # Files with sensitive keywords
             r'.*\.(zip|rar|7z).*',  # Archive files (potential risk)
-        ]
+        ]]
 
     def categorize_file(self, file_path: Path) -> str:
-        """Categorize file based on extension and content"""
-        ext = file_path.suffix.lower()
-        name = file_path.name.lower()
-
-        # Define categories
-        categories = {
-            'Document': ['.pdf', '.doc', '.docx', '.txt', '.rtf', '.odt', '.xls', '.xlsx', '.ppt', '.pptx'],
-            'Image': ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp'],
-            'Data': ['.csv', '.json', '.xml', '.yaml', '.sql', '.db'],
-            'Code': ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.html', '.css', '.php', '.rb', '.go', '.rs'],
-            'Media': ['.mp3', '.mp4', '.avi', '.mov', '.wav', '.flv'],
-            'Archive': ['.zip', '.rar', '.7z', '.tar', '.gz'],
-            'Financial': ['.inv', '.bill', '.invoice', '.tax', '.pay', '.receipt'],
-            'Educational': ['.edu', 'course', 'lesson', 'quiz', 'exam', 'assignment']
-        }
+        """Categorize file based on extension and name"""
+        # An extension match is also a substring match, so one pass over the name covers both
+        return FILE_CLASSIFIER.first(file_path.name, 'General')
 
-        # Check by extension
-        for category, extensions in categories.items():
-            if ext in extensions or any(keyword in name for keyword in extensions):
-                return category
-
-        # Default category
-        return 'General'
-
-    def scan_security_risks(self, file_path: Path) -> list:
+    def scan_security_risks(self, file_path: Path, size: int = None) -> list:
         """Scan file for potential security risks"""
         risks = []
 
         # Check file extension against known risky patterns
         for pattern in self.security_patterns:
-            if re.search(pattern, file_path.name, re.IGNORECASE):
+            if pattern.search(file_path.name):
                 risks.append(f"Risky file type: {file_path.suffix}")
 
         # Check file size (very large files could be suspicious)
-        size = file_path.stat().st_size
+        if size is None:
+            size = file_path.stat().st_size
         if size > 100 * 1024 * 1024:  # 100MB
             risks.append("Large file (>100MB) - potential risk")
 
         # Check for suspicious filename patterns
-        suspicious_patterns = [
-            r'password',
-            r'credential',
-            r'login',
-            r'key',
-            r'secret',
-            r'confidential',
-            r'private'
-        ]
-        for pattern in suspicious_patterns:
-            if pattern in file_path.name.lower():
-                risks.append(f"Suspicious keyword in filename: {pattern}")
+        for keyword in SUSPICIOUS_CLASSIFIER.keywords_in(file_path.name):
+            risks.append(f"Suspicious keyword in filename: {keyword}")
 
         return risks
 
@@ -98,50 +187,160 @@ class DropFolderHandler(FileSystemEventHandler):
         """Calculate SHA256 hash of file for integrity checking"""
         hash_sha256 = hashlib.sha256()
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
                 hash_sha256.update(chunk)
         return hash_sha256.hexdigest()
 
+    def copy_and_hash(self, source: Path, dest: Path) -> str:
+        """Copy source to dest and SHA256 it in the same streaming pass (like copy2, keeps metadata).
+
+        Writes to a temp file and renames it over dest, so a dest that is a hard link
+        to an earlier drop is replaced rather than overwritten in place.
+        """
+        hash_sha256 = hashlib.sha256()
+        buffer = bytearray(HASH_CHUNK_SIZE)
+        view = memoryview(buffer)
+        tmp = dest.with_name(f".{dest.name}.part")
+        with open(source, "rb") as src, open(tmp, "wb") as dst:
+            while True:
+                n = src.readinto(buffer)
+                if not n:
+                    break
+                hash_sha256.update(view[:n])
+                dst.write(view[:n])
+        shutil.copystat(source, tmp)
+        os.replace(tmp, dest)
+        return hash_sha256.hexdigest()
+
+    def store_content(self, source: Path, dest: Path, size: int):
+        """Put source's content at dest; content seen before is hard-linked to its first copy.
+
+        Returns (sha256, name of the earlier copy or None).
+        """
+        if size in self.sizes_seen:
+            # Possible duplicate: hash first (read only) so a match costs no copy
+            file_hash = self.calculate_file_hash(source)
+            with self.lock:
+                original = self.content_index.get(file_hash)
+            if original and self._link(original, dest):
+                return file_hash, Path(original['path']).name
+        file_hash = self.copy_and_hash(source, dest)
+
+        with self.lock:
+            original = self.content_index.get(file_hash)
+            if original is None or not self._is_intact(original):
+                st = dest.stat()
+                entry = {'hash': file_hash, 'size': size, 'mtime_ns': st.st_mtime_ns, 'path': str(dest),
+                         'original_name': source.name, 'first_seen': time.strftime("%Y-%m-%d %H:%M:%S")}
+                self.content_index[file_hash] = entry
+                self.sizes_seen.add(size)
+                append_entry(self.index_file, entry)
+                return file_hash, None
+        if self._link(original, dest):
+            # Same content arrived concurrently; keep one copy on disk
+            return file_hash, Path(original['path']).name
+        return file_hash, None
+
+    def _is_intact(self, entry: dict) -> bool:
+        """True if the indexed copy is still on disk and unchanged since it was indexed"""
+        try:
+            st = os.stat(entry['path'])
+        except FileNotFoundError:
+            return False
+        return st.st_size == entry['size'] and st.st_mtime_ns == entry['mtime_ns']
+
+    def _link(self, entry: dict, dest: Path) -> bool:
+        """Hard-link dest to an indexed copy (replacing dest if present); False if not possible"""
+        existing = Path(entry['path'])
+        if not self._is_intact(entry):
+            return False
+        if existing == dest:
+            return True  # the same content already sits at dest
+        tmp = dest.with_name(f".{dest.name}.link")
+        try:
+            os.link(existing, tmp)
+            os.replace(tmp, dest)
+            return True
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            return False
+
     def on_created(self, event):
         if event.is_directory:
             return
 
         source = Path(event.src_path)
 
-        # Skip temporary files
-        if source.name.startswith('.') or source.suffix.lower() in ['.tmp', '.swp', '.lock']:
+        # Skip temporary files and vault-managed files
+        if is_temp_name(source.name) or source.name in IGNORED_NAMES:
+            return
+
+        # Wait for the writer to finish before copying/hashing
+        self.debouncer.touch(source)
+
+    def on_modified(self, event):
+        # Only extends the settle timer of a drop still being written; edits to
+        # existing vault notes are not new drops
+        source = Path(event.src_path)
+        if not event.is_directory and self.debouncer.is_pending(source):
+            self.debouncer.touch(source)
+
+    def on_closed(self, event):
+        if not event.is_directory:
+            self.debouncer.closed(Path(event.src_path))
+
+    def on_moved(self, event):
+        if event.is_directory:
+            return
+        source, dest = Path(event.src_path), Path(event.dest_path)
+        if dest.parent != self.vault_path or is_temp_name(dest.name) or dest.name in IGNORED_NAMES:
+            self.debouncer.forget(source)
             return
+        # A download renamed from .part/.crdownload, or a pending drop that was renamed
+        if is_temp_name(source.name) or self.debouncer.is_pending(source):
+            self.debouncer.forget(source)
+            self.debouncer.touch(dest)
 
+    def _process_safely(self, source: Path):
+        try:
+            self.process_file(source)
+        except FileNotFoundError:
+            print(f"⚠️ {source.name} disappeared before it could be processed")
+        except Exception as e:
+            print(f"❌ Failed to process {source.name}: {e}")
+
+    def process_file(self, source: Path):
+        """Copy, hash and describe one dropped file (runs on the worker pool)"""
         # Only process files that exist
-        if not source.exists():
+        try:
+            st = source.stat()
+        except FileNotFoundError:
             return
+        size = st.st_size
 
         # Categorize file
         category = self.categorize_file(source)
 
         # Update analytics
-        self.analytics['files_processed'] += 1
-        self.analytics['by_extension'][source.suffix.lower()] = self.analytics['by_extension'][source.suffix.lower()] + 1
-        self.analytics['by_category'][category] = self.analytics['by_category'][category] + 1
-
-        # Track file size category
-        size = source.stat().st_size
-        if size < 1024 * 1024:  # < 1MB
-            self.analytics['by_size']['small'] += 1
-        elif size < 10 * 1024 * 1024:  # < 10MB
-            self.analytics['by_size']['medium'] += 1
-        else:
-            self.analytics['by_size']['large'] += 1
-
-        # Copy file to Needs_Action
+        with self.lock:
+            self.analytics['files_processed'] += 1
+            self.analytics['by_extension'][source.suffix.lower()] = self.analytics['by_extension'][source.suffix.lower()] + 1
+            self.analytics['by_category'][category] = self.analytics['by_category'][category] + 1
+
+            # Track file size category
+            if size < 1024 * 1024:  # < 1MB
+                self.analytics['by_size']['small'] += 1
+            elif size < 10 * 1024 * 1024:  # < 10MB
+                self.analytics['by_size']['medium'] += 1
+            else:
+                self.analytics['by_size']['large'] += 1
+
+        # Copy file to Needs_Action, hashing in the same pass (or link to an identical earlier drop)
         dest = self.needs_action / f'FILE_{source.name}'
-        shutil.copy2(source, dest)
+        file_hash, duplicate_of = self.store_content(source, dest, size)
 
         # Scan for security risks
-        security_risks = self.scan_security_risks(dest)
-
-        # Calculate file hash
-        file_hash = self.calculate_file_hash(dest)
+        security_risks = self.scan_security_risks(dest, size)
 
         # Determine MIME type
         mime_type, _ = mimetypes.guess_type(str(source))
@@ -149,16 +348,18 @@ class DropFolderHandler(FileSystemEventHandler):
             mime_type = 'unknown'
 
         # Create metadata file with enhanced information
+        size_formatted = self.format_file_size(size)
         meta_path = dest.with_name(f'FILE_{source.stem}_{int(time.time())}{dest.suffix}.md')
         meta_content = f'''---
 type: file_drop
 original_name: {source.name}
-size_bytes: {source.stat().st_size}
-size_formatted: {self.format_file_size(source.stat().st_size)}
+size_bytes: {size}
+size_formatted: {size_formatted}
 mime_type: {mime_type}
 extension: {source.suffix.lower()}
 category: {category}
 hash_sha256: {file_hash}
+duplicate_of: {duplicate_of or 'none'}
 received: {time.strftime("%Y-%m-%d %H:%M:%S")}
 priority: medium
 status: pending
@@ -168,10 +369,11 @@ needs_approval: {len(security_risks) > 0 or category in ["Financial", "Document"
 
 ## File Details
 - **Original Name**: `{source.name}`
-- **Size**: {self.format_file_size(source.stat().st_size)} ({source.stat().st_size} bytes)
+- **Size**: {size_formatted} ({size} bytes)
 - **Type**: {mime_type}
 - **Category**: {category}
 - **Location**: {str(source.parent)}
+- **Duplicate Of**: {duplicate_of or "None (new content)"}
 
 ## Security Analysis
 - **Risks Detected**: {len(security_risks) > 0}
@@ -190,11 +392,14 @@ needs_approval: {len(security_risks) > 0 or category in ["Financial", "Document"
 - [ ] Archive after processing
 '''
         meta_path.write_text(meta_content, encoding="utf-8")
+        self.state_index.record(meta_path)
 
         # Log the processing
         print(f"📁 New file processed: {source.name}")
         print(f"   🏷️ Category: {category}")
-        print(f"   📏 Size: {self.format_file_size(source.stat().st_size)}")
+        print(f"   📏 Size: {size_formatted}")
+        if duplicate_of:
+            print(f"   🔗 Duplicate of {duplicate_of} (hard-linked, not copied)")
         if security_risks:
             print(f"   ⚠️ Security risks: {security_risks}")
         if len(security_risks) > 0 or category in ["Financial", "Document"]:
@@ -246,6 +451,8 @@ class EnhancedFileSystemWatcher:
             self.observer.stop()
         finally:
             self.observer.join()
+            self.handler.debouncer.stop()
+            self.handler.executor.shutdown(wait=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+"""
+Gmail State - durable processed-ID and sync-cursor store for the Gmail watcher
+
+Keeps two things in a small SQLite file so a restart costs nothing:
+  - every message id already turned into an EMAIL_*.md action file
+  - key/value sync state, chiefly the Gmail historyId the next poll starts from
+"""
+
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, List
+
+PROCESSED_RETENTION_DAYS = 180  # ids older than this are pruned on startup
+
+
+class GmailStateStore:
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS processed (id TEXT PRIMARY KEY, processed_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT)")
+        self.prune()
+
+    def filter_new(self, message_ids: Iterable[str]) -> List[str]:
+        """Returns the ids not processed yet, in their original order."""
+        ids = list(dict.fromkeys(message_ids))
+        if not ids:
+            return []
+        seen = set()
+        with self.lock:
+            for start in range(0, len(ids), 500):  # stay under SQLite's parameter limit
+                chunk = ids[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT id FROM processed WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                seen.update(row[0] for row in rows)
+        return [i for i in ids if i not in seen]
+
+    def is_processed(self, message_id: str) -> bool:
+        return not self.filter_new([message_id])
+
+    def mark_processed(self, message_ids: Iterable[str]):
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO processed (id, processed_at) VALUES (?, ?)",
+                [(i, now) for i in message_ids],
+            )
+
+    def get(self, key: str, default: str = None) -> str:
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set(self, key: str, value: str):
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO state (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, str(value)),
+            )
+
+    def prune(self, retention_days: int = PROCESSED_RETENTION_DAYS):
+        cutoff = time.time() - retention_days * 86400
+        with self.lock:
+            self.conn.execute("DELETE FROM processed WHERE processed_at < ?", (cutoff,))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -1,3 +1,4 @@
+import os
 import sys
 import io
 import time
@@ -10,11 +11,24 @@ from collections import defaultdict
 sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 sys.stderr.reconfigure(encoding='utf-8', errors='replace')
 
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+sys.path.append(str(Path(__file__).resolve().parent.parent / "System"))
+from gmail_state import GmailStateStore
+from state_index import WorkflowIndex
+from keyword_classifier import KeywordClassifier
 
 SCOPES = ['https://www.googleapis.com/auth/gmail.modify']
+STATE_DB = os.environ.get("GMAIL_STATE_DB", "")  # default: <vault>/.gmail_state.db
+
+# Messages worth an action file: unread or important, mentioning one of these
+KEYWORD_FILTERS = [
+    'hackathon', 'event', 'exam', 'project',
+    'meeting', 'deadline', 'payment', 'invoice',
+    'urgent', 'important'
+]
+WATCH_LABELS = {'UNREAD', 'IMPORTANT'}
+METADATA_HEADERS = ['From', 'Subject', 'Date', 'Cc']
+GET_BATCH_SIZE = 50       # Gmail allows 100 calls per batch but throttles above ~50
+MODIFY_BATCH_SIZE = 1000  # batchModify limit
 
 CATEGORIES = {
     'Payment':     ['payment', 'invoice', 'bill', 'fee', 'cost', 'charge', 'receipt', 'transaction', 'amount'],
@@ -26,19 +40,32 @@ CATEGORIES = {
     'Urgent':      ['urgent', 'asap', 'immediate', 'critical', 'emergency', 'attention'],
 }
 
+# Compiled once: a single pass over subject + snippet finds every matching category
+CATEGORY_CLASSIFIER = KeywordClassifier(CATEGORIES)
+WATCH_CLASSIFIER = KeywordClassifier({'watch': KEYWORD_FILTERS})
+AMOUNT_PATTERN = re.compile(r'\$[\d,]+(?:\.\d{2})?')
+
+
+def _http_status(error) -> int:
+    """HTTP status of a googleapiclient HttpError (None for other errors)."""
+    return getattr(getattr(error, 'resp', None), 'status', None)
+
 
 class GmailWatcher:
-    def __init__(self, vault_path: str, token_path: str):
+    def __init__(self, vault_path: str, token_path: str = None, service=None):
         self.vault_path = Path(vault_path)
         self.needs_action = self.vault_path / 'Needs_Action' / 'Email'
         self.needs_action.mkdir(parents=True, exist_ok=True)
+        self.state_index = WorkflowIndex(self.vault_path)
 
         (self.vault_path / 'Done').mkdir(exist_ok=True)
         (self.vault_path / 'Pending_Approval').mkdir(exist_ok=True)
         (self.vault_path / 'Plans').mkdir(exist_ok=True)
 
         self.check_interval = 60
-        self.processed_ids = set()
+        # Processed ids and the history cursor survive restarts
+        self.state = GmailStateStore(Path(STATE_DB) if STATE_DB else self.vault_path / '.gmail_state.db')
+        self._pending_history_id = None
 
         self.analytics = {
             'emails_processed': 0,
@@ -46,32 +73,36 @@ class GmailWatcher:
             'by_priority': defaultdict(int),
         }
 
-        self.creds = Credentials.from_authorized_user_file(token_path, SCOPES)
-        if self.creds.expired and self.creds.refresh_token:
-            self.creds.refresh(Request())
-            Path(token_path).write_text(self.creds.to_json(), encoding='utf-8')
+        if service is None:
+            from google.oauth2.credentials import Credentials
+            from google.auth.transport.requests import Request
+            from googleapiclient.discovery import build
 
-        self.service = build('gmail', 'v1', credentials=self.creds)
+            self.creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+            if self.creds.expired and self.creds.refresh_token:
+                self.creds.refresh(Request())
+                Path(token_path).write_text(self.creds.to_json(), encoding='utf-8')
+            service = build('gmail', 'v1', credentials=self.creds)
+
+        self.service = service
         print("Gmail Watcher connected")
         print("Watching: unread + important emails")
 
     def categorize_email(self, subject: str, snippet: str) -> tuple:
         text = f"{subject} {snippet}".lower()
-        category = 'General'
         priority = 'medium'
 
-        for cat, keywords in CATEGORIES.items():
-            if any(kw in text for kw in keywords):
-                category = cat
-                break
+        # Categories come back in CATEGORIES order, so the first one wins as before
+        matched = CATEGORY_CLASSIFIER.match(text)
+        category = matched[0] if matched else 'General'
 
-        if any(kw in text for kw in CATEGORIES['Urgent']):
+        if 'Urgent' in matched:
             priority = 'high'
-        elif any(kw in text for kw in CATEGORIES['Security']):
+        elif 'Security' in matched:
             priority = 'critical'
 
         if category == 'Payment':
-            amounts = re.findall(r'\$[\d,]+(?:\.\d{2})?', text)
+            amounts = AMOUNT_PATTERN.findall(text)
             for amt in amounts:
                 val = float(amt.replace('$', '').replace(',', ''))
                 if val > 100:
@@ -92,17 +123,90 @@ class GmailWatcher:
         return False, ""
 
     def check_for_updates(self) -> list:
-        keyword_filters = [
-            '"hackathon"', '"event"', '"exam"', '"project"',
-            '"meeting"', '"deadline"', '"payment"', '"invoice"',
-            '"urgent"', '"important"'
-        ]
+        """New messages to turn into action files.
+
+        The first run (or one whose historyId has expired) does the keyword
+        search; after that only the history delta since the stored historyId
+        is fetched. The cursor is saved by commit_sync() once the batch is written.
+        """
+        history_id = self.state.get('history_id')
+        if history_id is None:
+            return self.full_sync()
+        try:
+            added_ids, self._pending_history_id = self.history_delta(history_id)
+        except Exception as e:
+            if _http_status(e) == 404:
+                print("Stored historyId expired, running a full sync")
+                return self.full_sync()
+            raise
+        messages = self.fetch_metadata(self.state.filter_new(added_ids))
+        return [m for m in messages if self.matches_watch_filter(m)]
+
+    def full_sync(self) -> list:
+        # Take the cursor before searching so nothing arriving meanwhile is missed
+        profile = self.service.users().getProfile(userId='me').execute()
+        self._pending_history_id = profile['historyId']
+        keyword_filters = [f'"{kw}"' for kw in KEYWORD_FILTERS]
         q = f'(is:unread OR is:important) AND ({" OR ".join(keyword_filters)})'
         response = self.service.users().messages().list(
             userId='me', q=q, maxResults=20
         ).execute()
         messages = response.get('messages', [])
-        return [m for m in messages if m['id'] not in self.processed_ids]
+        return self.fetch_metadata(self.state.filter_new(m['id'] for m in messages))
+
+    def history_delta(self, start_history_id: str) -> tuple:
+        """Ids of messages added (or newly labelled) since start_history_id, plus the new cursor."""
+        message_ids = []
+        page_token = None
+        while True:
+            response = self.service.users().history().list(
+                userId='me', startHistoryId=start_history_id,
+                historyTypes=['messageAdded', 'labelAdded'], pageToken=page_token
+            ).execute()
+            for record in response.get('history', []):
+                for added in record.get('messagesAdded', []) + record.get('labelsAdded', []):
+                    message_ids.append(added['message']['id'])
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return list(dict.fromkeys(message_ids)), response.get('historyId', start_history_id)
+
+    def commit_sync(self):
+        if self._pending_history_id is not None:
+            self.state.set('history_id', self._pending_history_id)
+            self._pending_history_id = None
+
+    def fetch_metadata(self, message_ids: list) -> list:
+        """Headers and snippet for each id, fetched in batch requests of GET_BATCH_SIZE.
+
+        Messages deleted since they were listed (404) are dropped; any other
+        error is raised so the poll is retried without advancing the cursor.
+        """
+        results = {}
+        errors = []
+
+        def collect(request_id, response, exception):
+            if exception is None:
+                results[request_id] = response
+            elif _http_status(exception) != 404:
+                errors.append(exception)
+
+        for start in range(0, len(message_ids), GET_BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=collect)
+            for message_id in message_ids[start:start + GET_BATCH_SIZE]:
+                batch.add(self.service.users().messages().get(
+                    userId='me', id=message_id, format='metadata', metadataHeaders=METADATA_HEADERS
+                ), request_id=message_id)
+            batch.execute()
+        if errors:
+            raise errors[0]
+        return [results[i] for i in message_ids if i in results]
+
+    def matches_watch_filter(self, msg: dict) -> bool:
+        """Client-side version of the full-sync search query, for history deltas."""
+        if not WATCH_LABELS & set(msg.get('labelIds', [])):
+            return False
+        headers = {h['name']: h['value'] for h in msg.get('payload', {}).get('headers', [])}
+        return bool(WATCH_CLASSIFIER.find(f"{headers.get('Subject', '')} {msg.get('snippet', '')}"))
 
     def get_body(self, message_id: str) -> str:
         msg = self.service.users().messages().get(
@@ -125,9 +229,10 @@ class GmailWatcher:
         return ''
 
     def create_action_file(self, message: dict):
-        msg = self.service.users().messages().get(
-            userId='me', id=message['id'], format='full',
-            metadataHeaders=['From', 'Subject', 'Date', 'Cc']
+        # check_for_updates returns messages with their metadata already fetched
+        msg = message if 'payload' in message else self.service.users().messages().get(
+            userId='me', id=message['id'], format='metadata',
+            metadataHeaders=METADATA_HEADERS
         ).execute()
 
         headers = {h['name']: h['value'] for h in msg['payload']['headers']}
@@ -171,25 +276,34 @@ approval_reason: {approval_reason}
 """
         filepath = self.needs_action / f"EMAIL_{message['id']}.md"
         filepath.write_text(content, encoding='utf-8')
+        self.state_index.record(filepath)
 
-        self.service.users().messages().modify(
-            userId='me', id=message['id'],
-            body={'removeLabelIds': ['UNREAD']}
-        ).execute()
-
-        self.processed_ids.add(message['id'])
         print(f"New email saved: {filepath.name}")
         print(f"  Category: {category} | Priority: {priority}")
         if needs_approval:
             print(f"  Requires approval: {approval_reason}")
 
+    def process_messages(self, messages: list):
+        """Writes an action file per message, then marks them all read in one batchModify.
+
+        The ids are recorded as soon as the files exist, so a failed batchModify
+        cannot make the next poll write the same action files again.
+        """
+        for msg in messages:
+            self.create_action_file(msg)
+        ids = [msg['id'] for msg in messages]
+        self.state.mark_processed(ids)
+        for start in range(0, len(ids), MODIFY_BATCH_SIZE):
+            self.service.users().messages().batchModify(
+                userId='me', body={'ids': ids[start:start + MODIFY_BATCH_SIZE], 'removeLabelIds': ['UNREAD']}
+            ).execute()
+
     def run(self):
         print("Gmail Watcher running...")
         while True:
             try:
-                messages = self.check_for_updates()
-                for msg in messages:
-                    self.create_action_file(msg)
+                self.process_messages(self.check_for_updates())
+                self.commit_sync()
                 if self.analytics['emails_processed'] > 0 and self.analytics['emails_processed'] % 10 == 0:
                     print(f"Analytics — Total: {self.analytics['emails_processed']} | "
                           f"By category: {dict(self.analytics['by_category'])}")
@@ -0,0 +1,184 @@
+"""
+WhatsApp Extractor - reads unread chats out of WhatsApp Web in one evaluate call
+
+Walking the chat list from Python costs a browser round trip for every
+query_selector. EXTRACT_JS does the whole walk inside the page instead. It
+finds the chat rows with an unread badge, opens each one, and returns a
+compact JSON list: chat name, unread count, last-message time, preview and
+the last N messages (text, data-id and the data-pre-plain-text sender/time
+header).
+
+ActivityObserver is the push alternative to polling. It installs a
+MutationObserver on the chat list and exposes a binding, so WhatsApp Web
+calls back into Python when a chat's badge or preview changes. Bindings only
+fire while Python is inside a Playwright call, so wait() pumps events with
+page.wait_for_timeout instead of time.sleep.
+"""
+
+import time
+
+# --- Selectors (first match wins; WhatsApp Web renames its test ids now and then) ---
+SELECTORS = {
+    'chat': [
+        'div[data-testid="chat"]',
+        '[data-testid="default-user"]',
+        '#pane-side div[role="row"]',
+        'div[tabindex="-1"][role="button"]',
+    ],
+    'name': [
+        '[data-testid="cell-frame-title"] span[title]',
+        'span[title]',
+        '[data-testid="chat-list-name"]',
+        '[title]',
+    ],
+    'unread': [
+        '[data-testid="icon-unread-count"]',
+        '[data-testid="unread-count"]',
+        '[data-icon="unreadMentionCount"]',
+        '[aria-label*="unread"]',
+        'span[class*="unread"]',
+    ],
+    'preview': [
+        '[data-testid="last-msg-status"]',
+        '[data-testid="cell-frame-secondary"] span[title]',
+    ],
+    'time': [
+        '[data-testid="cell-frame-primary-detail"]',
+        '[data-testid="cell-frame-title"] + div',
+    ],
+    'message': [
+        '[data-testid="msg"]',
+        'div.message-in',
+        '[data-pre-plain-text]',
+        'span.selectable-text',
+    ],
+    'pane': ['#pane-side', 'div[aria-label="Chat list"]', '#side'],
+}
+
+EXTRACT_JS = """
+async ({sel, maxChats, lastN, openChats, settleMs}) => {
+  const first = (root, list) => { for (const s of list) { const el = root.querySelector(s); if (el) return el; } return null; };
+  const all = (root, list) => { for (const s of list) { const els = root.querySelectorAll(s); if (els.length) return Array.from(els); } return []; };
+  const text = el => ((el && el.textContent) || '').trim();
+  const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+  const readMessages = () => all(document.querySelector('#main') || document, sel.message).slice(-lastN).map(el => {
+    const holder = el.closest('[data-id]');
+    const meta = el.matches('[data-pre-plain-text]') ? el : el.querySelector('[data-pre-plain-text]');
+    return {
+      id: holder ? holder.getAttribute('data-id') : null,
+      meta: meta ? meta.getAttribute('data-pre-plain-text') : null,
+      text: text(el),
+    };
+  }).filter(m => m.text);
+  const lastId = () => { const msgs = readMessages(); return msgs.length ? msgs[msgs.length - 1].id || msgs[msgs.length - 1].text : null; };
+
+  const chats = [];
+  const rows = all(document, sel.chat).slice(0, maxChats);
+  for (let i = 0; i < rows.length; i++) {
+    const row = rows[i];
+    const badge = first(row, sel.unread);
+    if (!badge) continue;
+    const nameEl = first(row, sel.name);
+    const chat = {
+      name: (nameEl && (nameEl.getAttribute('title') || text(nameEl))) || `Chat ${i + 1}`,
+      unread: parseInt(text(badge), 10) || 1,
+      time: text(first(row, sel.time)),
+      preview: text(first(row, sel.preview)),
+      messages: [],
+    };
+    if (openChats) {
+      const before = lastId();
+      row.scrollIntoView({block: 'nearest'});
+      for (const type of ['mousedown', 'mouseup', 'click']) {
+        row.dispatchEvent(new MouseEvent(type, {bubbles: true, cancelable: true, view: window}));
+      }
+      // Wait until the conversation pane shows this chat's messages
+      const deadline = Date.now() + settleMs;
+      while (Date.now() < deadline) {
+        const now = lastId();
+        if (now !== null && now !== before) break;
+        await sleep(100);
+      }
+      chat.messages = readMessages();
+    }
+    chats.push(chat);
+  }
+  return chats;
+}
+"""
+
+OBSERVE_JS = """
+({sel, binding, debounceMs}) => {
+  if (window.__aiEmployeeObserver) return false;
+  const first = list => { for (const s of list) { const el = document.querySelector(s); if (el) return el; } return null; };
+  const pane = first(sel.pane);
+  if (!pane) return false;
+  let timer = null;
+  const report = () => {
+    timer = null;
+    const chats = [];
+    for (const s of sel.chat) {
+      const rows = pane.querySelectorAll(s);
+      if (!rows.length) continue;
+      rows.forEach(row => {
+        if (!sel.unread.some(u => row.querySelector(u))) return;
+        const nameEl = sel.name.map(n => row.querySelector(n)).find(Boolean);
+        chats.push(nameEl ? (nameEl.getAttribute('title') || nameEl.textContent.trim()) : '');
+      });
+      break;
+    }
+    if (chats.length) window[binding](chats);
+  };
+  const observer = new MutationObserver(() => { if (!timer) timer = setTimeout(report, debounceMs); });
+  observer.observe(pane, {subtree: true, childList: true, characterData: true});
+  window.__aiEmployeeObserver = observer;
+  return true;
+}
+"""
+
+
+def extract_unread_chats(page, max_chats: int = 20, last_n: int = 10,
+                         open_chats: bool = True, settle_ms: int = 3000) -> list:
+    """Unread chats and their last messages, gathered by a single page.evaluate."""
+    return page.evaluate(EXTRACT_JS, {
+        'sel': SELECTORS,
+        'maxChats': max_chats,
+        'lastN': last_n,
+        'openChats': open_chats,
+        'settleMs': settle_ms,
+    }) or []
+
+
+class ActivityObserver:
+    """MutationObserver on the chat list that signals Python through an exposed binding."""
+
+    BINDING = 'aiEmployeeWhatsAppActivity'
+
+    def __init__(self, debounce_ms: int = 500):
+        self.debounce_ms = debounce_ms
+        self.pending = []      # chat names reported since the last drain()
+        self._bound_page = None
+
+    def _on_activity(self, source, chats):
+        self.pending.extend(chats)
+
+    def install(self, page) -> bool:
+        """Exposes the binding (once per page) and starts the observer. Cheap to call every poll."""
+        if self._bound_page is not page:
+            page.expose_binding(self.BINDING, self._on_activity)
+            self._bound_page = page
+        return bool(page.evaluate(OBSERVE_JS, {
+            'sel': SELECTORS, 'binding': self.BINDING, 'debounceMs': self.debounce_ms,
+        }))
+
+    def wait(self, page, timeout: float, slice_ms: int = 500) -> bool:
+        """Blocks up to timeout seconds, delivering binding calls; True once activity arrived."""
+        deadline = time.time() + timeout
+        while not self.pending and time.time() < deadline:
+            page.wait_for_timeout(slice_ms)
+        return bool(self.pending)
+
+    def drain(self) -> list:
+        chats, self.pending = list(dict.fromkeys(self.pending)), []
+        return chats
@@ -0,0 +1,101 @@
+"""
+WhatsApp Seen Store - bounded, persistent dedupe for WhatsApp messages
+
+Each poll re-reads the last messages of every unread chat, so the watcher
+needs to remember which ones already produced an action file, across
+restarts too. Messages are identified by a stable fingerprint (see
+fingerprint()). The fingerprints live in a small SQLite file with a
+last-seen time:
+
+  - entries re-seen by a poll are touched, so messages still on screen never expire
+  - entries not seen for ttl_seconds are dropped
+  - beyond max_entries the least recently seen are dropped (LRU)
+
+Memory stays flat no matter how long the watcher runs.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Iterable, List
+
+# --- Configuration ---
+MAX_ENTRIES = int(os.environ.get("WHATSAPP_SEEN_MAX", "50000"))
+TTL_SECONDS = float(os.environ.get("WHATSAPP_SEEN_TTL_DAYS", "30")) * 86400
+EVICT_EVERY = 500  # inserts between eviction passes
+
+
+def fingerprint(chat: str, text: str, data_id: str = None, meta: str = None) -> str:
+    """Stable id for a message across polls and restarts.
+
+    WhatsApp Web's data-id is unique per message and preferred. Otherwise hash
+    the chat, the data-pre-plain-text header (which carries the send time
+    and author) and the text.
+    """
+    if data_id:
+        return f"id:{data_id}"
+    digest = hashlib.sha1(f"{chat}\x1f{meta or ''}\x1f{text}".encode('utf-8')).hexdigest()
+    return f"h:{digest}"
+
+
+class SeenStore:
+    def __init__(self, db_path: Path, max_entries: int = MAX_ENTRIES, ttl_seconds: float = TTL_SECONDS):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+        self._inserts = 0
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen (fp TEXT PRIMARY KEY, last_seen REAL NOT NULL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS seen_last_seen ON seen (last_seen)")
+        self.evict()
+
+    def filter_new(self, fingerprints: Iterable[str]) -> List[str]:
+        """Returns the fingerprints not stored yet (in order) and touches the ones that are."""
+        fps = list(dict.fromkeys(fingerprints))
+        if not fps:
+            return []
+        seen = set()
+        now = time.time()
+        with self.lock:
+            for start in range(0, len(fps), 500):  # stay under SQLite's parameter limit
+                chunk = fps[start:start + 500]
+                marks = ','.join('?' * len(chunk))
+                seen.update(row[0] for row in self.conn.execute(
+                    f"SELECT fp FROM seen WHERE fp IN ({marks})", chunk))
+                self.conn.execute(f"UPDATE seen SET last_seen = ? WHERE fp IN ({marks})", [now, *chunk])
+        return [fp for fp in fps if fp not in seen]
+
+    def add(self, fingerprints: Iterable[str]):
+        now = time.time()
+        rows = [(fp, now) for fp in fingerprints]
+        with self.lock:
+            self.conn.executemany(
+                "INSERT INTO seen (fp, last_seen) VALUES (?, ?) "
+                "ON CONFLICT(fp) DO UPDATE SET last_seen = excluded.last_seen", rows)
+            self._inserts += len(rows)
+            due = self._inserts >= EVICT_EVERY
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drops expired entries, then the least recently seen beyond max_entries."""
+        with self.lock:
+            self._inserts = 0
+            self.conn.execute("DELETE FROM seen WHERE last_seen < ?", (time.time() - self.ttl_seconds,))
+            self.conn.execute(
+                "DELETE FROM seen WHERE fp IN (SELECT fp FROM seen ORDER BY last_seen DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,))
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
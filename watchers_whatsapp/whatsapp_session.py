@@ -0,0 +1,147 @@
+"""
+WhatsApp Session - one long-lived Playwright browser for the WhatsApp watcher
+
+Launching Chromium, loading web.whatsapp.com and waiting for the chat list
+takes tens of seconds and a few hundred MB. WhatsAppSession does that once and
+hands the same page to every poll. Before each poll, ensure() checks that the
+browser is healthy. If the browser or page crashed, was closed, or lost the
+chat list, it is relaunched with a backoff. The page is also recycled every
+WHATSAPP_RECYCLE_HOURS so WhatsApp Web's own memory growth stays bounded.
+
+The sync Playwright API is bound to the thread that started it, so a session
+must only be used from the watcher's polling thread.
+"""
+
+import os
+import time
+from pathlib import Path
+
+# --- Configuration ---
+READY_TIMEOUT_MS = int(os.environ.get("WHATSAPP_READY_TIMEOUT_MS", "60000"))
+QR_WAIT_MS = int(os.environ.get("WHATSAPP_QR_WAIT_MS", "60000"))
+RECYCLE_SECONDS = float(os.environ.get("WHATSAPP_RECYCLE_HOURS", "6")) * 3600
+MAX_BACKOFF = 300  # seconds between relaunch attempts after repeated failures
+
+WHATSAPP_URL = 'https://web.whatsapp.com/'
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Any of these means the chat list is up; waited on as one CSS selector list
+READY_SELECTORS = [
+    '[data-testid="chat-list-search"]',
+    '[data-testid="default-user"]',
+    'div[aria-label="Chat list"]',
+    '[data-testid="chat"]',
+    '#side',
+]
+READY_CHECK = "(selector) => !!document.querySelector(selector)"
+
+
+class WhatsAppSession:
+    """A persistent browser context and page, relaunched when unhealthy."""
+
+    def __init__(self, session_path: Path, headless: bool = True, playwright_factory=None):
+        self.session_path = Path(session_path)
+        self.headless = headless
+        self.playwright_factory = playwright_factory
+        self.playwright = None
+        self.context = None
+        self.page = None
+        self.started_at = None
+        self.launches = 0
+        self.failures = 0
+        self._next_attempt = 0.0
+        self._broken = False
+
+    # --- Lifecycle ---
+
+    def start(self):
+        factory = self.playwright_factory
+        if factory is None:
+            from playwright.sync_api import sync_playwright
+            factory = sync_playwright
+
+        self.playwright = factory().start()
+        self.context = self.playwright.chromium.launch_persistent_context(
+            str(self.session_path),
+            headless=self.headless,
+            viewport={'width': 1280, 'height': 800},
+            user_agent=USER_AGENT,
+        )
+        self.page = self.context.pages[0] if self.context.pages else self.context.new_page()
+        self._broken = False
+        self.context.on('close', lambda *_: self.mark_broken())
+        self.page.on('crash', lambda *_: self.mark_broken())
+        self.page.on('close', lambda *_: self.mark_broken())
+
+        print("Loading WhatsApp Web...")
+        self.page.goto(WHATSAPP_URL, wait_until='domcontentloaded')
+        self.wait_until_ready()
+        self.started_at = time.time()
+        self.launches += 1
+
+    def wait_until_ready(self):
+        """Waits for the chat list, giving the user time to scan a QR code if one is shown."""
+        selector = ', '.join(READY_SELECTORS)
+        try:
+            self.page.wait_for_selector(selector, timeout=READY_TIMEOUT_MS)
+            print("WhatsApp Web loaded successfully")
+            return
+        except Exception as e:
+            if not self.page.query_selector('canvas'):
+                raise RuntimeError(f"WhatsApp Web did not load: {e}")
+        print(f"QR code detected - please scan with your phone (waiting {QR_WAIT_MS // 1000}s)")
+        self.page.wait_for_selector(selector, timeout=QR_WAIT_MS)
+        print("Logged in to WhatsApp Web after QR scan")
+
+    def close(self):
+        """Closes the browser and stops Playwright, ignoring errors from an already dead browser."""
+        for closer in (getattr(self.context, 'close', None), getattr(self.playwright, 'stop', None)):
+            if closer is None:
+                continue
+            try:
+                closer()
+            except Exception:
+                pass
+        self.playwright = self.context = self.page = None
+        self.started_at = None
+
+    # --- Health ---
+
+    def mark_broken(self):
+        self._broken = True
+
+    def is_healthy(self) -> bool:
+        if self.page is None or self._broken:
+            return False
+        try:
+            if self.page.is_closed():
+                return False
+            return bool(self.page.evaluate(READY_CHECK, '#side, [data-testid="chat-list-search"], div[aria-label="Chat list"]'))
+        except Exception:
+            return False
+
+    def ensure(self):
+        """The ready page, relaunching the browser first if needed. None while backing off."""
+        if self.page is not None and self.started_at and time.time() - self.started_at > RECYCLE_SECONDS:
+            print("Recycling WhatsApp Web browser")
+            self.close()
+        if self.is_healthy():
+            return self.page
+
+        if time.time() < self._next_attempt:
+            return None
+        if self.page is not None:
+            print("WhatsApp Web session unhealthy, relaunching browser")
+        self.close()
+        try:
+            self.start()
+        except Exception as e:
+            self.failures += 1
+            delay = min(MAX_BACKOFF, 5 * 2 ** (self.failures - 1))
+            self._next_attempt = time.time() + delay
+            print(f"WhatsApp Web launch failed ({e}); retrying in {delay}s")
+            self.close()
+            return None
+        self.failures = 0
+        self._next_attempt = 0.0
+        return self.page
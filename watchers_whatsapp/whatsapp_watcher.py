@@ -1,4 +1,5 @@
 import time
+import hashlib
 from pathlib import Path
 from datetime import datetime
 import sys
@@ -8,17 +9,30 @@ sys.path.append(_project_root)
 sys.path.append(os.path.join(_project_root, 'System'))
 
 from base_watcher import BaseWatcher
-from playwright.sync_api import sync_playwright
+from keyword_classifier import KeywordClassifier
+from whatsapp_session import WhatsAppSession
+from whatsapp_extractor import ActivityObserver, extract_unread_chats
+from whatsapp_seen import SeenStore, fingerprint
+from state_index import WorkflowIndex
+
+# 'poll' checks every check_interval; 'observe' waits for a MutationObserver
+# signal from the chat list, with a slow safety poll in case one is missed
+WATCH_MODE = os.environ.get("WHATSAPP_WATCH_MODE", "poll")
+OBSERVE_SAFETY_INTERVAL = int(os.environ.get("WHATSAPP_SAFETY_POLL", "300"))
 
 class WhatsAppWatcher(BaseWatcher):
     def __init__(self, vault_path: str, session_path: str = None):
         super().__init__(vault_path, check_interval=30)
         self.session_path = Path(session_path) if session_path else Path(vault_path) / 'whatsapp_session'
         self.session_path.mkdir(exist_ok=True)
+        # One browser for the life of the watcher; launched lazily by the first poll
+        self.session = WhatsAppSession(self.session_path)
+        self.observer = ActivityObserver() if WATCH_MODE == 'observe' else None
 
         # Set the needs_action folder to the WhatsApp subdirectory
         self.needs_action = Path(vault_path) / 'Needs_Action' / 'WhatsApp'
-        self.needs_action.mkdir(exist_ok=True)
+        self.needs_action.mkdir(parents=True, exist_ok=True)
+        self.state_index = WorkflowIndex(vault_path)
 
         # Keywords that indicate important messages
         self.keywords = [
@@ -28,303 +42,85 @@ class WhatsAppWatcher(BaseWatcher):
             'meeting', 'schedule', 'appointment', 'call', 'urgent', 'asap',
             'please', 'thanks', 'regarding', 'concerning', 'hi', 'hello'
         ]
+        self.classifier = KeywordClassifier({'important': self.keywords})
 
-        # Track processed messages to avoid duplicates
-        self.processed_messages = set()
+        # Fingerprints of messages already turned into action files (bounded, survives restarts)
+        self.seen = SeenStore(Path(vault_path) / '.whatsapp_seen.db')
 
     def check_for_updates(self) -> list:
         """
-        Connect to WhatsApp Web using Playwright and check for important messages
+        Read unread chats from the long-lived WhatsApp Web page and pick out important messages
         """
         important_messages = []
 
-        try:
-            with sync_playwright() as p:
-                # Launch WhatsApp Web in persistent context to maintain session
-                browser = p.chromium.launch_persistent_context(
-                    str(self.session_path),
-                    headless=True,
-                    viewport={'width': 1280, 'height': 800},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                )
-
-                # Navigate to WhatsApp Web
-                page = browser.new_page()
-                page.goto('https://web.whatsapp.com/', wait_until='domcontentloaded')
-
-                # Wait for WhatsApp to load completely
-                print("Waiting for WhatsApp Web to load...")
-
-                # Wait for the main app to load - try multiple selectors for current UI
-                loaded = False
-                selectors_to_try = [
-                    '[data-testid="chat-list-search"]',  # Current search box in chat list
-                    '[data-testid="default-user"]',     # Chat list items
-                    'div[aria-label="Chat list"]',       # Chat list container
-                    '[data-testid="chat"]',             # Chat elements
-                    '#side',                            # Side panel containing chats
-                    '._3quh._30yy._2t_',               # Legacy selector
-                ]
-
-                for selector in selectors_to_try:
-                    try:
-                        page.wait_for_selector(selector, timeout=15000)
-                        print(f"WhatsApp Web loaded successfully - found selector: {selector}")
-                        loaded = True
-                        break
-                    except Exception as e:
-                        print(f"Selector {selector} failed: {str(e)}")
-                        continue
-
-                if not loaded:
-                    print("Could not detect WhatsApp Web UI. Checking if QR code is present...")
-                    try:
-                        # Check for QR code canvas - this appears when not logged in
-                        qr_selector = 'canvas'
-                        if page.query_selector(qr_selector):
-                            print("QR code detected - please scan with your phone")
-                            print("Waiting 60 seconds for you to scan...")
-                            page.wait_for_timeout(60000)  # Wait 60 seconds for user to scan
-
-                            # Try again after potential QR scan
-                            for selector in selectors_to_try:
-                                try:
-                                    page.wait_for_selector(selector, timeout=15000)
-                                    print(f"Successfully logged in to WhatsApp Web after QR scan - found selector: {selector}")
-                                    loaded = True
-                                    break
-                                except:
-                                    continue
-                    except Exception as e:
-                        print(f"QR code check failed: {str(e)}")
-
-                    if not loaded:
-                        print("WhatsApp Web not loaded properly after waiting. Exiting.")
-                        browser.close()
-                        return []
-
-                print("Looking for chats with unread messages...")
-
-                # Updated approach to find chats with unread messages
-                # Look for chat elements that have unread indicators
-                chat_selectors = [
-                    'div[data-testid="chat"]',  # Current WhatsApp Web chat selector
-                    '[data-testid="default-user"]',  # Another common selector
-                    'div[tabindex="-1"][role="button"]',  # Standard chat button
-                    '#pane-side div[role="row"]',  # Chat rows in side panel
-                ]
-
-                chat_elements = []
-                for selector in chat_selectors:
-                    try:
-                        elements = page.query_selector_all(selector)
-                        if elements:
-                            print(f"Found {len(elements)} chat elements using selector: {selector}")
-                            chat_elements = elements
-                            break
-                    except Exception as e:
-                        print(f"Error querying selector {selector}: {str(e)}")
-                        continue
-
-                if not chat_elements:
-                    print("No chat elements found with specific selectors")
-                    browser.close()
-                    return []
-
-                print(f"Processing {len(chat_elements)} chat elements...")
-
-                # Process each chat to look for unread/important messages
-                for i, chat_element in enumerate(chat_elements[:20]):  # Limit to first 20 chats
-                    try:
-                        # Get the chat name/title - try multiple approaches for current UI
-                        chat_name = f"Chat {i+1}"  # Default name
-                        
-                        # Try different ways to get the chat name for current UI
-                        name_selectors = [
-                            '[title]',  # Title attribute often contains contact name
-                            '[data-testid="chat-list-name"]',  # WhatsApp Web specific
-                            '._3j7s > span',  # Contact name span
-                            '._1wjpf',  # Name element
-                            '[data-testid="cell-frame-title"] span',  # Chat title
-                            'span[title]',  # Span with title
-                        ]
-
-                        for name_selector in name_selectors:
-                            try:
-                                name_elem = chat_element.query_selector(name_selector)
-                                if name_elem:
-                                    name_text = name_elem.text_content().strip()
-                                    if name_text and len(name_text) > 0 and not name_text.isspace():
-                                        chat_name = name_text
-                                        break
-                            except:
-                                continue
-
-                        # If we still have a generic name, try to get text content directly
-                        if chat_name.startswith("Chat "):
-                            try:
-                                # Try to get the first text element that looks like a name
-                                text_elements = chat_element.query_selector_all('span, div')
-                                for text_elem in text_elements:
-                                    try:
-                                        text_content = text_elem.text_content().strip()
-                                        if (text_content and 
-                                            len(text_content) > 1 and 
-                                            not text_content.isdigit() and
-                                            not text_content.startswith('Chat')):
-                                            chat_name = text_content
-                                            break
-                                    except:
-                                        continue
-                            except:
-                                pass
-
-                        print(f"Examining chat: {chat_name}")
-
-                        # Check if this chat has unread messages by looking for indicators
-                        has_unread = False
-                        unread_indicators = [
-                            '[data-testid="unread-count"]',  # Current unread count
-                            '.P6z4j',  # Unread message bubble class
-                            '[data-icon="unreadMentionCount"]',  # Mention count icon
-                            '[data-testid="icon-unread"]',  # Unread icon
-                            '.unread',  # Unread class
-                            'span[class*="unread"]',  # Unread spans
-                            '[aria-label*="unread"]',  # Unread aria labels
-                            '.P6z4j ._158g',  # Unread count specific class
-                        ]
-
-                        for indicator in unread_indicators:
-                            try:
-                                if chat_element.query_selector(indicator):
-                                    has_unread = True
-                                    print(f"Unread indicator found in {chat_name}")
-                                    break
-                            except:
-                                continue
-
-                        # Only process chats that have unread messages or are marked as important
-                        if not has_unread:
-                            print(f"No unread messages in {chat_name}, skipping...")
-                            continue
-
-                        print(f"Opening chat: {chat_name} (has_unread: {has_unread})")
-
-                        # Click on the chat to open it and view messages
-                        try:
-                            # Scroll the element into view first to ensure it's clickable
-                            chat_element.scroll_into_view_if_needed()
-                            
-                            # Try multiple methods to click the chat
-                            clicked = False
-                            click_methods = [
-                                lambda: chat_element.click(),
-                                lambda: chat_element.dispatch_event('click'),
-                                lambda: page.evaluate('(element) => element.click()', chat_element)
-                            ]
-                            
-                            for click_method in click_methods:
-                                try:
-                                    click_method()
-                                    page.wait_for_timeout(1000)  # Small delay after click
-                                    clicked = True
-                                    break
-                                except:
-                                    continue
-                            
-                            if not clicked:
-                                print(f"Could not click on chat {chat_name}")
-                                continue
-
-                            # Wait for messages to load in the chat
-                            page.wait_for_timeout(3000)  # Wait 3 seconds for messages to load
-
-                            # Look for messages in the chat window - updated selectors for current UI
-                            message_selectors = [
-                                '[data-testid="msg"]',  # Current message selector
-                                'div.message-in',  # Incoming message
-                                '[data-pre-plain-text]',  # Messages with sender info
-                                '.copyable-text',  # Copyable message text
-                                'span.selectable-text',  # Selectable message text
-                                '.bubble',  # Message bubble
-                                '.message',  # Generic message
-                            ]
-
-                            messages_found = []
-                            for msg_selector in message_selectors:
-                                try:
-                                    msg_elements = page.query_selector_all(msg_selector)
-                                    if msg_elements:
-                                        print(f"Found {len(msg_elements)} elements with selector: {msg_selector}")
-                                        # Filter out empty elements and get message text
-                                        for elem in msg_elements:
-                                            try:
-                                                # For messages with sender info
-                                                if elem.get_attribute('data-pre-plain-text'):
-                                                    text = elem.text_content().strip()
-                                                    if text and len(text) > 0:
-                                                        messages_found.append((elem, text))
-                                                else:
-                                                    # For other message types
-                                                    text = elem.text_content().strip()
-                                                    if text and len(text) > 0:
-                                                        messages_found.append((elem, text))
-                                            except Exception as e:
-                                                print(f"Error getting text from element: {str(e)}")
-                                                continue
-                                        break  # Use first successful selector
-                                except Exception as e:
-                                    print(f"Error querying message selector {msg_selector}: {str(e)}")
-                                    continue
-
-                            print(f"Found {len(messages_found)} actual messages in {chat_name}")
-
-                            # Process each message
-                            for msg_element, msg_text in messages_found[-10:]:  # Check last 10 messages
-                                print(f"Analyzing message: {msg_text[:50]}...")
-
-                                # Check if message contains any of our keywords
-                                matched_keywords = []
-                                for keyword in self.keywords:
-                                    if keyword.lower() in msg_text.lower():
-                                        if keyword not in matched_keywords:
-                                            matched_keywords.append(keyword)
-
-                                if matched_keywords or has_unread:  # Include unread messages even without keywords
-                                    print(f"Matched keywords: {matched_keywords}")
-
-                                    # Create message info
-                                    message_info = {
-                                        'from': chat_name,
-                                        'text': msg_text,
-                                        'timestamp': datetime.now().isoformat(),
-                                        'priority': 'high' if matched_keywords else 'medium',
-                                        'keywords': matched_keywords
-                                    }
-
-                                    # Avoid processing the same message twice
-                                    message_id = f"{chat_name}:{msg_text}:{datetime.now().isoformat()}"
-                                    if message_id not in self.processed_messages:
-                                        important_messages.append(message_info)
-                                        self.processed_messages.add(message_id)
-                                        print(f"Added important message from {chat_name}")
-
-                        except Exception as e:
-                            print(f"Error clicking chat {chat_name}: {str(e)}")
-                            continue
-
-                    except Exception as e:
-                        print(f"Error processing chat element {i+1}: {str(e)}")
-                        continue
+        page = self.session.ensure()
+        if page is None:
+            return []
 
-                browser.close()
+        try:
+            if self.observer:
+                self.observer.install(page)
+                self.observer.drain()
+            # One round trip: the extractor opens each unread chat inside the page
+            chats = extract_unread_chats(page, max_chats=20, last_n=10)
+            print(f"Found {len(chats)} chats with unread messages")
+
+            candidates = []
+            for chat in chats:
+                # Without the messages only the preview is known; its time and badge count
+                # stand in for the sender/time header, so a second "ok" is not taken for the first
+                preview_meta = f"[preview {chat.get('time', '')}, {chat.get('unread', '')} unread]"
+                messages = chat['messages'] or [{'id': None, 'meta': preview_meta, 'text': chat['preview']}]
+                for msg in messages:
+                    if msg['text']:
+                        fp = fingerprint(chat['name'], msg['text'], msg['id'], msg['meta'])
+                        candidates.append((fp, chat['name'], msg))
+
+            # Avoid processing the same message twice, across polls and restarts
+            new = set(self.seen.filter_new(fp for fp, _, _ in candidates))
+            for fp, chat_name, msg in candidates:
+                if fp not in new:
+                    continue
+                new.discard(fp)
+                msg_text = msg['text']
+                print(f"Analyzing message: {msg_text[:50]}...")
+
+                # Check if message contains any of our keywords
+                matched_keywords = self.classifier.keywords_in(msg_text)
+
+                # Unread chats are included even without keywords
+                print(f"Matched keywords: {matched_keywords}")
+                message_info = {
+                    'from': chat_name,
+                    'text': msg_text,
+                    'timestamp': datetime.now().isoformat(),
+                    'priority': 'high' if matched_keywords else 'medium',
+                    'keywords': matched_keywords,
+                    'data_id': msg['id'],
+                    'meta': msg['meta'],
+                    'fingerprint': fp,
+                }
+                important_messages.append(message_info)
+                print(f"Added important message from {chat_name}")
 
         except Exception as e:
+            # A crashed browser fails the next ensure() health check and is relaunched
             self.logger.error(f"Error checking WhatsApp: {str(e)}")
             print(f"Error: {str(e)}")
 
         return important_messages
 
+    def wait_for_next_check(self):
+        """Sleeps until the next poll; in observe mode wakes early when the chat list changes."""
+        if self.observer and self.session.page is not None:
+            try:
+                if self.observer.wait(self.session.page, OBSERVE_SAFETY_INTERVAL):
+                    print(f"Activity in: {', '.join(self.observer.pending[:5])}")
+                return
+            except Exception as e:
+                self.logger.error(f"Error waiting for WhatsApp activity: {str(e)}")
+        time.sleep(self.check_interval)
+
     def create_action_file(self, message) -> Path:
         """
         Create a markdown file in Needs_Action folder for the WhatsApp message
@@ -358,7 +154,9 @@ This message contained important keywords: {', '.join(message.get('keywords', []
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         # Clean sender name for filename
         sender_clean = ''.join(c for c in message.get('from', 'unknown') if c.isalnum() or c in (' ', '-', '_')).replace(' ', '_')[:20]
-        filepath = self.needs_action / f'WHATSAPP_{timestamp}_{sender_clean}.md'
+        # The fingerprint suffix keeps two messages from one sender in the same second apart
+        suffix = hashlib.sha1(message.get('fingerprint', message.get('text', '')).encode('utf-8')).hexdigest()[:8]
+        filepath = self.needs_action / f'WHATSAPP_{timestamp}_{sender_clean}_{suffix}.md'
         
         # Write the file with proper error handling
         try:
@@ -367,14 +165,22 @@ This message contained important keywords: {', '.join(message.get('keywords', []
         except Exception as e:
             self.logger.error(f"Error creating action file {filepath.name}: {str(e)}")
             # Create a simplified filename if the original fails
-            fallback_filepath = self.needs_action / f'WHATSAPP_{timestamp}_unknown.md'
+            fallback_filepath = self.needs_action / f'WHATSAPP_{timestamp}_unknown_{suffix}.md'
             fallback_content = content.replace(message.get('from', 'Unknown'), 'Unknown')
             fallback_filepath.write_text(fallback_content, encoding='utf-8')
             self.logger.info(f"Created fallback WhatsApp action file: {fallback_filepath.name}")
+            self.state_index.record(fallback_filepath)
+            self._mark_seen(message)
             return fallback_filepath
-        
+
+        self.state_index.record(filepath)
+        self._mark_seen(message)
         return filepath
 
+    def _mark_seen(self, message):
+        if message.get('fingerprint'):
+            self.seen.add([message['fingerprint']])
+
     def run_once(self):
         """
         Run a single check cycle - useful for testing
@@ -388,6 +194,8 @@ This message contained important keywords: {', '.join(message.get('keywords', []
         except Exception as e:
             self.logger.error(f"Error during single check: {str(e)}")
             return 0
+        finally:
+            self.session.close()
 
     def run(self):
         """
@@ -411,8 +219,8 @@ This message contained important keywords: {', '.join(message.get('keywords', []
                 if items:
                     print(f"Processed {len(items)} important WhatsApp messages")
                     
-                # Wait for the specified interval before next check
-                time.sleep(self.check_interval)
+                # Wait for the specified interval (or chat list activity) before next check
+                self.wait_for_next_check()
                 
             except KeyboardInterrupt:
                 print("\nWhatsApp Watcher stopped by user")
@@ -425,6 +233,8 @@ This message contained important keywords: {', '.join(message.get('keywords', []
                 # Wait before retrying to avoid rapid error loops
                 time.sleep(min(self.check_interval, 30))  # Wait at least 30 seconds or check_interval if smaller
 
+        self.session.close()
+
 
 if __name__ == "__main__":
     if len(sys.argv) < 2: